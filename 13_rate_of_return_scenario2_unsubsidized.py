@@ -9,83 +9,87 @@
 # (8 years) for the scenario without aid. This is a smaller range of resource payment values.
 # Costs include capital, labor, operation, consumables, and maintenance.
 # Benefits result from nutrient payments.
+# Sheet1 holds the rate of return of every run (row) at each nutrient payment (column), read off the run's frontier
+# (the frontier sheet) like any other payment: NaN where the run never breaks even at the payment (no rate of return
+# between 0 and 5000% brings its net present cost to zero), 50 where it breaks even at every rate up to 5000%.
 
 # ~~~~~~~IMPORT PACKAGES, DATA, AND FILES NECESSARY~~~~~~~
 
 import pandas as pd  # import pandas for matrix data manipulation
-from scipy.optimize import least_squares
-import numpy as np
+from registry import load_registry  # compiled input_data_file.xlsx
+from intermediates import ResultsWriter, read_results, run_chunks  # columnar results handed between the scripts
+from rate_of_return import Frontier, frontier_rates, frontier_table  # rate of return frontiers
+from lifecycle import component_lifetimes  # sampled lifetimes of each component
+from scenarios import COMPONENTS, component_costs, lifecycle_flows, system_flows  # cash flows of 8_break_even.py
 
-mat_cost = pd.read_excel('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31.xlsx', sheetname='material')  # (USD) import material costs
-labor_cost = pd.read_excel('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31.xlsx', sheetname='labor')  # (USD) import labor costs
-con_cost = pd.read_excel('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31.xlsx', sheetname='consumable')  # (USD/yr) consumable costs
-op_cost = pd.read_excel('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31.xlsx', sheetname='op')  # (USD/yr) import operation costs
-maint_cost = pd.read_excel('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31.xlsx', sheetname='maint')  # (USD) import maintenance costs
-nutrients = pd.read_excel('RESULTS_RR_costs_FilterReuse.xlsx', sheetname='nutrients_recovered')  # import recovered nutrients
-nutrient_payment_range = pd.read_excel('input_data_file.xlsx', sheetname='nutrient_payment_shortened')  # (USD per kg)
+input_data = load_registry('input_data_file.xlsx')
+
+nutrient_payment_range = input_data.sheet('nutrient_payment_shortened')  # (USD per kg)
 
 # ~~~~~~~CONSTANTS~~~~~~~
 
 N_runs = 10000
-lifetime = 8  # (years) lifetime of all technologies and project duration for rate of return calculations
-
-# ~~~~~~~RATE OF RETURN FUNCTION DEFINITION~~~~~~~
-# solving for rate of return (r)
-# where mat = initial material costs (USD), labor = construction labor costs (USD),
-# op = annual operation costs (USD/yr), con = annual consumables cost (USD/yr),
-# maint = maintenance cost at half the lifetime (USD), lifetime = system lifetime (years)
-
-
-def solve_for_r(r):
-
-    return (mat + labor) + (op + con) * (((1.0 + r) ** lifetime - 1.0) / (r * (1.0 + r) ** lifetime)) \
-           + maint * (1.0 + r) ** (-4.0) \
-           - nutrient_payment * (((1.0 + r) ** lifetime - 1.0) / (r * (1.0 + r) ** lifetime))
-
-
-# ~~~~~~~RATE OF RETURN CALCULATIONS (WITH AID)~~~~~~~
-writer = pd.ExcelWriter('RESULTS_rate_of_return_Scenario2_unsubsidized_July31.xlsx', engine='xlsxwriter')
-RoR_frontier_FINAL = pd.DataFrame()
-
-for i in range(N_runs):
-    mat = mat_cost.material_UDDT[i] + mat_cost.material_off_site_tanks[i] \
-          + mat_cost.material_on_site_tanks[i] + mat_cost.material_struvite[i] \
-          + mat_cost.material_ion_exchange[i]  # (USD) total material cost
-    labor = labor_cost.labor_UDDT[i] + labor_cost.labor_off_site_tanks[i] \
-            + labor_cost.labor_on_site_tanks[i] + labor_cost.labor_struvite[i] \
-            + labor_cost.labor_ion_exchange[i]  # (USD) total construction labor cost
-    op = op_cost.annual_op_UDDT[i] + op_cost.annual_op_off_site_tanks[i] \
-         + op_cost.annual_op_on_site_tanks[i] + op_cost.annual_op_struvite[i] \
-         + op_cost.annual_op_ion_exchange[i]  # (USD/yr) total annual operation and maintenance cost
-    con = con_cost.annual_con_struvite_filter[i] + con_cost.annual_con_struvite_MgOH2[i] \
-          + con_cost.annual_con_ion_exchange_resin[i] \
-          + con_cost.annual_con_ion_exchange_H2SO4[i]  # (USD/yr)
-    maint = maint_cost.maint_UDDT[i] + maint_cost.maint_off_site_tanks[i] + maint_cost.maint_on_site_tanks[i] \
-            + maint_cost.maint_struvite[i] + maint_cost.maint_ion_exchange[i]  # (USD) total maintenance cost at year 4
-
-    RoR_FINAL = pd.DataFrame()
-
-    annual_mass_nutrients = nutrients.annual_N_recovery[i] + nutrients.annual_P_recovery[i] \
-                            + nutrients.annual_K_recovery[i]  # (kg nutrients per year)
-
-    for j in range(101):  # 101 because have 101 payment values ($0 to $5 increments of $0.05)
-        annual_mass_nutrients = nutrients.annual_N_recovery[i] + nutrients.annual_P_recovery[i] \
-                                + nutrients.annual_K_recovery[i]  # (kg nutrients per year)
-        nutrient_payment = nutrient_payment_range.nutrient_payment[j] * annual_mass_nutrients  # (USD/yr)
-        sol = least_squares(solve_for_r, 1, bounds=(0, 50))  # upper bound is a rate of return of 50 or 5000%
-
-        RoR = sol.x
-        RoR = list(RoR)
-        RoR = str(RoR)[1:-1]
-        RoR = float(RoR)
-
-        output = pd.DataFrame([RoR])
-        RoR_FINAL = pd.concat([RoR_FINAL, output])
-
-    RoR_FINAL = RoR_FINAL.transpose()
-    RoR_frontier_FINAL = pd.concat([RoR_frontier_FINAL, RoR_FINAL]).reset_index(drop=True)
-
-RoR_frontier_FINAL.columns = [nutrient_payment_range.nutrient_payment]
-RoR_frontier_FINAL.to_excel(writer)
+horizon = 8  # (years) project duration for rate of return calculations (technology lifetimes are sampled)
+
+# ~~~~~~~RATE OF RETURN EQUATION~~~~~~~
+# rate of return (r) of every run and nutrient payment, read off the frontier of each run (see rate_of_return.py), where
+# mat + labor = initial material and construction labor costs (USD), op + con = annual operation and consumables
+# costs (USD/yr), events = replacements net of salvage value and maintenance in every year of the horizon (USD), on
+# the sampled technology lifetimes and maintenance times as in 8_break_even.py, and the nutrient payment is paid for
+# the nutrients recovered every year; the upper bound is a rate of return of 50 or 5000%
+
+# ~~~~~~~RATE OF RETURN CALCULATIONS (WITHOUT AID)~~~~~~~
+writer = ResultsWriter('RESULTS_rate_of_return_Scenario2_unsubsidized_July31')
+
+# one block of runs at a time (see intermediates.run_chunks), each block appended to the results
+for runs in run_chunks(N_runs, 'RESULTS_cap_op_cons_maint_costs_FilterReuse_July31'):
+    mat_cost = read_results('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31', 'material', runs=runs)  # (USD)
+    labor_cost = read_results('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31', 'labor', runs=runs)  # (USD)
+    con_cost = read_results('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31', 'consumable', runs=runs)  # (USD/yr)
+    op_cost = read_results('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31', 'op', runs=runs)  # (USD/yr)
+    maint_cost = read_results('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31', 'maint', runs=runs)  # (USD)
+    nutrients = read_results('RESULTS_RR_costs_FilterReuse', 'nutrients_recovered', runs=runs)  # recovered nutrients
+    tech_life_span = read_results('OUTPUT_uncertainty_ranges', 'tech_life_span', runs=runs)  # (years) lifetimes
+    tech_maint_time = read_results('OUTPUT_uncertainty_ranges', 'tech_maint_time', runs=runs)  # (years) maintenance
+
+    # (components x runs x years) replacements net of salvage value and maintenance of every component on its sampled
+    # lifetime, the lifecycle cash flows of 8_break_even.py (see scenarios.lifecycle_flows)
+    costs = component_costs({'UDDT': mat_cost.material_UDDT, 'off_site_tanks': mat_cost.material_off_site_tanks,
+                             'on_site_tanks': mat_cost.material_on_site_tanks, 'struvite': mat_cost.material_struvite,
+                             'ion_exchange': mat_cost.material_ion_exchange},
+                            {'UDDT': labor_cost.labor_UDDT, 'off_site_tanks': labor_cost.labor_off_site_tanks,
+                             'on_site_tanks': labor_cost.labor_on_site_tanks, 'struvite': labor_cost.labor_struvite,
+                             'ion_exchange': labor_cost.labor_ion_exchange},
+                            {},
+                            {'UDDT': maint_cost.maint_UDDT, 'off_site_tanks': maint_cost.maint_off_site_tanks,
+                             'on_site_tanks': maint_cost.maint_on_site_tanks, 'struvite': maint_cost.maint_struvite,
+                             'ion_exchange': maint_cost.maint_ion_exchange},
+                            component_lifetimes(tech_life_span, COMPONENTS, 'tech_life_span'),  # (years)
+                            component_lifetimes(tech_maint_time, COMPONENTS, 'tech_maint_time'))  # (years)
+    lifecycle = lifecycle_flows(costs, horizon)
+
+    mat = mat_cost.material_UDDT + mat_cost.material_off_site_tanks + mat_cost.material_on_site_tanks \
+        + mat_cost.material_struvite + mat_cost.material_ion_exchange  # (USD) total material cost
+    labor = labor_cost.labor_UDDT + labor_cost.labor_off_site_tanks + labor_cost.labor_on_site_tanks \
+        + labor_cost.labor_struvite + labor_cost.labor_ion_exchange  # (USD) total construction labor cost
+    op = op_cost.annual_op_UDDT + op_cost.annual_op_off_site_tanks + op_cost.annual_op_on_site_tanks \
+        + op_cost.annual_op_struvite + op_cost.annual_op_ion_exchange  # (USD/yr) total annual operation cost
+    con = con_cost.annual_con_struvite_filter + con_cost.annual_con_struvite_MgOH2 \
+        + con_cost.annual_con_ion_exchange_resin + con_cost.annual_con_ion_exchange_H2SO4  # (USD/yr)
+    events = system_flows(lifecycle.construction + lifecycle.maintenance, 'Scenario2')  # (USD) lifecycle events
+
+    annual_mass_nutrients = nutrients.annual_N_recovery + nutrients.annual_P_recovery \
+        + nutrients.annual_K_recovery  # (kg nutrients per year)
+
+    # (runs x 11) the frontier itself, giving the rate of return at any payment without solving again, e.g. at the
+    # nutrient_payment and nutrient_payment_UDDT_only sheets (python rate_of_return.py, see rate_of_return.py)
+    frontier = Frontier(mat + labor, op + con, events, annual_mass_nutrients)
+
+    # (runs x payments) for the 101 payment values ($0 to $5 increments of $0.05), from the frontier
+    RoR_frontier_FINAL = pd.DataFrame(frontier_rates(frontier, nutrient_payment_range.nutrient_payment),
+                                      index=mat_cost.index)
+    RoR_frontier_FINAL.columns = [nutrient_payment_range.nutrient_payment]
+    writer.write('Sheet1', RoR_frontier_FINAL)
+    writer.write('frontier', frontier_table(frontier, mat_cost.index))
 
 writer.save()
@@ -9,98 +9,137 @@
 # (8 years) for the scenario with aid assuming UDDT, transport, and storage of urine (no downstream processing).
 # Costs include capital, labor, operation, consumables, and maintenance.
 # Benefits result from nutrient payments and pit latrine payments.
+# Sheet1 holds the rate of return of every run (row) at each nutrient payment (column), read off the run's frontier
+# (the frontier sheet) like any other payment: NaN where the run never breaks even at the payment (no rate of return
+# between 0 and 5000% brings its net present cost to zero), 50 where it breaks even at every rate up to 5000%.
 
 # ~~~~~~~IMPORT PACKAGES, DATA, AND FILES NECESSARY~~~~~~~
 
 import pandas as pd  # import pandas for matrix data manipulation
-from scipy.optimize import least_squares
-import numpy as np
-
-mat_cost = pd.read_excel('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31.xlsx', sheetname='material')  # (USD) import material costs
-labor_cost = pd.read_excel('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31.xlsx', sheetname='labor')  # (USD) import labor costs
-con_cost = pd.read_excel('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31.xlsx', sheetname='consumable')  # (USD/yr) consumable costs
-op_cost = pd.read_excel('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31.xlsx', sheetname='op')  # (USD/yr) import operation costs
-maint_cost = pd.read_excel('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31.xlsx', sheetname='maint')  # (USD) import maintenance costs
-nutrients = pd.read_excel('RESULTS_per_capita_nutrients.xlsx', sheetname='rec_nutrients_after_U_T_S')  # import recovered nutrients
-nutrient_payment_range = pd.read_excel('input_data_file.xlsx', sheetname='nutrient_payment_shortened')  # (USD/kg)
-
-tank_maint_ratio = pd.read_excel('OUTPUT_uncertainty_ranges.xlsx', sheetname='maint_cost_ratio')
-tank_op_ratio = pd.read_excel('OUTPUT_uncertainty_ranges.xlsx', sheetname='op_cost_ratio')
-tank_labor_ratio = pd.read_excel('OUTPUT_uncertainty_ranges.xlsx', sheetname='labor_cost_ratio')
-tank_cost = pd.read_excel('OUTPUT_uncertainty_ranges.xlsx', sheetname='RR_uniform')  # (USD/tank)
-urine_volume = pd.read_excel('OUTPUT_uncertainty_ranges.xlsx', sheetname='RR_triangle')  # (L/cap/d)
+import numpy as np  # import NumPy library for array calculations
+from registry import load_registry  # compiled input_data_file.xlsx
+from intermediates import ResultsWriter, read_results, run_chunks  # columnar results handed between the scripts
+from rate_of_return import Frontier, frontier_rates, frontier_table  # rate of return frontiers
+from lifecycle import component_lifetimes  # sampled lifetimes of each component
+from scenarios import COMPONENTS, component_costs, lifecycle_flows, system_flows  # cash flows of 8_break_even.py
+from aid import AidPolicy, aid_policies, construction_shares, ongoing_shares  # aid agency payment policies
+from tank_sizing import SIMPLE_TANKS, tank_sizing  # memoized tank sizing and costs for all runs
+
+input_data = load_registry('input_data_file.xlsx')
+
+nutrient_payment_range = input_data.sheet('nutrient_payment_shortened')  # (USD/kg)
 
 # ~~~~~~~CONSTANTS~~~~~~~
 
 N_runs = 10000
-lifetime = 8  # (years) lifetime of all technologies and project duration for rate of return calculations
+horizon = 8  # (years) project duration for rate of return calculations (technology lifetimes are sampled)
+pit_component = [name for name, technologies in COMPONENTS].index('pit')  # pit latrine row of the cash flows
 UDDT_users = 40  # (people) number of people using a UDDT unit (with 2 toilets)
 UDDT_qty = 500  # assume 1,000 toilets and UDDT has 2 per unit
 urine_storage_time = 80  # (days)
-
-# ~~~~~~~RATE OF RETURN FUNCTION DEFINITION~~~~~~~
-# solving for rate of return (r)
-# where mat = initial material costs (USD), labor = construction labor costs (USD),
-# op = annual operation costs (USD/yr), con = annual consumables cost (USD/yr),
-# maint = maintenance cost at half the lifetime (USD), lifetime = system lifetime (years)
-
-
-def solve_for_r(r):
-
-    return (mat_FINAL + labor_FINAL) \
-           + op_FINAL * (((1.0 + r) ** lifetime - 1.0) / (r * (1.0 + r) ** lifetime)) \
-           + maint_FINAL * (1.0 + r) ** (-4.0) \
-           - nutrient_payment * (((1.0 + r) ** lifetime - 1.0) / (r * (1.0 + r) ** lifetime))
-
+pit_qty = 500  # assume 1,000 toilets and pit has 1 per unit
+aid_policy = AidPolicy('pit', 1.0, None)  # the aid agency pays all pit latrine costs (Sheet1 and frontier)
+# partial and capped aid agency payments for the pit latrine, as in 8_break_even.py: share of its costs paid (0% to
+# 100%) and the most paid toward the construction of each pit latrine (USD/unit, None for no cap)
+aid_shares = np.arange(0, 101, 5) / 100
+aid_caps = (None, 250, 500)
+
+# ~~~~~~~RATE OF RETURN EQUATION~~~~~~~
+# rate of return (r) of every run and nutrient payment, read off the frontier of each run (see rate_of_return.py), where
+# mat + labor = initial material and construction labor costs (USD), op + con = annual operation and consumables
+# costs (USD/yr), events = replacements net of salvage value and maintenance in every year of the horizon (USD), on
+# the sampled technology lifetimes and maintenance times as in 8_break_even.py, and the nutrient payment is paid for
+# the nutrients recovered every year; the upper bound is a rate of return of 50 or 5000%
 
 # ~~~~~~~RATE OF RETURN CALCULATIONS (WITH AID)~~~~~~~
-writer = pd.ExcelWriter('RESULTS_rate_of_return_Scenario1_subsidized_July31_test.xlsx', engine='xlsxwriter')
-RoR_frontier_FINAL = pd.DataFrame()
-
-for i in range(N_runs):  # N_runs
-    total_tank_volume = urine_volume.urine_volume[i] * UDDT_qty * UDDT_users * urine_storage_time  # (L) 80-day volume
-    qty_tanks = total_tank_volume/1000  # total number of 1000 L urine storage tanks
-    qty_tanks = np.ceil(qty_tanks)  # round tanks up to the nearest whole tank
-    mat_cost_tank = tank_cost.cost_urine_tank1[i] * qty_tanks  # (USD)
-    labor_cost_tank = tank_labor_ratio.tank[i] * mat_cost_tank  # (USD)
-    op_cost_tank = tank_op_ratio.tank[i] * mat_cost_tank  # (USD/yr)
-    maint_cost_tank = tank_maint_ratio.tank[i] * mat_cost_tank  # (USD) at year 4
-
-    mat1 = mat_cost.material_UDDT[i] + mat_cost_tank  # (USD) total material cost
-    labor1 = labor_cost.labor_UDDT[i] + labor_cost_tank  # (USD) total construction labor cost
-    op1 = op_cost.annual_op_UDDT[i] + op_cost_tank  # (USD/yr) total annual operation cost
-    maint1 = maint_cost.maint_UDDT[i] + maint_cost_tank  # (USD) total maintenance cost at year 4
-    mat2 = mat_cost.material_pit[i]  # (USD) material cost payment of a pit latrine
-    labor2 = labor_cost.labor_pit[i]  # (USD) labor cost payment of a pit latrine
-    op2 = op_cost.annual_op_pit[i]  # (USD/yr) annual operation cost payment of a pit latrine
-    maint2 = maint_cost.maint_pit[i]  # (USD) maintenance cost payment of a pit latrine at year 4
-
-    mat_FINAL = mat1 - mat2  # (USD) total material cost minus material payment for pit latrine
-    labor_FINAL = labor1 - labor2  # (USD) total labor cost minus labor payment for pit latrine
-    op_FINAL = op1 - op2  # (USD/yr) total annual operation cost minus operation payment for pit latrine
-    maint_FINAL = maint1 - maint2  # (USD) maintenance cost minus maintenance cost payment of a pit latrine at year 4
-
-    RoR_FINAL = pd.DataFrame()
-
-    for j in range(101):  # 101 because have 101 payment values ($0 to $5.00 increments of $0.05)
-        annual_mass_nutrients = 365 * UDDT_users * UDDT_qty * (nutrients.N_rec_U_T_S_urine[i]
-                                                               + nutrients.P_rec_U_T_S_urine[i]
-                                                               + nutrients.K_rec_U_T_S_urine[i])  # (kg nutrients/year)
-        nutrient_payment = nutrient_payment_range.nutrient_payment[j] * annual_mass_nutrients  # (USD/yr)
-        sol = least_squares(solve_for_r, 1, bounds=(0, 50))  # upper bound is a rate of return of 50 or 5000%
-
-        RoR = sol.x
-        RoR = list(RoR)
-        RoR = str(RoR)[1:-1]
-        RoR = float(RoR)
-
-        output = pd.DataFrame([RoR])
-        RoR_FINAL = pd.concat([RoR_FINAL, output])
-
-    RoR_FINAL = RoR_FINAL.transpose()
-    RoR_frontier_FINAL = pd.concat([RoR_frontier_FINAL, RoR_FINAL]).reset_index(drop=True)
-
-RoR_frontier_FINAL.columns = [nutrient_payment_range.nutrient_payment]
-RoR_frontier_FINAL.to_excel(writer)
+writer = ResultsWriter('RESULTS_rate_of_return_Scenario1_subsidized_July31_test')
+
+# the aid policy (first row) and then every partial and capped payment; the partial and capped payments are listed
+# in the aid_policies sheet, and their (policies x runs) frontiers stored one row per policy and run, policy by
+# policy within each block of runs, in the aid_policy_frontier sheet, queried like the frontier sheet:
+# python rate_of_return.py RESULTS_rate_of_return_Scenario1_subsidized_July31_test --frontier aid_policy_frontier
+policies = [aid_policy] + aid_policies(aid_shares, aid_caps, 'pit')
+writer.write('aid_policies', pd.DataFrame({'share': [policy.share for policy in policies[1:]],
+                                           'cap': [np.nan if policy.cap is None else policy.cap
+                                                   for policy in policies[1:]]}))
+
+# one block of runs at a time (see intermediates.run_chunks), each block appended to the results
+for runs in run_chunks(N_runs, 'RESULTS_cap_op_cons_maint_costs_FilterReuse_July31'):
+    mat_cost = read_results('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31', 'material', runs=runs)  # (USD)
+    labor_cost = read_results('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31', 'labor', runs=runs)  # (USD)
+    op_cost = read_results('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31', 'op', runs=runs)  # (USD/yr)
+    maint_cost = read_results('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31', 'maint', runs=runs)  # (USD)
+    nutrients = read_results('RESULTS_per_capita_nutrients', 'rec_nutrients_after_U_T_S', runs=runs)  # (kg/cap/day)
+
+    tank_maint_ratio = read_results('OUTPUT_uncertainty_ranges', 'maint_cost_ratio', runs=runs)
+    tank_op_ratio = read_results('OUTPUT_uncertainty_ranges', 'op_cost_ratio', runs=runs)
+    tank_labor_ratio = read_results('OUTPUT_uncertainty_ranges', 'labor_cost_ratio', runs=runs)
+    tank_cost = read_results('OUTPUT_uncertainty_ranges', 'RR_uniform', runs=runs)  # (USD/tank)
+    urine_volume = read_results('OUTPUT_uncertainty_ranges', 'RR_triangle', runs=runs)  # (L/cap/d)
+    tech_life_span = read_results('OUTPUT_uncertainty_ranges', 'tech_life_span', runs=runs)  # (years) lifetimes
+    tech_maint_time = read_results('OUTPUT_uncertainty_ranges', 'tech_maint_time', runs=runs)  # (years) maintenance
+
+    # 1000 L urine storage tanks for the 80-day volume, their costs, and the plots of land they take
+    simple_tanks = tank_sizing({'RR_triangle': urine_volume, 'RR_uniform': tank_cost,
+                                'labor_cost_ratio': tank_labor_ratio, 'op_cost_ratio': tank_op_ratio,
+                                'maint_cost_ratio': tank_maint_ratio},
+                               SIMPLE_TANKS._replace(users=UDDT_users, toilets=UDDT_qty, days=urine_storage_time))
+
+    # (components x runs x years) replacements net of salvage value and maintenance of every component on its sampled
+    # lifetime, the lifecycle cash flows of 8_break_even.py (see scenarios.lifecycle_flows)
+    costs = component_costs({'pit': mat_cost.material_pit,
+                             'UDDT': mat_cost.material_UDDT, 'simple_tanks': simple_tanks.capital},
+                            {'pit': labor_cost.labor_pit,
+                             'UDDT': labor_cost.labor_UDDT, 'simple_tanks': simple_tanks.labor},
+                            {},
+                            {'pit': maint_cost.maint_pit,
+                             'UDDT': maint_cost.maint_UDDT, 'simple_tanks': simple_tanks.maint},
+                            component_lifetimes(tech_life_span, COMPONENTS, 'tech_life_span'),  # (years)
+                            component_lifetimes(tech_maint_time, COMPONENTS, 'tech_maint_time'))  # (years)
+    lifecycle = lifecycle_flows(costs, horizon)
+
+    # (policies x runs) share of the pit latrine construction (material and labor) and (policies x 1) share of its
+    # ongoing costs paid by the aid agency
+    construction_share = construction_shares(policies, mat_cost.material_pit + labor_cost.labor_pit, pit_qty)
+    ongoing_share = ongoing_shares(policies)[:, np.newaxis]
+
+    mat_cost_tank = simple_tanks.capital  # (USD) 1000 L urine storage tanks for the 80-day volume
+    labor_cost_tank = simple_tanks.labor  # (USD)
+    op_cost_tank = simple_tanks.op  # (USD/yr)
+
+    mat1 = mat_cost.material_UDDT + mat_cost_tank  # (USD) total material cost
+    labor1 = labor_cost.labor_UDDT + labor_cost_tank  # (USD) total construction labor cost
+    op1 = op_cost.annual_op_UDDT + op_cost_tank  # (USD/yr) total annual operation cost
+    events1 = system_flows(lifecycle.construction + lifecycle.maintenance, 'Scenario1')  # (USD) lifecycle events
+    mat2 = construction_share * mat_cost.material_pit.values  # (USD) material cost payment of a pit latrine
+    labor2 = construction_share * labor_cost.labor_pit.values  # (USD) labor cost payment of a pit latrine
+    op2 = ongoing_share * op_cost.annual_op_pit.values  # (USD/yr) annual operation cost payment of a pit latrine
+    events2 = construction_share[:, :, np.newaxis] * lifecycle.construction[pit_component] \
+        + ongoing_share[:, :, np.newaxis] * lifecycle.maintenance[pit_component]  # (USD) pit latrine event payment
+
+    # (policies x runs)
+    mat_FINAL = np.asarray(mat1) - mat2  # (USD) total material cost minus material payment for pit latrine
+    labor_FINAL = np.asarray(labor1) - labor2  # (USD) total labor cost minus labor payment for pit latrine
+    op_FINAL = np.asarray(op1) - op2  # (USD/yr) total annual operation cost minus operation payment for pit latrine
+    events_FINAL = events1 - events2  # (USD) lifecycle events minus lifecycle event payment for pit latrine
+
+    annual_mass_nutrients = 365 * UDDT_users * UDDT_qty * (nutrients.N_rec_U_T_S_urine + nutrients.P_rec_U_T_S_urine
+                                                           + nutrients.K_rec_U_T_S_urine)  # (kg nutrients/year)
+
+    # (runs x 11) the frontier itself, giving the rate of return at any payment without solving again, e.g. at the
+    # nutrient_payment and nutrient_payment_UDDT_only sheets (python rate_of_return.py, see rate_of_return.py)
+    frontier = Frontier(mat_FINAL[0] + labor_FINAL[0], op_FINAL[0], events_FINAL[0], annual_mass_nutrients)
+
+    # (runs x payments) for the 101 payment values ($0 to $5.00 increments of $0.05), from the frontier
+    RoR_frontier_FINAL = pd.DataFrame(frontier_rates(frontier, nutrient_payment_range.nutrient_payment),
+                                      index=mat_cost.index)
+    RoR_frontier_FINAL.columns = [nutrient_payment_range.nutrient_payment]
+    writer.write('Sheet1', RoR_frontier_FINAL)
+    writer.write('frontier', frontier_table(frontier, mat_cost.index))
+
+    # ~~~~~~~RATE OF RETURN WITH PARTIAL AND CAPPED AID PAYMENTS~~~~~~~
+    policy_frontier = Frontier(mat_FINAL[1:] + labor_FINAL[1:], op_FINAL[1:], events_FINAL[1:],
+                               annual_mass_nutrients)
+    writer.write('aid_policy_frontier', frontier_table(policy_frontier, mat_cost.index))
 
 writer.save()
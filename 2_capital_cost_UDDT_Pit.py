@@ -9,113 +9,49 @@
 
 # ~~~~~~~IMPORT DATA AND FILES NECESSARY~~~~~~~
 
-import pandas as pd  # import pandas for matrix data manipulation
+import numpy as np
+from registry import load_registry  # compiled input_data_file.xlsx
+from intermediates import ResultsWriter, read_results, run_chunks  # columnar results handed between the scripts
+from capital_cost import capital_costs, detailed_material_costs, write_material_costs  # batched cost kernels
 
-construction_material_quantities = pd.read_excel('input_data_file.xlsx', sheetname="material_quantities")
-construction_material_unit_costs_UNCERTAINTY = pd.read_excel('OUTPUT_uncertainty_ranges.xlsx',
-                                                             sheetname="material_unit_costs")
+input_data = load_registry('input_data_file.xlsx')
 
-material_reuse = pd.read_excel('OUTPUT_uncertainty_ranges.xlsx', sheetname="material_reuse_ratio")
-construction_material_reuse_quantities = pd.read_excel('input_data_file.xlsx', sheetname="reuse_quantities")
+construction_material_quantities = input_data.sheet('material_quantities')
+construction_material_reuse_quantities = input_data.sheet('reuse_quantities')
 
 # ~~~~~~~CONSTANTS~~~~~~~
 
 usd_to_ugx = 3693.8  # UGX to USD conversion as of August 7, 2018
 N_runs = 10000
+detailed_cost_dtype = np.float64  # np.float32 halves the size of RESULTS_detailed_material_costs
 
-# ~~~~~~~CALCULATING MATERIAL COSTS FOR UDDT AND PIT LATRINE~~~~~~~
+writer0 = ResultsWriter('RESULTS_UDDT_Pit_capital_costs')
+writer1 = ResultsWriter('RESULTS_detailed_material_costs')
 
-matrix_shape_cost = construction_material_unit_costs_UNCERTAINTY.shape  # [0]= number of rows and [1]= number of columns
-writer0 = pd.ExcelWriter('RESULTS_UDDT_Pit_capital_costs.xlsx', engine='xlsxwriter')
-intervention_material_cost_final = pd.DataFrame()
+# one block of runs at a time (see intermediates.run_chunks), each block appended to the results
+for runs in run_chunks(N_runs, 'OUTPUT_uncertainty_ranges'):
+    construction_material_unit_costs_UNCERTAINTY = read_results('OUTPUT_uncertainty_ranges', 'material_unit_costs',
+                                                                runs=runs)
+    material_reuse = read_results('OUTPUT_uncertainty_ranges', 'material_reuse_ratio', runs=runs)
 
-# dataframe for construction material quantities
+    # ~~~~~~~CALCULATING MATERIAL COSTS FOR UDDT AND PIT LATRINE~~~~~~~
 
-for j in range(N_runs):
-    matrix_shape = construction_material_quantities.shape  # [0] is number of rows and [1] is number of columns
+    # sum-product of material quantities (reuse-adjusted by each run's material reuse ratio) and unit costs for each
+    # intervention, all runs of the block at once
+    intervention_material_cost_final = capital_costs(construction_material_unit_costs_UNCERTAINTY, material_reuse,
+                                                     construction_material_quantities,
+                                                     construction_material_reuse_quantities)
 
-    construction_material_unit_costs = construction_material_unit_costs_UNCERTAINTY.iloc[j, :]
-    construction_material_unit_costs = pd.DataFrame([construction_material_unit_costs])
-    construction_material_unit_costs.columns = [k for k in range(construction_material_unit_costs.shape[1])]
-    construction_material_unit_costs = construction_material_unit_costs.transpose()
-    construction_material_unit_costs = construction_material_unit_costs.fillna(0)
+    writer0.write('capital_cost', intervention_material_cost_final)
 
-    material_reuse_ratio = material_reuse.iloc[j]
-    material_reuse_ratio = list(material_reuse_ratio)
-    material_reuse_ratio = str(material_reuse_ratio)[1:-1]
-    material_reuse_ratio = float(material_reuse_ratio)
+    # ~~~~~~~CALCULATING INDIVIDUAL DETAILED MATERIAL COSTS PER INTERVENTION~~~~~~~
 
-    material_reuse_ratio_ALL = []
+    # cost of each material for each run and intervention (runs x materials x interventions), one sheet per
+    # intervention
+    detailed_material_cost_FINAL, material_names, tab_names = detailed_material_costs(
+        construction_material_unit_costs_UNCERTAINTY, construction_material_quantities, dtype=detailed_cost_dtype)
+    write_material_costs(writer1, detailed_material_cost_FINAL, material_names, tab_names,
+                         construction_material_unit_costs_UNCERTAINTY.index)
 
-    for p in range(0, matrix_shape[0]):
-        ratio = material_reuse_ratio
-        material_reuse_ratio_ALL.append(ratio)
-
-    material_reuse_ratio_final = pd.DataFrame([material_reuse_ratio_ALL])
-    material_reuse_ratio_final = material_reuse_ratio_final.transpose()
-
-    # for loop calculates the sum-product of material quantities and unit costs for each intervention
-
-    column_names = list(construction_material_quantities)  # call column names of construction material csv
-    column_names = column_names[3:]  # indexing to select intervention names (ignore unit, material name, etc.)
-    total_material_cost = []  # open matrix to store total material costs for each intervention scenario
-
-    for i in range(3, matrix_shape[1]):  # index 3 is first location of intervention data
-
-        materials_to_reuse = construction_material_reuse_quantities.iloc[0:matrix_shape[0], i]
-        materials_to_reuse = pd.DataFrame([materials_to_reuse])
-        materials_to_reuse = materials_to_reuse.transpose()
-        materials_to_reuse.columns = [0]
-
-        reuse_ratio_new = material_reuse_ratio_final.multiply(materials_to_reuse, axis='columns')
-        reuse_ratio_new = reuse_ratio_new.fillna(1)
-
-        material_quantity = construction_material_quantities.iloc[0:matrix_shape[0], i]
-        material_quantity = pd.DataFrame([material_quantity])
-        material_quantity = material_quantity.transpose()
-        material_quantity.columns = [0]
-
-        material_quantity_with_reuse = reuse_ratio_new.multiply(material_quantity, axis='columns')
-        material_quantity_with_reuse.columns = [j]
-
-        cost1 = construction_material_unit_costs.multiply(material_quantity_with_reuse, axis='columns')
-        cost2 = cost1.sum()
-        cost2 = list(cost2)
-        cost2 = str(cost2)[1:-1]
-        cost2 = float(cost2)
-
-        total_material_cost.append(cost2)
-
-    intervention_material_cost = pd.DataFrame([total_material_cost], columns=column_names)
-    intervention_material_cost_final = pd.concat([intervention_material_cost_final,
-                                                  intervention_material_cost]).reset_index(drop=True)
-
-intervention_material_cost_final.to_excel(writer0, sheet_name='capital_cost')
-
-# ~~~~~~~CALCULATING INDIVIDUAL DETAILED MATERIAL COSTS PER INTERVENTION~~~~~~~
-
-writer1 = pd.ExcelWriter('RESULTS_detailed_material_costs.xlsx', engine='xlsxwriter')
-matrix_shape = construction_material_quantities.shape  # [0] is number of rows and [1] is number of columns
-
-for i in range(3, matrix_shape[1]):  # index 3 is first location of intervention data
-    detailed_material_cost = []
-    detailed_material_cost_FINAL = pd.DataFrame()
-    column_names = list(construction_material_unit_costs_UNCERTAINTY)  # call column names of materials
-    tab_names = list(construction_material_quantities)  # call column names of construction material csv
-
-    for j in range(N_runs):
-        construction_material_unit_costs = construction_material_unit_costs_UNCERTAINTY.iloc[j, :]
-        construction_material_unit_costs = pd.DataFrame([construction_material_unit_costs])
-        construction_material_unit_costs.columns = [k for k in range(construction_material_unit_costs.shape[1])]
-        construction_material_unit_costs = construction_material_unit_costs.transpose()
-        construction_material_unit_costs = construction_material_unit_costs.fillna(0)
-
-        detailed_material_cost = construction_material_quantities.iloc[0:matrix_shape[0], i] * \
-            construction_material_unit_costs.iloc[0:matrix_shape[0], 0]
-        detailed_material_cost = pd.DataFrame([detailed_material_cost])
-        detailed_material_cost_FINAL = pd.concat([detailed_material_cost_FINAL,
-                                                  detailed_material_cost]).reset_index(drop=True)
-    detailed_material_cost_FINAL.columns = column_names
-    detailed_material_cost_FINAL.to_excel(writer1, sheet_name=tab_names[i])
-
-writer1.save()
\ No newline at end of file
+writer0.save()
+writer1.save()
@@ -9,49 +9,33 @@
 
 # ~~~~~~~IMPORT DATA AND FILES NECESSARY~~~~~~~
 
-import pandas as pd  # import pandas for matrix data manipulation
-material_cost = pd.read_excel('RESULTS_UDDT_Pit_capital_costs.xlsx', sheetname='capital_cost')
-labor_cost_ratio = pd.read_excel('OUTPUT_uncertainty_ranges.xlsx', sheetname='labor_cost_ratio')
-op_cost_ratio = pd.read_excel('OUTPUT_uncertainty_ranges.xlsx', sheetname='op_cost_ratio')
-maint_cost_ratio = pd.read_excel('OUTPUT_uncertainty_ranges.xlsx', sheetname='maint_cost_ratio')
+from intermediates import ResultsWriter, read_results, run_chunks  # columnar results handed between the scripts
+from bundles import bundle_costs, bundle_table  # technology bundles priced for all runs at once
 
 # ~~~~~~~CONSTANTS~~~~~~~
 N_runs = 10000
 usd_to_ugx = 3693.8  # UGX to USD conversion as of August 7, 2018
 
-writer = pd.ExcelWriter('RESULTS_UDDT_pit_costs.xlsx')
-pit_UDDT_cost_FINAL = pd.DataFrame()
+technology_bundles = ('pit = D402 + D403',  # pit latrine: slab (D402) and pit (D403)
+                      'UDDT = D406')
 
-for i in range(N_runs):
-    cap_UDDT = material_cost.D406[i]/usd_to_ugx
-    labor_UDDT = cap_UDDT * labor_cost_ratio.D406[i]
-    op_UDDT = cap_UDDT * op_cost_ratio.D406[i]
-    maint_UDDT = cap_UDDT * maint_cost_ratio.D406[i]
+writer = ResultsWriter('RESULTS_UDDT_pit_costs')
 
-    cap_slab = material_cost.D402[i]/usd_to_ugx
-    labor_slab = cap_slab * labor_cost_ratio.D402[i]
-    op_slab = cap_slab * op_cost_ratio.D402[i]
-    maint_slab = cap_slab * maint_cost_ratio.D402[i]
+# one block of runs at a time (see intermediates.run_chunks), each block appended to the results
+for runs in run_chunks(N_runs, 'RESULTS_UDDT_Pit_capital_costs'):
+    material_cost = read_results('RESULTS_UDDT_Pit_capital_costs', 'capital_cost', runs=runs)
+    labor_cost_ratio = read_results('OUTPUT_uncertainty_ranges', 'labor_cost_ratio', runs=runs)
+    op_cost_ratio = read_results('OUTPUT_uncertainty_ranges', 'op_cost_ratio', runs=runs)
+    maint_cost_ratio = read_results('OUTPUT_uncertainty_ranges', 'maint_cost_ratio', runs=runs)
 
-    cap_pit = material_cost.D403[i]/usd_to_ugx
-    labor_pit = cap_pit * labor_cost_ratio.D403[i]
-    op_pit = cap_pit * op_cost_ratio.D403[i]
-    maint_pit = cap_pit * maint_cost_ratio.D403[i]
+    # capital, labor, operation, and maintenance costs of every bundle for the runs (runs x bundles x cost categories)
+    bundle_cost_FINAL, bundle_names = bundle_costs(material_cost, {'labor': labor_cost_ratio, 'op': op_cost_ratio,
+                                                                   'maint': maint_cost_ratio},
+                                                   technology_bundles, usd_to_ugx)
+    pit_UDDT_cost_FINAL = bundle_table(bundle_cost_FINAL, bundle_names, material_cost.index)
 
-    cap_pit_total = cap_slab + cap_pit
-    labor_pit_total = labor_slab + labor_pit
-    op_pit_total = op_slab + op_pit
-    maint_pit_total = maint_slab + maint_pit
+    writer.write('Sheet1', pit_UDDT_cost_FINAL)
 
-    output = pd.DataFrame([cap_pit_total, labor_pit_total, op_pit_total, maint_pit_total, cap_UDDT, labor_UDDT,
-                           op_UDDT, maint_UDDT])
-    output = output.transpose()
-    pit_UDDT_cost_FINAL = pd.concat([pit_UDDT_cost_FINAL, output]).reset_index(drop=True)
-
-pit_UDDT_cost_FINAL.columns = ('cap_pit', 'labor_pit', 'op_pit', 'maint_pit', 'cap_UDDT', 'labor_UDDT',
-                               'op_UDDT', 'maint_UDDT')
-
-pit_UDDT_cost_FINAL.to_excel(writer)
 writer.save()
 
 
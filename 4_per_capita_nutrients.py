@@ -9,138 +9,52 @@
 
 # ~~~~~~~IMPORT DATA AND FILES NECESSARY~~~~~~~
 
-import pandas as pd  # import pandas for matrix data manipulation
-
-triangle_parameter = pd.read_excel('OUTPUT_uncertainty_ranges.xlsx', sheetname='RR_triangle')
-uniform_parameter = pd.read_excel('OUTPUT_uncertainty_ranges.xlsx', sheetname='RR_uniform')
-nutrient_rec_efficiency = pd.read_excel('OUTPUT_uncertainty_ranges.xlsx', sheetname='nutrient_recovery_efficiency')
+from intermediates import ResultsWriter, read_results, run_chunks  # columnar results handed between the scripts
+from nutrients import excreted_nutrients, recovered_nutrients, nutrient_table, profile_tables  # N, P, K mass balance
 
 # ~~~~~~~CONSTANTS~~~~~~~
 
 N_runs = 10000
 
-# ~~~~~~~CALCULATING PER CAPITA NUTRIENT EXCRETION IN URINE~~~~~~~
-
-writer = pd.ExcelWriter('RESULTS_per_capita_nutrients.xlsx', engine='xlsxwriter')
-nutrients_FINAL = pd.DataFrame()
-UDDT_nutrients_FINAL = pd.DataFrame()
-ALL_nutrients_FINAL = pd.DataFrame()
-
-for i in range(N_runs):
-
-    # Per capita food intake and food waste parameters
-    e_cal = uniform_parameter.e_cal[i]  # (kcal/cap/d) annual caloric intake
-    p_veg = uniform_parameter.p_veg[i]  # (g/cap/d) vegetable derived protein intake
-    p_anim = uniform_parameter.p_anim[i]  # (g/cap/d) animal derived protein intake
-    p_tot = p_veg + p_anim  # (g/cap/d) total protein intake
-    loss_cons = triangle_parameter.loss_cons[i]  # fraction of food wasted due to consumption losses at household
-
-    # Nutrient content in protein/calorie parameters
-    N_prot = uniform_parameter.N_prot[i]  # fraction of N contained in total protein
-    P_prot_v = triangle_parameter.P_prot_v[i]  # fraction of P contained in vegetable derived protein
-    P_prot_a = triangle_parameter.P_prot_a[i]  # fraction of P contained in animal derived protein
-    K_cal = uniform_parameter.K_cal[i]  # (kg K/kcal) potassium content relative to caloric intake
-
-    # Fraction of nutrients excreted
-    N_exc = uniform_parameter.N_exc[i]  # fraction of N excreted in urine and feces per intake
-    P_exc = uniform_parameter.P_exc[i]  # fraction of P excreted in urine and feces per intake
-    K_exc = uniform_parameter.K_exc[i]  # fraction of K excreted in urine and feces per intake
-
-    # Fraction of nutrients in urine
-    N_urine = triangle_parameter.N_urine[i]  # (%) percent of total nitrogen excreted in urine
-    P_urine = triangle_parameter.P_urine[i]  # (%) percent of total phosphorus excreted in urine
-    K_urine = triangle_parameter.K_urine[i]  # (%) percent of total potassium excreted in urine
-
-    # Per capita nitrogen excreted in urine and feces
-    N_exc_tot = (p_tot * N_prot * (1 - loss_cons) * N_exc)/1000  # (kg N/cap/d total)
-    N_exc_urine = N_exc_tot * (N_urine / 100)  # (kg N/cap/d in urine)
-    N_exc_feces = N_exc_tot - N_exc_urine  # (kg N/cap/d in feces)
-
-    # Per capita phosphorus excreted in urine and feces
-    P_exc_tot = (((P_prot_v * p_veg) + (P_prot_a * p_anim)) * (1 - loss_cons) * P_exc)/1000  # (kg P/cap/d total)
-    P_exc_urine = P_exc_tot * (P_urine / 100)  # (kg P/cap/d in urine)
-    P_exc_feces = P_exc_tot - P_exc_urine  # (kg P/cap/d in feces)
-
-    # Per capita potassium excreted in urine and feces
-    K_exc_tot = e_cal * K_cal * (1 - loss_cons) * K_exc  # (kg K/cap/d total)
-    K_exc_urine = K_exc_tot * (K_urine / 100)  # (kg K/cap/d in urine)
-    K_exc_feces = K_exc_tot - K_exc_urine  # (kg K/cap/d in feces)
-
-    output = pd.DataFrame([N_exc_tot, N_exc_urine, N_exc_feces, P_exc_tot, P_exc_urine, P_exc_feces, K_exc_tot,
-                           K_exc_urine, K_exc_feces])
-
-    output = output.transpose()
-    nutrients_FINAL = pd.concat([nutrients_FINAL, output]).reset_index(drop=True)
+# Diet profiles evaluated against the same samples (e.g. districts or settlements with different diets): None, or a
+# table with one row per profile and columns among e_cal, p_veg, p_anim, loss_cons; a value replaces the sampled
+# one in every run, an empty cell (NaN) keeps the samples. Each profile adds a sheet diet_profile_<name> to the
+# results. For example, a pandas DataFrame with e_cal 1900 and 2300 and p_anim 8 and 18 indexed by 'settlement' and
+# 'district' evaluates a settlement and a district diet, keeping the sampled p_veg and loss_cons.
+diet_profiles = None
 
-    # Accounting for Nutrient Losses in UDDT, Transport, and Storage
+writer = ResultsWriter('RESULTS_per_capita_nutrients')
 
-    N_rec_after_UDDT_tot = N_exc_tot * (nutrient_rec_efficiency.UDDT_N[i]/100)  # (kg N/cap/d)
-    N_rec_after_UDDT_urine = N_exc_urine * (nutrient_rec_efficiency.UDDT_N[i]/100)  # (kg N/cap/d)
-    N_rec_after_UDDT_feces = N_exc_feces * (nutrient_rec_efficiency.UDDT_N[i]/100)  # (kg N/cap/d)
+# one block of runs at a time (see intermediates.run_chunks), each block appended to the results
+for runs in run_chunks(N_runs, 'OUTPUT_uncertainty_ranges'):
+    triangle_parameter = read_results('OUTPUT_uncertainty_ranges', 'RR_triangle', runs=runs)
+    uniform_parameter = read_results('OUTPUT_uncertainty_ranges', 'RR_uniform', runs=runs)
+    nutrient_rec_efficiency = read_results('OUTPUT_uncertainty_ranges', 'nutrient_recovery_efficiency', runs=runs)
 
-    N_rec_UDDT_transport_storage_tot = N_rec_after_UDDT_tot * (1 - (nutrient_rec_efficiency.transport_N[i]/100)) \
-                                       * (1 - (nutrient_rec_efficiency.storage_N[i]/100))  # (kg N/cap/d)
-    N_rec_UDDT_transport_strange_urine = N_rec_after_UDDT_urine * (1 - (nutrient_rec_efficiency.transport_N[i]/100)) \
-                                         * (1 - (nutrient_rec_efficiency.storage_N[i]/100))  # (kg N/cap/d)
-    N_rec_UDDT_transport_storage_feces = N_rec_after_UDDT_feces * (1 - (nutrient_rec_efficiency.transport_N[i]/100)) \
-                                         * (1 - (nutrient_rec_efficiency.storage_N[i]/100))  # (kg N/cap/d)
+    # ~~~~~~~CALCULATING PER CAPITA NUTRIENT EXCRETION IN URINE~~~~~~~
 
-    P_rec_after_UDDT_tot = P_exc_tot * (nutrient_rec_efficiency.UDDT_P[i]/100)  # (kg P/cap/d)
-    P_rec_after_UDDT_urine = P_exc_urine * (nutrient_rec_efficiency.UDDT_P[i]/100)  # (kg P/cap/d)
-    P_rec_after_UDDT_feces = P_exc_feces * (nutrient_rec_efficiency.UDDT_P[i]/100)  # (kg P/cap/d)
+    # (runs x nutrients x fractions) arrays (kg N, P, or K/cap/d): excreted in total, urine, and feces, then recovered
+    # after nutrient losses in the UDDT, and after losses in the UDDT, transport, and storage (see nutrients.py)
+    excreted = excreted_nutrients(triangle_parameter, uniform_parameter)
+    after_UDDT, after_U_T_S = recovered_nutrients(excreted, nutrient_rec_efficiency)
 
-    P_rec_UDDT_transport_storage_tot = P_rec_after_UDDT_tot * (1 - (nutrient_rec_efficiency.transport_P[i]/100)) \
-                                       * (1 - (nutrient_rec_efficiency.storage_P[i]/100))  # (kg P/cap/d)
-    P_rec_UDDT_transport_strange_urine = P_rec_after_UDDT_urine * (1 - (nutrient_rec_efficiency.transport_P[i]/100)) \
-                                         * (1 - (nutrient_rec_efficiency.storage_P[i]/100))  # (kg P/cap/d)
-    P_rec_UDDT_transport_storage_feces = P_rec_after_UDDT_feces * (1 - (nutrient_rec_efficiency.transport_P[i]/100)) \
-                                         * (1 - (nutrient_rec_efficiency.storage_P[i]/100))  # (kg P/cap/d)
+    nutrients_FINAL = nutrient_table(excreted, '%s_exc_%s', triangle_parameter.index)
+    UDDT_nutrients_FINAL = nutrient_table(after_UDDT, '%s_rec_UDDT_%s', triangle_parameter.index)
+    ALL_nutrients_FINAL = nutrient_table(after_U_T_S, '%s_rec_U_T_S_%s', triangle_parameter.index)
 
-    K_rec_after_UDDT_tot = K_exc_tot * (nutrient_rec_efficiency.UDDT_K[i]/100)  # (kg K/cap/d)
-    K_rec_after_UDDT_urine = K_exc_urine * (nutrient_rec_efficiency.UDDT_K[i]/100)  # (kg K/cap/d)
-    K_rec_after_UDDT_feces = K_exc_feces * (nutrient_rec_efficiency.UDDT_K[i]/100)  # (kg K/cap/d)
+    writer.write('per_capita_nutrients', nutrients_FINAL)
+    writer.write('rec_nutrients_after_UDDT', UDDT_nutrients_FINAL)
+    writer.write('rec_nutrients_after_U_T_S', ALL_nutrients_FINAL)
 
-    K_rec_UDDT_transport_storage_tot = K_rec_after_UDDT_tot * (1 - (nutrient_rec_efficiency.transport_K[i]/100)) \
-                                       * (1 - (nutrient_rec_efficiency.storage_K[i]/100))  # (kg K/cap/d)
-    K_rec_UDDT_transport_strange_urine = K_rec_after_UDDT_urine * (1 - (nutrient_rec_efficiency.transport_K[i]/100)) \
-                                         * (1 - (nutrient_rec_efficiency.storage_K[i]/100))  # (kg K/cap/d)
-    K_rec_UDDT_transport_storage_feces = K_rec_after_UDDT_feces * (1 - (nutrient_rec_efficiency.transport_K[i]/100)) \
-                                         * (1 - (nutrient_rec_efficiency.storage_K[i]/100))  # (kg K/cap/d)
+    # ~~~~~~~DIET PROFILES~~~~~~~
 
-    output1 = pd.DataFrame([N_rec_after_UDDT_tot, N_rec_after_UDDT_urine, N_rec_after_UDDT_feces,
-                            P_rec_after_UDDT_tot, P_rec_after_UDDT_urine, P_rec_after_UDDT_feces,
-                            K_rec_after_UDDT_tot, K_rec_after_UDDT_urine, K_rec_after_UDDT_feces])
-
-    output1 = output1.transpose()
-
-    UDDT_nutrients_FINAL = pd.concat([UDDT_nutrients_FINAL, output1]).reset_index(drop=True)
-
-    output2 = pd.DataFrame([N_rec_UDDT_transport_storage_tot, N_rec_UDDT_transport_strange_urine,
-                            N_rec_UDDT_transport_storage_feces, P_rec_UDDT_transport_storage_tot,
-                            P_rec_UDDT_transport_strange_urine, P_rec_UDDT_transport_storage_feces,
-                            K_rec_UDDT_transport_storage_tot, K_rec_UDDT_transport_strange_urine,
-                            K_rec_UDDT_transport_storage_feces])
-
-    output2 = output2.transpose()
-
-    ALL_nutrients_FINAL = pd.concat([ALL_nutrients_FINAL, output2]).reset_index(drop=True)
-
-nutrients_FINAL.columns = ('N_exc_tot', 'N_exc_urine', 'N_exc_feces', 'P_exc_tot', 'P_exc_urine', 'P_exc_feces',
-                           'K_exc_tot', 'K_exc_urine', 'K_exc_feces')
-UDDT_nutrients_FINAL.columns = ('N_rec_UDDT_tot', 'N_rec_UDDT_urine', 'N_rec_UDDT_feces', 'P_rec_UDDT_tot',
-                                'P_rec_UDDT_urine', 'P_rec_UDDT_feces', 'K_rec_UDDT_tot', 'K_rec_UDDT_urine',
-                                'K_rec_UDDT_feces')
-ALL_nutrients_FINAL.columns = ('N_rec_U_T_S_tot', 'N_rec_U_T_S_urine', 'N_rec_U_T_S_feces', 'P_rec_U_T_S_tot',
-                               'P_rec_U_T_S_urine', 'P_rec_U_T_S_feces', 'K_rec_U_T_S_tot', 'K_rec_U_T_S_urine',
-                               'K_rec_U_T_S_feces')
-
-nutrients_FINAL.to_excel(writer, sheet_name='per_capita_nutrients')
-UDDT_nutrients_FINAL.to_excel(writer, sheet_name='rec_nutrients_after_UDDT')
-ALL_nutrients_FINAL.to_excel(writer, sheet_name='rec_nutrients_after_U_T_S')
+    # (profiles x runs x nutrients x fractions) arrays from one broadcast evaluation; all draws other than the intake
+    # parameters are shared by the profiles
+    if diet_profiles is not None:
+        profile_excreted = excreted_nutrients(triangle_parameter, uniform_parameter, diet_profiles)
+        profile_after_UDDT, profile_after_U_T_S = recovered_nutrients(profile_excreted, nutrient_rec_efficiency)
+        for profile, table in profile_tables(diet_profiles, profile_excreted, profile_after_UDDT, profile_after_U_T_S,
+                                             triangle_parameter.index).items():
+            writer.write('diet_profile_%s' % profile, table)
 
 writer.save()
-
-
-
-
-
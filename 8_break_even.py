@@ -0,0 +1,238 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This script, 8_break_even.py, calculates the break even resource payment necessary to incentivize urine diversion
+# dry toilet construction and urine treatment for every system configuration (Scenario 1: simple system, Scenario
+# 2: advanced system) and financing scenario (Start-up: pit latrine payment from aid agency, Self-Sustaining: no aid
+# payment). The costs of every component are calculated once and shared by all scenarios, which are evaluated
+# together (see scenarios.py). Partial and capped aid payments for the pit latrine are evaluated for both systems as
+# well (see aid.py).
+
+# ~~~~~~~IMPORT DATA AND FILES NECESSARY~~~~~~~
+
+import numpy as np  # import NumPy library for array calculations
+import pandas as pd  # import pandas for matrix data manipulation
+from intermediates import ResultsWriter, read_results, run_chunks  # columnar results handed between the scripts
+from tank_sizing import COMMUNITY_TANKS, SIMPLE_TANKS, tank_quantities, tank_sizing  # memoized tank sizing
+from lifecycle import component_lifetimes  # sampled lifetimes of each component
+from scenarios import COMPONENTS, component_costs, break_even  # all scenarios in one vectorized call
+from aid import aid_policies  # partial and capped aid agency payments
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+N_runs = 10000
+horizon = 8  # (years) project duration of the break even analysis
+UDDT_users = 40  # (people) number of people using a UDDT unit (with 2 toilets)
+UDDT_qty = 500  # assume 1,000 toilets and UDDT has 2 per unit
+pit_qty = 500  # assume 1,000 toilets and pit has 1 per unit
+currency_conversion = 3693.8  # UGX to USD conversion as of August 7, 2018
+urine_storage_time = 80  # (days) simple system
+tanks_per_land = 154  # number of tanks per 50'x100' plot of land
+
+# (system, financing, results, sheet) of every scenario; systems and financing rules are defined in scenarios.py
+break_even_scenarios = (('Scenario2', 'subsidized', 'RESULTS_break_even_Scenario2_subsidized_July31',
+                         'break_even_scenario'),
+                        ('Scenario2', 'unsubsidized', 'RESULTS_break_even_Scenario2_unsubsidized_July31',
+                         'break_even_unsubsidized'),
+                        ('Scenario1', 'subsidized', 'RESULTS_break_even_Scenario1_subsidized_July31',
+                         'break_even_total'),
+                        ('Scenario1_tanks', 'unsubsidized', 'RESULTS_break_even_Scenario1_subsidized_July31',
+                         'break_even_tank'),
+                        ('Scenario1', 'unsubsidized', 'RESULTS_break_even_Scenario1_unsubsidized_July31',
+                         'break_even_total'))
+
+# aid agency payment policies for the pit latrine: share of its costs paid (0% to 100%) and the most paid toward the
+# construction of each pit latrine (USD/unit, None for no cap), evaluated for both systems
+aid_shares = np.arange(0, 101, 5) / 100
+aid_caps = (None, 250, 500)
+aid_systems = ('Scenario1', 'Scenario2')
+
+# positive costs indicate a cost to the contractor/NGO; the aid agency payments are applied in scenarios.py
+
+writer = ResultsWriter('RESULTS_cap_op_cons_maint_costs_FilterReuse_July31')
+
+writers = {}
+for system, financing, results, sheet in break_even_scenarios:
+    if results not in writers:
+        writers[results] = ResultsWriter(results)
+
+policies = aid_policies(aid_shares, aid_caps, 'pit')
+aid_writer = ResultsWriter('RESULTS_break_even_aid_policies')
+aid_writer.write('policies', pd.DataFrame({'share': [policy.share for policy in policies],
+                                           'cap': [np.nan if policy.cap is None else policy.cap
+                                                   for policy in policies]}))
+
+# one block of runs at a time (see intermediates.run_chunks), each block appended to the results
+for runs in run_chunks(N_runs, 'OUTPUT_uncertainty_ranges'):
+    UDDT_pit_cost = read_results('RESULTS_UDDT_pit_costs', runs=runs)  # import costs related to pit latrine and UDDT
+    RR_material_cost = read_results('RESULTS_RR_costs_FilterReuse', 'capital_cost', runs=runs)  # material costs (USD)
+    RR_labor_cost = read_results('RESULTS_RR_costs_FilterReuse', 'labor_cost', runs=runs)  # labor costs (USD)
+    RR_op_cost = read_results('RESULTS_RR_costs_FilterReuse', 'op_cost', runs=runs)  # operation costs (USD)
+    RR_maint_cost = read_results('RESULTS_RR_costs_FilterReuse', 'maint_cost', runs=runs)  # maint costs (USD)
+    RR_struvite_consumable_cost = read_results('RESULTS_RR_costs_FilterReuse', 'struvite_cost', runs=runs)  # (USD)
+    RR_ion_exchange_consumable_cost = read_results('RESULTS_RR_costs_FilterReuse', 'ion_exchange_cost',
+                                                   runs=runs)  # (USD)
+    recovered_nutrients = read_results('RESULTS_RR_costs_FilterReuse', 'nutrients_recovered', runs=runs)  # (kg/yr)
+    # total nutrients recovered at the end of the treatment cycle for 20,000 people
+    nutrients = read_results('RESULTS_per_capita_nutrients', 'rec_nutrients_after_U_T_S', runs=runs)  # (kg/cap/day)
+
+    tank_maint_ratio = read_results('OUTPUT_uncertainty_ranges', 'maint_cost_ratio', runs=runs)
+    tank_op_ratio = read_results('OUTPUT_uncertainty_ranges', 'op_cost_ratio', runs=runs)
+    tank_labor_ratio = read_results('OUTPUT_uncertainty_ranges', 'labor_cost_ratio', runs=runs)
+    tank_cost = read_results('OUTPUT_uncertainty_ranges', 'RR_uniform', runs=runs)  # (USD/tank), land lease (USD/yr)
+    urine_volume = read_results('OUTPUT_uncertainty_ranges', 'RR_triangle', runs=runs)  # (L/cap/d)
+
+    DCA_parameters = read_results('OUTPUT_uncertainty_ranges', 'DCA_parameters', runs=runs)  # tax and discount rates
+    tech_life_span = read_results('OUTPUT_uncertainty_ranges', 'tech_life_span', runs=runs)  # (years) lifetimes
+    tech_maint_time = read_results('OUTPUT_uncertainty_ranges', 'tech_maint_time', runs=runs)  # (years) maintenance
+
+    # community storage tanks (emptied every 3 days) of the advanced system and the plots of land they take
+    community_tanks = tank_quantities(urine_volume.urine_volume,
+                                      COMMUNITY_TANKS._replace(tanks_per_land=tanks_per_land))
+
+    # 1000 L urine storage tanks for the 80-day volume of the simple system, their costs, and the plots of land they
+    # take
+    simple_tanks = tank_sizing({'RR_triangle': urine_volume, 'RR_uniform': tank_cost,
+                                'labor_cost_ratio': tank_labor_ratio, 'op_cost_ratio': tank_op_ratio,
+                                'maint_cost_ratio': tank_maint_ratio},
+                               SIMPLE_TANKS._replace(users=UDDT_users, toilets=UDDT_qty, days=urine_storage_time,
+                                                     tanks_per_land=tanks_per_land))
+
+    # ~~~~~~~COSTS OF EVERY COMPONENT (SHARED BY ALL SCENARIOS)~~~~~~~
+
+    # Capital Costs (Total to Treat 20,000 People Reference Flow)
+
+    material_pit = UDDT_pit_cost.cap_pit * pit_qty  # (USD) total material cost of 1,000 pit latrine units
+    material_UDDT = UDDT_pit_cost.cap_UDDT * UDDT_qty  # (USD) total material cost of 500 UDDT units
+    material_off_site_tanks = RR_material_cost.total_cap_cost_off_site_tanks  # (USD) total material cost tanks
+    material_on_site_tanks = RR_material_cost.total_cap_cost_on_site_tanks  # (USD) total material cost tanks
+    material_struvite = RR_material_cost.total_cap_cost_struvite  # (USD) total struvite capital costs
+    material_ion_exchange = RR_material_cost.total_cap_cost_ion_exchange  # (USD) total ion exchange capital costs
+    material_simple_tanks = simple_tanks.capital  # (USD) 1000 L urine storage tanks for the 80-day volume
+
+    labor_pit = UDDT_pit_cost.labor_pit * pit_qty  # (USD) construction labor cost of 1,000 pit latrine units
+    labor_UDDT = UDDT_pit_cost.labor_UDDT * UDDT_qty  # (USD) total construction labor cost of 500 UDDT units
+    labor_off_site_tanks = RR_labor_cost.labor_cost_off_site_tanks  # (USD) total construction labor cost tanks
+    labor_on_site_tanks = RR_labor_cost.labor_cost_on_site_tanks  # (USD) total construction labor cost tanks
+    labor_struvite = RR_labor_cost.labor_cost_struvite  # (USD) total struvite construction labor costs
+    labor_ion_exchange = RR_labor_cost.labor_cost_ion_exchange  # (USD) ion exchange construction labor costs
+    labor_simple_tanks = simple_tanks.labor  # (USD)
+
+    # Ongoing Costs (Ei)
+
+    # Operation Costs for Equipment/Capital
+    annual_op_pit = UDDT_pit_cost.op_pit * pit_qty  # (USD/yr) annual operation cost of 1,000 pit latrines
+    annual_op_UDDT = UDDT_pit_cost.op_UDDT * UDDT_qty  # (USD/yr) annual operation cost of 500 UDDT units
+    annual_op_off_site_tanks = RR_op_cost.op_cost_off_site_tanks  # (USD/yr) annual op cost of off site tanks
+    annual_op_on_site_tanks = RR_op_cost.op_cost_on_site_tanks  # (USD/yr) annual op cost of on site tanks
+    annual_op_cost_struvite = RR_op_cost.op_cost_struvite  # (USD/yr) annual op cost of struvite capital
+    annual_op_cost_ion_exchange = RR_op_cost.op_cost_ion_exchange  # (USD/yr) op cost of ion exchange capital
+    annual_op_simple_tanks = simple_tanks.op  # (USD/yr)
+
+    # Land Costs for Off Site Tanks
+    annual_land_off_site_tanks = community_tanks.land_plots * tank_cost.lease_50_100  # (USD/yr)
+    annual_land_simple_tanks = simple_tanks.land  # (USD/yr) lease of the plots of land the tanks take
+
+    # Annual Consumable Costs for Struvite and Ion Exchange Processes
+    annual_con_struvite_filter = RR_struvite_consumable_cost.cons_annual_filter_bag_cost  # (USD/yr) filter bags
+    annual_con_struvite_MgOH2 = RR_struvite_consumable_cost.cons_annual_MgOH2_cost  # (USD/yr) Mg source cost
+    annual_con_ion_exchange_H2SO4 = RR_ion_exchange_consumable_cost.cons_annual_cost_H2SO4  # (USD/yr) H2SO4 cost
+    annual_con_ion_exchange_resin = RR_ion_exchange_consumable_cost.cons_annual_cost_resin  # (USD/yr) resin cost
+
+    # Maintenance Costs for Equipment/Capital (Maintenance Occurs at 1/2 Lifetime)
+    maint_pit = UDDT_pit_cost.maint_pit * pit_qty  # (USD) maintenance cost of 1,000 pit latrines
+    maint_UDDT = UDDT_pit_cost.maint_UDDT * UDDT_qty  # (USD) maintenance (at 1/2 lifetime) cost of 500 UDDT units
+    maint_off_site_tanks = RR_maint_cost.maint_cost_off_site_tanks  # (USD) maintenance cost of tanks
+    maint_on_site_tanks = RR_maint_cost.maint_cost_on_site_tanks  # (USD) maintenance cost of tanks
+    maint_struvite = RR_maint_cost.maint_cost_struvite  # (USD) maintenance cost of struvite capital
+    maint_ion_exchange = RR_maint_cost.maint_cost_ion_exchange  # (USD) maintenance cost of ion exchange capital
+    maint_simple_tanks = simple_tanks.maint  # (USD)
+
+    costs = component_costs({'pit': material_pit, 'UDDT': material_UDDT, 'off_site_tanks': material_off_site_tanks,
+                             'on_site_tanks': material_on_site_tanks, 'struvite': material_struvite,
+                             'ion_exchange': material_ion_exchange, 'simple_tanks': material_simple_tanks},
+                            {'pit': labor_pit, 'UDDT': labor_UDDT, 'off_site_tanks': labor_off_site_tanks,
+                             'on_site_tanks': labor_on_site_tanks, 'struvite': labor_struvite,
+                             'ion_exchange': labor_ion_exchange, 'simple_tanks': labor_simple_tanks},
+                            {'pit': annual_op_pit, 'UDDT': annual_op_UDDT,
+                             'off_site_tanks': annual_op_off_site_tanks + annual_land_off_site_tanks,
+                             'on_site_tanks': annual_op_on_site_tanks,
+                             'struvite': annual_op_cost_struvite + annual_con_struvite_filter
+                             + annual_con_struvite_MgOH2,
+                             'ion_exchange': annual_op_cost_ion_exchange + annual_con_ion_exchange_H2SO4
+                             + annual_con_ion_exchange_resin,
+                             'simple_tanks': annual_op_simple_tanks + annual_land_simple_tanks},
+                            {'pit': maint_pit, 'UDDT': maint_UDDT, 'off_site_tanks': maint_off_site_tanks,
+                             'on_site_tanks': maint_on_site_tanks, 'struvite': maint_struvite,
+                             'ion_exchange': maint_ion_exchange, 'simple_tanks': maint_simple_tanks},
+                            component_lifetimes(tech_life_span, COMPONENTS, 'tech_life_span'),  # (years)
+                            component_lifetimes(tech_maint_time, COMPONENTS, 'tech_maint_time'),  # (years)
+                            {'pit': pit_qty, 'UDDT': UDDT_qty})  # (units)
+
+    material_cost_FINAL = pd.DataFrame({'material_pit': material_pit, 'material_UDDT': material_UDDT,
+                                        'material_off_site_tanks': material_off_site_tanks,
+                                        'material_on_site_tanks': material_on_site_tanks,
+                                        'material_struvite': material_struvite,
+                                        'material_ion_exchange': material_ion_exchange})
+
+    labor_cost_FINAL = pd.DataFrame({'labor_pit': labor_pit, 'labor_UDDT': labor_UDDT,
+                                     'labor_off_site_tanks': labor_off_site_tanks,
+                                     'labor_on_site_tanks': labor_on_site_tanks, 'labor_struvite': labor_struvite,
+                                     'labor_ion_exchange': labor_ion_exchange})
+
+    op_cost_FINAL = pd.DataFrame({'annual_op_pit': annual_op_pit, 'annual_op_UDDT': annual_op_UDDT,
+                                  'annual_op_off_site_tanks': annual_op_off_site_tanks,
+                                  'annual_op_on_site_tanks': annual_op_on_site_tanks,
+                                  'annual_op_struvite': annual_op_cost_struvite,
+                                  'annual_op_ion_exchange': annual_op_cost_ion_exchange})
+
+    cons_cost_FINAL = pd.DataFrame({'annual_con_struvite_filter': annual_con_struvite_filter,
+                                    'annual_con_struvite_MgOH2': annual_con_struvite_MgOH2,
+                                    'annual_con_ion_exchange_resin': annual_con_ion_exchange_resin,
+                                    'annual_con_ion_exchange_H2SO4': annual_con_ion_exchange_H2SO4})
+
+    maint_cost_FINAL = pd.DataFrame({'maint_pit': maint_pit, 'maint_UDDT': maint_UDDT,
+                                     'maint_off_site_tanks': maint_off_site_tanks,
+                                     'maint_on_site_tanks': maint_on_site_tanks, 'maint_struvite': maint_struvite,
+                                     'maint_ion_exchange': maint_ion_exchange})
+
+    writer.write('material', material_cost_FINAL)
+    writer.write('labor', labor_cost_FINAL)
+    writer.write('op', op_cost_FINAL)
+    writer.write('consumable', cons_cost_FINAL)
+    writer.write('maint', maint_cost_FINAL)
+
+    # ~~~~~~~BREAK EVEN IN 8 YEARS CALCULATION (ALL SCENARIOS)~~~~~~~
+
+    # Calculations for Payment per kg of Nutrient
+
+    annual_mass_nutrients = {'recovered': recovered_nutrients.annual_N_recovery
+                             + recovered_nutrients.annual_P_recovery
+                             + recovered_nutrients.annual_K_recovery,  # (kg/year) recovered by Scenario 2
+                             'urine': 365 * (UDDT_users * UDDT_qty) * (nutrients.N_rec_U_T_S_urine
+                                                                       + nutrients.P_rec_U_T_S_urine
+                                                                       + nutrients.K_rec_U_T_S_urine)}
+
+    nutrient_payment = break_even(costs, annual_mass_nutrients,
+                                  [(system, financing) for system, financing, results, sheet in break_even_scenarios],
+                                  DCA_parameters.income_tax, DCA_parameters.discount_rate,
+                                  horizon)  # (USD/kg total nutrients) scenarios x runs
+
+    for (system, financing, results, sheet), payment in zip(break_even_scenarios, nutrient_payment):
+        writers[results].write(sheet, pd.DataFrame(payment, index=DCA_parameters.index))
+
+    # ~~~~~~~BREAK EVEN WITH PARTIAL AND CAPPED AID PAYMENTS~~~~~~~
+
+    aid_payment = break_even(costs, annual_mass_nutrients,
+                             [(system, (policy,)) for system in aid_systems for policy in policies],
+                             DCA_parameters.income_tax, DCA_parameters.discount_rate,
+                             horizon)  # (USD/kg total nutrients) (systems x policies) x runs
+
+    for k, system in enumerate(aid_systems):  # one column per policy (row of the policies sheet), one row per run
+        aid_writer.write(system, pd.DataFrame(aid_payment[k * len(policies):(k + 1) * len(policies)].T,
+                                              index=DCA_parameters.index))
+
+writer.save()
+for results_writer in writers.values():
+    results_writer.save()
+aid_writer.save()
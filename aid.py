@@ -0,0 +1,53 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, aid.py, describes how much of the costs of a component the aid agency pays, for the financing rules of
+# scenarios.py and the rate of return scripts. An aid policy pays a share of the component's costs (its construction,
+# material and labor, at every installation; its operation; and its maintenance), with the payment toward
+# construction optionally capped at a USD amount per unit (e.g. per pit latrine). Start-up financing is a share of 1
+# of the pit latrine costs without a cap; Self-Sustaining financing pays nothing. Shares and caps are arrays over the
+# policies, so hundreds of subsidy levels are applied to all runs as one (policies x runs) broadcast: the share of
+# the construction cost paid is min(share, cap x units / construction cost).
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+from collections import namedtuple
+import numpy as np  # import NumPy library for array calculations
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+# component: the component whose costs the aid agency pays (a name in scenarios.COMPONENTS); share: of its costs
+# (decimal form); cap: the most paid toward the construction of each unit (USD/unit), None for no cap
+AidPolicy = namedtuple('AidPolicy', 'component share cap')
+
+# ~~~~~~~POLICY GRID~~~~~~~
+# every combination of shares and caps for one component, shares varying fastest
+
+
+def aid_policies(shares, caps=(None,), component='pit'):
+
+    return [AidPolicy(component, float(share), cap) for cap in caps for share in shares]
+
+
+# ~~~~~~~SHARES PAID~~~~~~~
+# construction: (runs) material and labor of all units of the component (USD); units: number of units. Returns the
+# (policies x runs) share of the construction cost paid by each policy.
+
+
+def construction_shares(policies, construction, units=1):
+
+    share = np.array([policy.share for policy in policies], dtype=float)[:, np.newaxis]
+    cap = np.array([np.inf if policy.cap is None else policy.cap for policy in policies], dtype=float)[:, np.newaxis]
+    construction = np.asarray(construction, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        capped = np.where(construction > 0, cap * units / construction, np.inf)  # share the cap covers
+
+    return np.minimum(share, capped)
+
+
+# (policies) share of the operation and maintenance costs paid by each policy
+
+
+def ongoing_shares(policies):
+
+    return np.array([policy.share for policy in policies], dtype=float)
@@ -0,0 +1,73 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, bundles.py, prices technology bundles: toilet designs assembled from the interventions (columns) of
+# the material_quantities sheet, written as text such as 'pit = D402 + D403' or 'UDDT = D406' (a term may carry a
+# multiplier, e.g. 'double_pit = 2 * D403 + D402'). The capital cost of each intervention and its labor, operation,
+# and maintenance costs (capital cost x cost ratio) are computed for all runs and interventions at once, then
+# summed into the bundles term by term (one array operation per term).
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+import numpy as np  # import NumPy library for array calculations
+import pandas as pd  # import pandas for matrix data manipulation
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+COST_CATEGORIES = ('cap', 'labor', 'op', 'maint')  # capital (USD), labor (USD), operation (USD/yr), maintenance (USD)
+
+# ~~~~~~~BUNDLE DEFINITIONS~~~~~~~
+# [(name, [(intervention, multiplier), ...]), ...] from definitions such as 'pit = D402 + D403'
+
+
+def parse_bundles(definitions):
+
+    bundles = []
+
+    for definition in definitions:
+        name, equals, expression = definition.partition('=')
+        if not equals or not name.strip() or not expression.strip():
+            raise ValueError('bundle definition %r is not of the form name = D402 + D403' % definition)
+
+        terms = []
+        for term in expression.split('+'):
+            multiplier, times, intervention = term.rpartition('*')
+            terms.append((intervention.strip(), float(multiplier) if times else 1.0))
+        bundles.append((name.strip(), terms))
+
+    return bundles
+
+
+# ~~~~~~~BUNDLE COSTS~~~~~~~
+# material_cost: capital_cost table (runs x interventions, UGX); ratios: {'labor': labor_cost_ratio, 'op':
+# op_cost_ratio, 'maint': maint_cost_ratio} (runs x interventions). Returns the (runs x bundles x cost categories)
+# cost array in USD (USD/yr for operation) and the bundle names.
+
+
+def bundle_costs(material_cost, ratios, definitions, usd_to_ugx):
+
+    bundles = parse_bundles(definitions)
+    interventions = sorted(set(intervention for name, terms in bundles for intervention, multiplier in terms))
+
+    cap = material_cost[interventions].values / usd_to_ugx
+    costs = np.empty((cap.shape[0], len(interventions), len(COST_CATEGORIES)))  # (runs x interventions x categories)
+    costs[:, :, 0] = cap
+    for k, category in enumerate(COST_CATEGORIES[1:], 1):
+        costs[:, :, k] = cap * ratios[category][interventions].values[0:cap.shape[0]]
+
+    totals = np.zeros((cap.shape[0], len(bundles), len(COST_CATEGORIES)))
+    for b, (name, terms) in enumerate(bundles):
+        for intervention, multiplier in terms:
+            totals[:, b, :] += multiplier * costs[:, interventions.index(intervention), :]
+
+    return totals, [name for name, terms in bundles]
+
+
+# one column per bundle and cost category, named category_bundle (cap_pit, labor_pit, ..., maint_UDDT)
+
+
+def bundle_table(costs, names, index=None):
+
+    columns = ['%s_%s' % (category, name) for name in names for category in COST_CATEGORIES]
+
+    return pd.DataFrame(costs.reshape(costs.shape[0], -1), index=index, columns=columns)
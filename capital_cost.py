@@ -0,0 +1,100 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, capital_cost.py, computes the construction material cost of every intervention (pit latrine D402 &
+# D403, UDDT D406, ...) for all runs at once. For run j and intervention i the cost is the sum over materials m of
+# unit_cost[j, m] * quantity[m, i], where the quantity of a material listed in reuse_quantities is scaled by
+# reuse_quantities[m, i] * material_reuse_ratio[j]. Splitting the quantities into the part bought new and the part
+# scaled by the reuse ratio turns the calculation into two (runs x materials) by (materials x interventions)
+# matrix products. The detailed cost of each material (before reuse) is kept as a (runs x materials x interventions)
+# array and stored with one sheet per intervention, so one intervention or material can be read back on its own.
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+import numpy as np  # import NumPy library for array calculations
+import pandas as pd  # import pandas for matrix data manipulation
+from intermediates import read_results, result_sheets
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+first_intervention = 3  # columns of material_quantities before the interventions (material, details, unit)
+
+# ~~~~~~~REUSE-ADJUSTED QUANTITIES~~~~~~~
+# (materials x interventions) quantities split into new (materials without a reuse entry for that intervention)
+# and reused (quantity * reuse entry, to be multiplied by the run's reuse ratio); empty quantity cells count as 0.
+# Only the first rows of reuse_quantities, one per row of material_quantities, apply.
+
+
+def reuse_adjusted_quantities(quantities, reuse_quantities):
+
+    interventions = list(quantities.columns[first_intervention:])
+    quantity = np.nan_to_num(_numeric(quantities.iloc[:, first_intervention:]))
+    reuse = _numeric(reuse_quantities.iloc[0:quantity.shape[0], first_intervention:])
+
+    new = np.where(np.isnan(reuse), quantity, 0.0)
+    reused = np.where(np.isnan(reuse), 0.0, quantity * reuse)
+
+    return interventions, new, reused
+
+
+# ~~~~~~~CAPITAL COST~~~~~~~
+# unit_costs: (runs x materials) material unit costs (UGX, empty cells count as 0), in the row order of
+# material_quantities; reuse_ratio: material reuse ratio of each run. Returns the capital_cost table (runs x
+# interventions, UGX) with the index of unit_costs.
+
+
+def capital_costs(unit_costs, reuse_ratio, quantities, reuse_quantities):
+
+    interventions, new, reused = reuse_adjusted_quantities(quantities, reuse_quantities)
+    unit_cost = np.nan_to_num(np.asarray(unit_costs, dtype=float))
+    ratio = np.asarray(reuse_ratio, dtype=float).reshape(-1, 1)
+
+    materials = min(unit_cost.shape[1], new.shape[0])  # materials with both a unit cost and a quantity
+    unit_cost = unit_cost[:, :materials]
+    cost = unit_cost.dot(new[:materials]) + ratio * unit_cost.dot(reused[:materials])
+
+    return pd.DataFrame(cost, index=getattr(unit_costs, 'index', None), columns=interventions)
+
+
+# ~~~~~~~DETAILED MATERIAL COSTS~~~~~~~
+# (runs x materials x interventions) array of unit_cost[j, m] * quantity[m, i] (UGX, no reuse adjustment; empty
+# quantity cells stay empty) in the given dtype, e.g. np.float32 to halve its size, together with the material
+# names (columns of unit_costs) and intervention names along its axes
+
+
+def detailed_material_costs(unit_costs, quantities, dtype=np.float64):
+
+    interventions = list(quantities.columns[first_intervention:])
+    quantity = _numeric(quantities.iloc[:, first_intervention:])
+    unit_cost = np.nan_to_num(np.asarray(unit_costs, dtype=float))
+
+    materials = min(unit_cost.shape[1], quantity.shape[0])
+    cost = np.empty((unit_cost.shape[0], materials, len(interventions)), dtype=dtype)
+    for i in range(len(interventions)):
+        cost[:, :, i] = unit_cost[:, :materials] * quantity[:materials, i]
+
+    return cost, list(unit_costs.columns[:materials]), interventions
+
+
+# writes the array to a ResultsWriter with one sheet per intervention (the layout of
+# RESULTS_detailed_material_costs.xlsx); read_material_costs loads the requested interventions and materials back
+# as a (runs x materials x interventions) array without reading the other sheets or columns
+
+
+def write_material_costs(writer, cost, materials, interventions, index=None):
+
+    for i, intervention in enumerate(interventions):
+        writer.write(intervention, pd.DataFrame(cost[:, :, i], index=index, columns=materials))
+
+
+def read_material_costs(name='RESULTS_detailed_material_costs', interventions=None, materials=None):
+
+    interventions = result_sheets(name) if interventions is None else list(interventions)
+    sheets = [read_results(name, intervention, materials) for intervention in interventions]
+
+    return np.stack([sheet.values for sheet in sheets], axis=2), list(sheets[0].columns), interventions
+
+
+def _numeric(frame):
+
+    return frame.apply(pd.to_numeric, errors='coerce').values.astype(float)
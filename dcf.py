@@ -0,0 +1,88 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, dcf.py, is the discounted cash flow analysis of the break even engine (scenarios.py) for all runs at
+# once. The discount factors of every run and year of the project
+# horizon are one (runs x years) matrix, built once; ongoing costs, aid agency payments, and the maintenance that
+# occurs once (at half of the lifetime) are (runs x years) cash flow matrices; the depreciation tax shield is applied
+# to whole matrices; and the break even nutrient payment of every run is one vectorized expression,
+#
+#     payment = (capital + sum_t d_t ((E_t + P_t + D) (1 - tax) - D)) / sum_t d_t M (1 - tax)
+#
+# with d_t = 1/(1 + discount rate)^t, E_t the ongoing costs, P_t the aid agency payments (negative), D the
+# depreciation charge, and M the mass of nutrients recovered each year; replacements and salvage value during the
+# horizon (lifecycle.py) add their discounted capital to the numerator. The horizon is a parameter (8 years in the
+# scripts). Costs may carry leading axes in front of (runs x horizon), e.g. (components x runs x horizon); the
+# rates and masses of the runs broadcast over them.
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+import numpy as np  # import NumPy library for array calculations
+
+# ~~~~~~~DISCOUNT FACTORS~~~~~~~
+# discount_rate: (runs) discount rate in decimal form; returns (runs x horizon) 1/(1 + discount_rate)^t for the
+# years t = 1 ... horizon
+
+
+def discount_factors(discount_rate, horizon=8):
+
+    years = np.arange(1, horizon + 1)
+    return 1/(1 + np.asarray(discount_rate, dtype=float)[:, np.newaxis])**years
+
+
+# ~~~~~~~CASH FLOWS~~~~~~~
+# annual: (..., runs) amount paid every year of the horizon (USD/yr); once: [(year, (..., runs) amount), ...] paid
+# once on top of it in the given years (e.g. maintenance at half of the lifetime). Returns the (..., runs x horizon)
+# cash flows.
+
+
+def cash_flows(annual, horizon=8, once=()):
+
+    annual = np.asarray(annual, dtype=float)
+    flows = np.repeat(annual[..., np.newaxis], horizon, axis=-1)
+    for year, amount in once:
+        if not 1 <= year <= horizon:
+            raise ValueError('year %r of a one-time cash flow is outside the horizon of %d years' % (year, horizon))
+        flows[..., year - 1] = flows[..., year - 1] + amount
+
+    return flows
+
+
+# cash flows after income tax, with the depreciation charge (..., runs, USD/yr) deducted from the taxable amount and
+# added back: (flows + depreciation) x (1 - income_tax) - depreciation
+
+
+def after_tax(flows, income_tax, depreciation=0.0):
+
+    depreciation = np.asarray(depreciation, dtype=float)[..., np.newaxis]
+    return (flows + depreciation) * (1 - np.asarray(income_tax, dtype=float)[:, np.newaxis]) - depreciation
+
+
+# ~~~~~~~PRESENT VALUE~~~~~~~
+# sum over the years of the discounted (..., runs x horizon) cash flows
+
+
+def present_value(flows, discount):
+
+    return np.einsum('...j,...j->...', discount, flows)
+
+
+# ~~~~~~~BREAK EVEN PAYMENT~~~~~~~
+# capital: (..., runs) material and construction labor costs paid up front (USD, net of any aid paid up front);
+# flows: (..., runs x horizon) ongoing costs plus aid agency payments (USD/yr, payments negative); annual_mass: (runs)
+# nutrients recovered each year (kg/yr); depreciation: (..., runs) total depreciation charge (USD/yr); capital_flows:
+# (..., runs x horizon) capital paid or recovered during the horizon, not deducted from taxable income (replacements
+# and salvage value, see lifecycle.py). Returns the nutrient payment (USD/kg) at which the net present value over the
+# horizon is zero. The payment is linear in the costs, so the payments of separate cost items (e.g. one per
+# component) add up to the payment of their sum.
+
+
+def break_even_payment(capital, flows, annual_mass, income_tax, discount, depreciation=0.0, capital_flows=None):
+
+    horizon = discount.shape[-1]
+    costs = present_value(after_tax(flows, income_tax, depreciation), discount)
+    if capital_flows is not None:
+        costs = costs + present_value(capital_flows, discount)
+    nutrients = present_value(after_tax(cash_flows(annual_mass, horizon), income_tax), discount)
+
+    return (np.asarray(capital, dtype=float) + costs)/nutrients
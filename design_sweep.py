@@ -0,0 +1,174 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, design_sweep.py, evaluates the resource recovery cost model (resource_recovery.py) for many designs
+# of the system (reference_flow, UDDT_users, cycles_per_day, reactor_volume, column_loading, t_urine_storage)
+# against the full set of samples, e.g. to look for cost-optimal designs. The samples are packed once into shared
+# memory that the worker processes of a pool read without copying; each worker evaluates whole designs and writes
+# them into a (designs x columns x runs) result cube, also in shared memory. summarize() reduces the cube to
+# statistics per design. Run this file directly to sweep the results of scripts 1 and 4, e.g.
+# python design_sweep.py --reference_flow 500 1000 2000 --cycles_per_day 4 8 --columns total_cap_cost_struvite
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+import argparse
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np  # import NumPy library for array calculations
+import pandas as pd  # import pandas for matrix data manipulation
+from intermediates import ResultsWriter, read_results
+from resource_recovery import DESIGN, DEFAULT_TRAIN, resource_recovery_costs
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+SAMPLE_SHEETS = ('RR_triangle', 'RR_uniform', 'RR_P_recovery_uniform', 'RR_N_recovery_uniform',
+                 'RR_N_recovery_triangle', 'labor_cost_ratio', 'op_cost_ratio', 'maint_cost_ratio', 'transport_costs')
+NUTRIENT_SHEET = 'rec_nutrients_after_U_T_S'  # of RESULTS_per_capita_nutrients
+STATISTICS = (('mean', np.mean), ('std', np.std), ('p5', lambda x, axis: np.percentile(x, 5, axis=axis)),
+              ('p50', lambda x, axis: np.percentile(x, 50, axis=axis)),
+              ('p95', lambda x, axis: np.percentile(x, 95, axis=axis)))
+
+_worker = {}  # shared arrays attached by each worker process
+
+# ~~~~~~~DESIGN POINTS~~~~~~~
+# every combination of the given values ({name: [values]}), the other design values keeping their defaults;
+# design_sweep also takes any list of design dicts
+
+
+def design_grid(values):
+
+    names = list(values)
+    return [dict(zip(names, combination)) for combination in itertools.product(*[values[name] for name in names])]
+
+
+# ~~~~~~~SWEEP~~~~~~~
+# samples: {sheet: table} of the SAMPLE_SHEETS; nutrients: rec_nutrients_after_U_T_S; designs: list of design
+# dicts (values replacing those of DESIGN); columns: output columns to keep (all columns of every sheet by
+# default). processes=None uses one worker per CPU, 0 evaluates the designs in this process. Returns the
+# (designs x columns x runs) cube and the column names.
+
+
+def design_sweep(samples, nutrients, designs, train=DEFAULT_TRAIN, columns=None, processes=None):
+
+    layout = [(sheet, name) for sheet in sorted(samples) for name in samples[sheet].columns] + \
+        [(NUTRIENT_SHEET, name) for name in nutrients.columns]
+    runs = nutrients.shape[0]
+    if columns is None:
+        first = _views(_pack(samples, nutrients, layout)[:, 0:1], layout)
+        columns = [column for sheet, table in resource_recovery_costs(first[0], first[1], None, train)
+                   for column in table]
+    columns = list(columns)
+
+    packed = shared_memory.SharedMemory(create=True, size=max(len(layout) * runs * 8, 1))
+    cube = shared_memory.SharedMemory(create=True, size=max(len(designs) * len(columns) * runs * 8, 1))
+    try:
+        sample_array = np.ndarray((len(layout), runs), dtype=float, buffer=packed.buf)
+        sample_array[...] = _pack(samples, nutrients, layout)
+        arguments = (packed.name, cube.name, layout, runs, len(designs), columns, train)
+
+        if processes == 0:
+            _attach(*arguments)
+            for d, design in enumerate(designs):
+                _evaluate(d, design)
+        else:
+            with ProcessPoolExecutor(processes, initializer=_attach, initargs=arguments) as pool:
+                list(pool.map(_evaluate, range(len(designs)), designs))
+
+        result = np.ndarray((len(designs), len(columns), runs), dtype=float, buffer=cube.buf).copy()
+    finally:
+        _detach()
+        for memory in (packed, cube):
+            memory.close()
+            memory.unlink()
+
+    return result, columns
+
+
+# ~~~~~~~SUMMARY STATISTICS~~~~~~~
+# one row per design and column: the design values followed by the mean, standard deviation, and 5th, 50th, and
+# 95th percentiles over the runs
+
+
+def summarize(cube, columns, designs):
+
+    rows = []
+    for d, design in enumerate(designs):
+        values = dict(DESIGN, **design)
+        for c, column in enumerate(columns):
+            row = dict(values, design=d, column=column)
+            row.update((name, statistic(cube[d, c], axis=0)) for name, statistic in STATISTICS)
+            rows.append(row)
+
+    return pd.DataFrame(rows, columns=['design'] + list(DESIGN) + ['column'] + [name for name, s in STATISTICS])
+
+
+def _pack(samples, nutrients, layout):
+
+    return np.array([np.asarray((nutrients if sheet == NUTRIENT_SHEET else samples[sheet])[name], dtype=float)
+                     for sheet, name in layout])
+
+
+def _views(array, layout):
+
+    samples = {}
+    for row, (sheet, name) in zip(array, layout):
+        samples.setdefault(sheet, {})[name] = row
+
+    return samples, samples.pop(NUTRIENT_SHEET)
+
+
+def _attach(sample_name, cube_name, layout, runs, n_designs, columns, train):
+
+    memories = [shared_memory.SharedMemory(name=sample_name), shared_memory.SharedMemory(name=cube_name)]
+    samples = np.ndarray((len(layout), runs), dtype=float, buffer=memories[0].buf)
+    samples.flags.writeable = False  # read-only samples shared by every worker
+
+    _worker.update(memories=memories, views=_views(samples, layout), columns=columns, train=train,
+                   cube=np.ndarray((n_designs, len(columns), runs), dtype=float, buffer=memories[1].buf))
+
+
+def _evaluate(d, design):
+
+    samples, nutrients = _worker['views']
+    results = {}
+    for sheet, table in resource_recovery_costs(samples, nutrients, design, _worker['train']):
+        results.update(table)
+
+    for c, column in enumerate(_worker['columns']):
+        _worker['cube'][d, c] = results[column]
+
+
+def _detach():
+
+    _worker.pop('cube', None)
+    _worker.pop('views', None)
+    for memory in _worker.pop('memories', ()):
+        memory.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Sweep designs of the resource recovery system over all runs.')
+    for design_name, default in DESIGN.items():
+        parser.add_argument('--' + design_name, type=type(default), nargs='+', default=[default])
+    parser.add_argument('--columns', nargs='+', help='output columns to keep (default: all)')
+    parser.add_argument('--processes', type=int, help='worker processes (default: one per CPU, 0: none)')
+    parser.add_argument('--output', default='RESULTS_RR_design_sweep', help='name of the result to write')
+    arguments = parser.parse_args()
+
+    design_points = design_grid(dict((design_name, getattr(arguments, design_name)) for design_name in DESIGN))
+    sample_tables = dict((sheet, read_results('OUTPUT_uncertainty_ranges', sheet)) for sheet in SAMPLE_SHEETS)
+    cube_values, cube_columns = design_sweep(sample_tables, read_results('RESULTS_per_capita_nutrients',
+                                                                         NUTRIENT_SHEET),
+                                             design_points, columns=arguments.columns,
+                                             processes=arguments.processes)
+
+    writer = ResultsWriter(arguments.output)
+    writer.write('designs', pd.DataFrame([dict(DESIGN, **point) for point in design_points], columns=list(DESIGN)))
+    writer.write('summary', summarize(cube_values, cube_columns, design_points))
+    for k, cube_column in enumerate(cube_columns):  # runs x designs
+        writer.write(cube_column, pd.DataFrame(cube_values[:, k, :].T, columns=range(len(design_points))))
+    writer.save()
+    print('%d designs x %d runs written to %s' % (len(design_points), cube_values.shape[2],
+                                                   os.path.abspath(arguments.output)))
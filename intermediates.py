@@ -0,0 +1,311 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, intermediates.py, stores the results handed from one script to the next (OUTPUT_uncertainty_ranges,
+# RESULTS_RR_costs_FilterReuse, ...) as columnar binary files instead of Excel workbooks. Each result is a directory
+# <name>.cols holding a manifest.json and compressed NumPy chunks; every sheet of the old workbook becomes a named
+# group of typed columns, split into chunks of rows_per_chunk runs, so there is no limit on the number of runs and a
+# script can read a single column without parsing the rest. Excel is only an export: ResultsWriter.save(excel=True),
+# export_excel(name), or run this file directly (python intermediates.py [name ...]). After keep_in_memory() (used by
+# pipeline.py) results are kept as DataFrames in this process instead and reach the disk only through write_results.
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+import glob
+import json
+import os
+import shutil
+import sys
+import numpy as np  # import NumPy library for array calculations
+import pandas as pd  # import pandas for matrix data manipulation
+from registry import typed_column
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+store_suffix = '.cols'  # RESULTS_RR_costs_FilterReuse -> RESULTS_RR_costs_FilterReuse.cols
+rows_per_chunk = 65536  # runs stored in each compressed chunk of a sheet
+excel_max_rows = 1048575  # rows of data an Excel sheet can hold below its header row
+
+_memory = None  # {name: {sheet: DataFrame}} while results are kept in memory, None while they go to disk
+
+# ~~~~~~~WRITING RESULTS~~~~~~~
+# used like pd.ExcelWriter: write(sheet, frame) once per sheet (or several times to append runs chunk by chunk),
+# then save(). Chunks go to disk as they are written; save() adds the manifest and swaps the new directory in for
+# the old one so a reader never sees a half-written result.
+
+
+class ResultsWriter(object):
+
+    def __init__(self, name, chunk_rows=rows_per_chunk):
+        self.name = name
+        self.path = store_path(name)
+        self.chunk_rows = chunk_rows
+        self.sheets = []
+        self._building = self.path + '.tmp'
+        self._frames = {}
+
+        if _memory is not None:
+            return
+        if os.path.exists(self._building):
+            shutil.rmtree(self._building)
+        os.makedirs(self._building)
+
+    def write(self, sheet, frame):
+        entry = self._entry(sheet, frame)
+
+        if _memory is not None:
+            self._frames.setdefault(sheet, []).append(frame)  # concatenated once, in save()
+            return
+
+        for first in range(0, frame.shape[0], self.chunk_rows):
+            part = frame.iloc[first:first + self.chunk_rows]
+            file_name = 's%d.%d.npz' % (self.sheets.index(entry), len(entry['chunks']))
+            arrays = {'index': np.asarray(part.index)}
+            for i in range(part.shape[1]):
+                arrays['c%d' % i] = typed_column(part.iloc[:, i])
+            np.savez_compressed(os.path.join(self._building, file_name), **arrays)
+
+            entry['chunks'].append([entry['rows'], entry['rows'] + part.shape[0], file_name])
+            entry['rows'] += part.shape[0]
+
+    def save(self, excel=False):
+        if _memory is not None:
+            _memory[self.name] = dict((sheet, frames[0] if len(frames) == 1 else pd.concat(frames))
+                                      for sheet, frames in self._frames.items())
+            if excel:
+                export_excel(self.name)
+            return
+
+        with open(os.path.join(self._building, 'manifest.json'), 'w') as manifest_file:
+            json.dump({'name': self.name, 'sheets': self.sheets}, manifest_file, indent=1)
+
+        if os.path.exists(self.path):
+            shutil.rmtree(self.path)
+        os.rename(self._building, self.path)
+
+        if excel:
+            export_excel(self.name)
+
+    def _entry(self, sheet, frame):
+        columns = [_label(column) for column in _flat_columns(frame.columns)]
+
+        for entry in self.sheets:
+            if entry['name'] == sheet:
+                if entry['columns'] != columns:
+                    raise ValueError('columns appended to sheet %r of %s do not match' % (sheet, self.name))
+                return entry
+
+        self.sheets.append({'name': sheet, 'rows': 0, 'columns': columns, 'index_name': _label(frame.index.name),
+                            'chunks': []})
+        return self.sheets[-1]
+
+
+def write_results(name, sheets, excel=False):
+
+    global _memory
+    kept, _memory = _memory, None  # always to disk
+
+    try:
+        writer = ResultsWriter(name)
+        for sheet, frame in sheets.items():
+            writer.write(sheet, frame)
+        writer.save(excel=excel)
+    finally:
+        _memory = kept
+
+
+# ~~~~~~~RESULTS IN MEMORY~~~~~~~
+# keep_in_memory() makes every ResultsWriter in this process keep its sheets as DataFrames (returned dict, keyed by
+# result name) and read_results look there before the disk; keep_on_disk() switches back
+
+
+def keep_in_memory(results=None):
+
+    global _memory
+    _memory = {} if results is None else results
+
+    return _memory
+
+
+def keep_on_disk():
+
+    global _memory
+    _memory = None
+
+
+# ~~~~~~~READING RESULTS~~~~~~~
+# read_results(name, sheet) returns the same table pd.read_excel gave for the workbook sheet (run numbers as the
+# index); sheet=None reads the first sheet, columns selects a subset, runs (a range of row positions, see
+# run_chunks) selects a block of runs, reading only the chunks that hold them, and iter_results yields the table
+# chunk by chunk
+
+
+def read_results(name, sheet=None, columns=None, runs=None):
+
+    if _memory is not None and name in _memory:
+        frame = _memory[name][result_sheets(name)[_sheet_position(name, sheet)]]
+        frame = frame if runs is None else frame.iloc[runs.start:runs.stop]
+        return (frame if columns is None else frame[list(columns)]).copy()
+
+    chunks = list(iter_results(name, sheet, columns, runs))
+    if len(chunks) == 1:
+        return chunks[0]
+
+    entry = _manifest(name)[_sheet_position(name, sheet)]
+    names = _column_names(entry) if columns is None else list(columns)
+    if not chunks:
+        return pd.DataFrame(columns=names)
+
+    frame = pd.DataFrame({i: np.concatenate([chunk.iloc[:, i].values for chunk in chunks]) for i in range(len(names))})
+    frame.columns = names
+    frame.index = pd.Index(np.concatenate([chunk.index.values for chunk in chunks]), name=entry['index_name'])
+
+    return frame
+
+
+def iter_results(name, sheet=None, columns=None, runs=None):
+
+    if _memory is not None and name in _memory:
+        for block in run_chunks(result_rows(name, sheet) if runs is None else runs.stop,
+                                first=0 if runs is None else runs.start):
+            yield read_results(name, sheet, columns, block)
+        return
+
+    position = _sheet_position(name, sheet)
+    entry = _manifest(name)[position]
+    names = _column_names(entry) if columns is None else list(columns)
+    keys = ['c%d' % _column_position(entry, column) for column in names]
+    first, last = (0, entry['rows']) if runs is None else (runs.start, runs.stop)
+
+    for start, stop, file_name in entry['chunks']:
+        if stop <= first or start >= last:
+            continue
+        rows = slice(max(first - start, 0), min(last, stop) - start)
+        with np.load(os.path.join(store_path(name), file_name)) as chunk:
+            frame = pd.DataFrame({i: chunk[key][rows] for i, key in enumerate(keys)},
+                                 index=range(rows.stop - rows.start))
+            frame.columns = names
+            frame.index = pd.Index(chunk['index'][rows], name=entry['index_name'])
+        yield frame
+
+
+# ~~~~~~~BLOCKS OF RUNS~~~~~~~
+# the scripts after 1_uncertainty_ranges.py compute their results one block of runs at a time, so their memory is
+# set by the block size rather than the number of runs:
+#
+#     for runs in run_chunks(N_runs, 'OUTPUT_uncertainty_ranges'):
+#         samples = read_results('OUTPUT_uncertainty_ranges', 'RR_triangle', runs=runs)
+#         writer.write('Sheet1', ...)  # appended block by block
+#
+# run_chunks yields the ranges [first, first + chunk_rows), ... up to n_runs, or up to the runs stored in result
+# (its first sheet) if there are fewer; the default block is the chunk of the stored results, so each block reads
+# one chunk of every sheet
+
+
+def run_chunks(n_runs, result=None, chunk_rows=None, first=0):
+
+    chunk_rows = chunk_rows or rows_per_chunk
+    last = n_runs if result is None else min(n_runs, result_rows(result))
+
+    for start in range(first, last, chunk_rows):
+        yield range(start, min(start + chunk_rows, last))
+
+
+# number of runs (rows) of a sheet of a result
+
+
+def result_rows(name, sheet=None):
+
+    if _memory is not None and name in _memory:
+        return _memory[name][result_sheets(name)[_sheet_position(name, sheet)]].shape[0]
+    return _manifest(name)[_sheet_position(name, sheet)]['rows']
+
+
+def result_sheets(name):
+
+    if _memory is not None and name in _memory:
+        return list(_memory[name])
+    return [entry['name'] for entry in _manifest(name)]
+
+
+def store_path(name):
+
+    return name + store_suffix
+
+
+# ~~~~~~~EXCEL EXPORT~~~~~~~
+# writes every sheet of a result to <name>.xlsx (the file the scripts used to write); sheets with more runs than an
+# Excel sheet can hold raise a ValueError instead of being truncated
+
+
+def export_excel(name, path=None):
+
+    path = name + '.xlsx' if path is None else path
+    writer = pd.ExcelWriter(path, engine='xlsxwriter')
+
+    for sheet in result_sheets(name):
+        frame = read_results(name, sheet)
+        if frame.shape[0] > excel_max_rows:
+            writer.close()
+            os.remove(path)
+            raise ValueError('sheet %r of %s has %d runs, more than an Excel sheet holds' % (sheet, name,
+                                                                                              frame.shape[0]))
+        frame.to_excel(writer, sheet_name=sheet[:31])
+
+    writer.close()
+    return path
+
+
+def _manifest(name):
+
+    with open(os.path.join(store_path(name), 'manifest.json')) as manifest_file:
+        return json.load(manifest_file)['sheets']
+
+
+def _sheet_position(name, sheet):
+
+    sheets = result_sheets(name)
+    if sheet is None:
+        return 0
+    if sheet not in sheets:
+        raise KeyError('%s has no sheet %r (sheets: %s)' % (name, sheet, ', '.join(sheets)))
+
+    return sheets.index(sheet)
+
+
+def _column_position(entry, column):
+
+    for i, name in enumerate(_column_names(entry)):
+        if name == column or str(name) == str(column):
+            return i
+
+    raise KeyError('sheet %r has no column %r' % (entry['name'], column))
+
+
+def _column_names(entry):
+
+    return [tuple(name) if isinstance(name, list) else name for name in entry['columns']]
+
+
+def _flat_columns(columns):
+
+    if isinstance(columns, pd.MultiIndex) and columns.nlevels == 1:
+        return columns.get_level_values(0)
+
+    return columns
+
+
+def _label(value):
+
+    if isinstance(value, tuple):
+        return [_label(part) for part in value]
+    if isinstance(value, np.generic):
+        return value.item()
+
+    return value
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] or sorted(path[:-len(store_suffix)] for path in glob.glob('*' + store_suffix))
+    for result in names:
+        print(export_excel(result))
@@ -0,0 +1,128 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, lifecycle.py, schedules the replacements, mid-life maintenance, and salvage value of every component
+# of a system (UDDTs, pit latrines, tanks, struvite reactors, ion exchange columns) from the lifetimes and
+# maintenance times sampled by 1_uncertainty_ranges.py (tech_life_span and tech_maint_time, in years). A component
+# installed at time 0 is replaced at the end of each lifetime that ends before the end of the horizon, is
+# maintained tech_maint_time years after every installation, and the remaining (straight-line) value of the last
+# installation is salvaged at the end of the horizon. Events fall in the year nearest to when they occur (at least
+# year 1), so a replacement late in the last year is paid in that year together with its salvage value: its net
+# cost shrinks smoothly to its labor as the lifetime approaches the horizon (the material is almost all salvaged).
+# Once the lifetime reaches the horizon there is no replacement, which is the one step left in the costs (the labor
+# of one installation). The events of all runs are kept as a sparse (runs x years x components) array,
+# one entry per event, so event_flows turns them into (runs x years) cash flows with one np.bincount, whatever the
+# mix of lifetimes. With lifetimes equal to the horizon (8 years) and maintenance at 4 years this is the schedule
+# the break even scripts always used.
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+from collections import namedtuple
+import numpy as np  # import NumPy library for array calculations
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+KINDS = ('replacement', 'maintenance', 'salvage')
+
+# shape: (runs, years, components); run, year (1 ... horizon), component, kind (index into KINDS): one entry per
+# event; fraction: share of the event's amount paid (1 for replacements and maintenance, minus the remaining share
+# of the lifetime for salvage)
+Events = namedtuple('Events', 'shape run year component kind fraction')
+
+# ~~~~~~~COMPONENT LIFETIMES~~~~~~~
+# table: a sampled sheet with one column per technology (tech_life_span or tech_maint_time, named by sheet in error
+# messages); components: [(name, (technology, ...)), ...]. Returns (runs x components) years; a component made of
+# several technologies (e.g. the pit latrine, D402 & D403) takes the shortest of them. Every value must be a
+# positive number of years.
+
+
+def component_lifetimes(table, components, sheet=None):
+
+    for name, technologies in components:
+        for technology in technologies:
+            _check_years(np.asarray(table[technology], dtype=float), 'technology %s of component %s%s'
+                         % (technology, name, '' if sheet is None else ' in %s' % sheet))
+
+    return np.column_stack([np.min(np.column_stack([np.asarray(table[technology], dtype=float)
+                                                    for technology in technologies]), axis=1)
+                            for name, technologies in components])
+
+
+# ~~~~~~~EVENT SCHEDULE~~~~~~~
+# lifetimes, maint_times: (runs x components) years; horizon: project duration (years); names: (components) names
+# of the components, for error messages
+
+
+def lifecycle_events(lifetimes, maint_times, horizon=8, names=None):
+
+    lifetimes = np.asarray(lifetimes, dtype=float)
+    maint_times = np.asarray(maint_times, dtype=float)
+    for column in range(lifetimes.shape[1]):
+        name = 'component %s' % (column if names is None else names[column])
+        _check_years(lifetimes[:, column], 'lifetime of %s (tech_life_span)' % name)
+        _check_years(maint_times[:, column], 'maintenance time of %s (tech_maint_time)' % name)
+
+    installations = int(np.ceil(horizon / lifetimes.min())) + 1 if lifetimes.size else 1
+    start = np.arange(installations)[np.newaxis, :, np.newaxis] * lifetimes[:, np.newaxis, :]  # (runs x k x comps)
+    installed = (start < horizon) | (np.arange(installations) == 0)[np.newaxis, :, np.newaxis]
+    installed = np.logical_and.accumulate(installed, axis=1)  # no installation after a replacement not made
+
+    maintained = installed & (maint_times < lifetimes)[:, np.newaxis, :] & \
+        (_year(start + maint_times[:, np.newaxis, :]) <= horizon)
+    replaced = installed.copy()
+    replaced[:, 0, :] = False
+
+    last = installed.sum(axis=1) - 1  # (runs x components) last installation
+    remaining = np.clip((last + 1) * lifetimes - horizon, 0, None) / lifetimes  # share of its lifetime left
+
+    entries = []
+    for kind, mask, time in ((0, replaced, start), (1, maintained, start + maint_times[:, np.newaxis, :])):
+        run, k, component = np.nonzero(mask)
+        entries.append((run, _year(time[run, k, component]), component, np.full(run.size, kind),
+                        np.ones(run.size)))
+    run, component = np.nonzero(remaining > 0)
+    entries.append((run, np.full(run.size, horizon), component, np.full(run.size, 2), -remaining[run, component]))
+
+    return Events((lifetimes.shape[0], horizon, lifetimes.shape[1]),
+                  *[np.concatenate([entry[field] for entry in entries]) for field in range(5)])
+
+
+# ~~~~~~~CASH FLOWS~~~~~~~
+# amounts: {kind: (runs x components) amount of one event (USD)}, e.g. {'replacement': material + labor, 'salvage':
+# material}; kinds left out are not counted. Returns the (runs x years) cash flows of the events, or with
+# by_component the (components x runs x years) cash flows of each component.
+
+
+def event_flows(events, amounts, by_component=False):
+
+    runs, horizon, components = events.shape
+    cells = (components if by_component else 1) * runs * horizon
+    flows = np.zeros(cells)
+    for kind, amount in amounts.items():
+        selected = events.kind == KINDS.index(kind)
+        run, component = events.run[selected], events.component[selected]
+        value = events.fraction[selected] * np.asarray(amount, dtype=float).reshape(runs, components)[run, component]
+        cell = run * horizon + events.year[selected] - 1
+        if by_component:
+            cell = cell + component * (runs * horizon)
+        flows += np.bincount(cell, weights=value, minlength=cells)
+
+    return flows.reshape(components, runs, horizon) if by_component else flows.reshape(runs, horizon)
+
+
+# raises a ValueError naming what is described and its first bad runs when years are NaN, infinite, or not positive
+# (e.g. a workbook saved without its cached formula values)
+
+
+def _check_years(years, described):
+
+    bad = np.flatnonzero(~(np.isfinite(years) & (years > 0)))
+    if bad.size:
+        raise ValueError('%s must be a positive number of years, but is %s in %d of %d runs (runs %s)'
+                         % (described, ', '.join(sorted(set(str(value) for value in years[bad[:5]]))), bad.size,
+                            years.size, ', '.join(str(run) for run in bad[:5]) + (', ...' if bad.size > 5 else '')))
+
+
+def _year(time):
+
+    return np.maximum(np.rint(time), 1).astype(np.int64)
@@ -0,0 +1,74 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, market_value.py, computes the market value of nutrients (USD/kg N, P, or K) from fertilizer prices
+# for all runs at once. Each fertilizer product is described by the nutrient it supplies, its nutrient content, and
+# the factor converting that content to the nutrient (e.g. kg P2O5 per kg P), so any set of products is priced
+# with one array operation on the (runs x products) sack prices. The value of the recovered nutrient mix is the
+# price of each nutrient weighted by its mass share of the N, P, and K recovered. The order of operations follows
+# 6_nutrient_market_value.py, so the results are bit-identical to its per-run loops.
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+import numpy as np  # import NumPy library for array calculations
+import pandas as pd  # import pandas for matrix data manipulation
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+currency_conversion = 3693.8  # UGX to USD conversion as of August 7, 2018
+mass_sack = 50  # (kg) each fertilizer sack is 50 kg
+P_P2O5 = 2.29  # (kg P2O5 per kg P)  phosphorus conversion factor
+K_K2O = 1.2  # (kg K20 per kg P)  potassium conversion factor
+
+# (column of the fertilizer_cost sheet (UGX/50-kg sack), result column, nutrient, fraction of the nutrient or its
+# oxide in the fertilizer, kg of that form per kg nutrient)
+FERTILIZERS = (('urea', 'urea_N_cost', 'N', 0.46, 1),
+               ('calcium_ammonium_nitrate', 'CAN_N_cost', 'N', 0.26, 1),
+               ('single_superphosphate', 'SSP_P_cost', 'P', 0.20, P_P2O5),
+               ('triple_superphosphate', 'TSP_P_cost', 'P', 0.46, P_P2O5),
+               ('potassium_chloride', 'KCl_K_cost', 'K', 0.60, K_K2O))
+
+# result column giving the market price of each recovered nutrient
+REFERENCE_PRICES = (('N', 'CAN_N_cost'), ('P', 'SSP_P_cost'), ('K', 'KCl_K_cost'))
+
+# ~~~~~~~NUTRIENT MARKET PRICES~~~~~~~
+# fertilizer_cost: (runs x products) sack prices (UGX/50-kg, empty cells count as 0). Returns the price of the
+# nutrient each product supplies (USD/kg N, P, or K) as a table with one result column per product and the index of
+# fertilizer_cost.
+
+
+def nutrient_prices(fertilizer_cost, fertilizers=FERTILIZERS):
+
+    products = [product for product, column, nutrient, content, factor in fertilizers]
+    cost = np.nan_to_num(np.asarray(fertilizer_cost[products], dtype=float))
+    content = np.array([content for product, column, nutrient, content, factor in fertilizers], dtype=float)
+    factor = np.array([factor for product, column, nutrient, content, factor in fertilizers], dtype=float)
+
+    return pd.DataFrame(factor * (cost/currency_conversion)/content/mass_sack,
+                        index=getattr(fertilizer_cost, 'index', None),
+                        columns=[column for product, column, nutrient, content, factor in fertilizers])
+
+
+# ~~~~~~~WEIGHTED MARKET VALUE~~~~~~~
+# recovered: {nutrient: array} of the nutrients recovered (kg/yr, e.g. annual_N_recovery); prices: the table of
+# nutrient_prices. Returns weighted_N, weighted_P, weighted_K (mass share x price) and weighted_total (USD/kg
+# nutrients), with the index of prices.
+
+
+def weighted_market_value(recovered, prices, reference_prices=REFERENCE_PRICES):
+
+    masses = [np.asarray(recovered[nutrient], dtype=float) for nutrient, column in reference_prices]
+    total_recovered_nutrients = masses[0]
+    for mass in masses[1:]:
+        total_recovered_nutrients = total_recovered_nutrients + mass  # (kg nutrients per year)
+
+    weighted = pd.DataFrame(index=getattr(prices, 'index', None))
+    for mass, (nutrient, column) in zip(masses, reference_prices):
+        weighted['weighted_' + nutrient] = (mass/total_recovered_nutrients) * np.asarray(prices[column], dtype=float)
+
+    total = weighted.iloc[:, 0].values
+    for k in range(1, weighted.shape[1]):
+        total = total + weighted.iloc[:, k].values
+    weighted['weighted_total'] = total  # (USD per kg nutrients)
+
+    return weighted
@@ -0,0 +1,113 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, nutrients.py, is the N, P, K mass balance of 4_per_capita_nutrients.py written with nutrient and
+# fraction (tot, urine, feces) as array axes. Excretion is computed from intake for all runs at once, and the loss
+# chain (recovery in the UDDT, then losses in transport and storage) is applied as broadcast multiplications, so the
+# 27 output columns come from a handful of array operations. The formulas and their order of operations are the
+# same as in the original per-run loop, which gives bit-identical results. Given a table of diet profiles, the
+# intake parameters (e_cal, p_veg, p_anim, loss_cons) of each profile replace the sampled ones while every other draw
+# is shared, and all profiles are evaluated in the same broadcast pass as (profiles x runs x ...) arrays.
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+import numpy as np  # import NumPy library for array calculations
+import pandas as pd  # import pandas for matrix data manipulation
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+NUTRIENTS = ('N', 'P', 'K')
+FRACTIONS = ('tot', 'urine', 'feces')
+INTAKE = (('e_cal', 'uniform'), ('p_veg', 'uniform'), ('p_anim', 'uniform'), ('loss_cons', 'triangle'))
+
+# ~~~~~~~EXCRETION~~~~~~~
+# triangle and uniform are the RR_triangle and RR_uniform sample sheets (runs x parameters). Returns the nutrients
+# excreted per capita as a (runs x nutrients x fractions) array (kg/cap/d), urine and feces being the shares of the
+# total given by N_urine, P_urine, and K_urine (%). With profiles (a table with one row per diet profile and
+# columns among e_cal, p_veg, p_anim, loss_cons) the array is (profiles x runs x nutrients x fractions); a profile's
+# value replaces the sampled one in every run, and an empty cell keeps the samples.
+
+
+def excreted_nutrients(triangle, uniform, profiles=None):
+
+    e_cal, p_veg, p_anim, loss_cons = intake_parameters(triangle, uniform, profiles)
+    p_tot = p_veg + p_anim  # (g/cap/d) total protein intake
+
+    total = np.stack([(p_tot * _column(uniform, 'N_prot') * (1 - loss_cons) * _column(uniform, 'N_exc')) / 1000,
+                      (((_column(triangle, 'P_prot_v') * p_veg) + (_column(triangle, 'P_prot_a') * p_anim))
+                       * (1 - loss_cons) * _column(uniform, 'P_exc')) / 1000,
+                      e_cal * _column(uniform, 'K_cal') * (1 - loss_cons) * _column(uniform, 'K_exc')],
+                     axis=-1)  # (kg/cap/d) total N, P, K excreted
+    urine_share = np.stack([_column(triangle, 'N_urine'), _column(triangle, 'P_urine'),
+                            _column(triangle, 'K_urine')], axis=-1) / 100
+
+    urine = total * urine_share
+    return np.stack([total, urine, total - urine], axis=-1)
+
+
+# e_cal (kcal/cap/d caloric intake), p_veg and p_anim (g/cap/d vegetable and animal derived protein intake), and
+# loss_cons (fraction of food wasted at the household): the sampled runs, or (profiles x runs) arrays with profiles
+
+
+def intake_parameters(triangle, uniform, profiles=None):
+
+    sheets = {'triangle': triangle, 'uniform': uniform}
+    intake = [_column(sheets[sheet], name) for name, sheet in INTAKE]
+    if profiles is None:
+        return intake
+
+    unknown = sorted(set(profiles.columns) - set(name for name, sheet in INTAKE))
+    if unknown:
+        raise ValueError('diet profiles have columns %s that are not intake parameters' % ', '.join(unknown))
+
+    for k, (name, sheet) in enumerate(INTAKE):
+        value = _column(profiles, name)[:, np.newaxis] if name in profiles.columns \
+            else np.full((profiles.shape[0], 1), np.nan)
+        intake[k] = np.where(np.isnan(value), intake[k], value)
+
+    return intake
+
+
+# ~~~~~~~LOSS CHAIN~~~~~~~
+# efficiency is the nutrient_recovery_efficiency sample sheet (UDDT_N, transport_N, storage_N, ... in %). Returns
+# the nutrients recovered after the UDDT and after the UDDT, transport, and storage, both shaped like excreted.
+
+
+def recovered_nutrients(excreted, efficiency):
+
+    def losses(stage):
+        return np.stack([_column(efficiency, '%s_%s' % (stage, nutrient)) for nutrient in NUTRIENTS],
+                        axis=-1)[..., np.newaxis] / 100
+
+    after_UDDT = excreted * losses('UDDT')
+    after_U_T_S = after_UDDT * (1 - losses('transport')) * (1 - losses('storage'))
+
+    return after_UDDT, after_U_T_S
+
+
+# (runs x nutrients x fractions) array as a table with one column per nutrient and fraction, named by pattern
+# ('%s_exc_%s' gives N_exc_tot, N_exc_urine, ..., K_exc_feces)
+
+
+def nutrient_table(values, pattern, index=None):
+
+    columns = [pattern % (nutrient, fraction) for nutrient in NUTRIENTS for fraction in FRACTIONS]
+
+    return pd.DataFrame(values.reshape(values.shape[0], -1), index=index, columns=columns)
+
+
+# one table per diet profile (keyed by the profile names, the index of profiles) with the excreted (exc), after UDDT
+# (rec_UDDT), and after UDDT, transport, and storage (rec_U_T_S) columns side by side
+
+
+def profile_tables(profiles, excreted, after_UDDT, after_U_T_S, index=None):
+
+    return dict((name, pd.concat([nutrient_table(excreted[k], '%s_exc_%s', index),
+                                  nutrient_table(after_UDDT[k], '%s_rec_UDDT_%s', index),
+                                  nutrient_table(after_U_T_S[k], '%s_rec_U_T_S_%s', index)], axis=1))
+                for k, name in enumerate(profiles.index))
+
+
+def _column(frame, name):
+
+    return np.asarray(frame[name], dtype=float)
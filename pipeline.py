@@ -0,0 +1,336 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, pipeline.py, runs the numbered scripts (1_uncertainty_ranges.py to
+# 15_rate_of_return_scenario1_unsubsidized.py) one after another in a single Python process. The results each script
+# hands to the next stay in memory as DataFrames (see intermediates.keep_in_memory), so pandas, SciPy, and the input
+# registry are loaded once and nothing is written to disk unless asked for. Results a stage needs from a stage that
+# is not part of the run are read from disk as usual.
+#
+# Each stage's outputs are also cached in .pipeline_cache under a hash of the input columns the stage reads (and of
+# its source code), so after a change to one input row only the stages that read an affected column run again; the
+# others load their cached outputs.
+#
+# From Python:   results = run_pipeline(first=1, last=15, write=['RESULTS_RR_costs_FilterReuse'], excel=True)
+# From a shell:  python pipeline.py --stages 1-15 --write RESULTS_RR_costs_FilterReuse --excel
+#
+# converge() instead samples until the quantiles of the break even payment settle (see sampling.converge_quantiles):
+# From a shell:  python pipeline.py --converge --rtol 1e-3
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+import argparse
+import ast
+import hashlib
+import os
+import runpy
+import shutil
+import time
+import numpy as np  # import NumPy library for array calculations
+import intermediates  # columnar results handed between the scripts
+from registry import load_registry
+from sampling import SAMPLED_SHEETS, converge_quantiles, read_parameters
+
+# ~~~~~~~STAGE GRAPH~~~~~~~
+# (number, script, {source: sheets read}, results written); a source is either the input workbook or a result
+# written by an earlier stage. The columns read from each sheet are found in the script itself (see columns_read).
+
+INPUTS = 'input_data_file.xlsx'
+UNCERTAINTY = 'OUTPUT_uncertainty_ranges'
+RR_COSTS = 'RESULTS_RR_costs_FilterReuse'
+NUTRIENTS = 'RESULTS_per_capita_nutrients'
+UDDT_PIT = 'RESULTS_UDDT_pit_costs'
+SYSTEM_COSTS = 'RESULTS_cap_op_cons_maint_costs_FilterReuse_July31'
+RATIOS = ('labor_cost_ratio', 'op_cost_ratio', 'maint_cost_ratio')
+LIFETIMES = ('tech_life_span', 'tech_maint_time')
+
+STAGES = ((1, '1_uncertainty_ranges.py',
+           {INPUTS: tuple(sheet for sheet, distribution in SAMPLED_SHEETS)},
+           (UNCERTAINTY,)),
+          (2, '2_capital_cost_UDDT_Pit.py',
+           {INPUTS: ('material_quantities', 'reuse_quantities'),
+            UNCERTAINTY: ('material_unit_costs', 'material_reuse_ratio')},
+           ('RESULTS_UDDT_Pit_capital_costs', 'RESULTS_detailed_material_costs')),
+          (3, '3_UDDT_Pit_cost.py',
+           {'RESULTS_UDDT_Pit_capital_costs': ('capital_cost',), UNCERTAINTY: RATIOS},
+           (UDDT_PIT,)),
+          (4, '4_per_capita_nutrients.py',
+           {UNCERTAINTY: ('RR_triangle', 'RR_uniform', 'nutrient_recovery_efficiency')},
+           (NUTRIENTS,)),
+          (5, '5_resource_recovery_cost.py',
+           {UNCERTAINTY: ('RR_triangle', 'RR_uniform', 'RR_P_recovery_uniform', 'RR_N_recovery_uniform',
+                          'RR_N_recovery_triangle', 'transport_costs') + RATIOS,
+            NUTRIENTS: ('rec_nutrients_after_U_T_S',)},
+           (RR_COSTS,)),
+          (6, '6_nutrient_market_value.py',
+           {UNCERTAINTY: ('fertilizer_cost',), RR_COSTS: ('nutrients_recovered',)},
+           ('OUTPUT_fertilizer_market_value', 'RESULTS_weighted_fertilizer_market_value')),
+          (7, '7_tanks.py',
+           {UNCERTAINTY: ('RR_triangle',)},
+           ('RESULTS_tank_quantity',)),
+          (8, '8_break_even.py',
+           {UDDT_PIT: ('Sheet1',),
+            RR_COSTS: ('capital_cost', 'labor_cost', 'op_cost', 'maint_cost', 'struvite_cost', 'ion_exchange_cost',
+                       'nutrients_recovered'),
+            NUTRIENTS: ('rec_nutrients_after_U_T_S',),
+            UNCERTAINTY: ('RR_uniform', 'RR_triangle', 'DCA_parameters') + LIFETIMES + RATIOS},
+           (SYSTEM_COSTS, 'RESULTS_break_even_Scenario2_subsidized_July31',
+            'RESULTS_break_even_Scenario2_unsubsidized_July31', 'RESULTS_break_even_Scenario1_subsidized_July31',
+            'RESULTS_break_even_Scenario1_unsubsidized_July31', 'RESULTS_break_even_aid_policies')),
+          (12, '12_rate_of_return_scenario2_subsidized.py',
+           {SYSTEM_COSTS: ('material', 'labor', 'consumable', 'op', 'maint'), RR_COSTS: ('nutrients_recovered',),
+            INPUTS: ('nutrient_payment_shortened',), UNCERTAINTY: LIFETIMES},
+           ('RESULTS_rate_of_return_Scenario2_subsidized_July31',)),
+          (13, '13_rate_of_return_scenario2_unsubsidized.py',
+           {SYSTEM_COSTS: ('material', 'labor', 'consumable', 'op', 'maint'), RR_COSTS: ('nutrients_recovered',),
+            INPUTS: ('nutrient_payment_shortened',), UNCERTAINTY: LIFETIMES},
+           ('RESULTS_rate_of_return_Scenario2_unsubsidized_July31',)),
+          (14, '14_rate_of_return_scenario1_subsidized.py',
+           {SYSTEM_COSTS: ('material', 'labor', 'consumable', 'op', 'maint'),
+            NUTRIENTS: ('rec_nutrients_after_U_T_S',), INPUTS: ('nutrient_payment_shortened',),
+            UNCERTAINTY: ('RR_uniform', 'RR_triangle') + RATIOS + LIFETIMES},
+           ('RESULTS_rate_of_return_Scenario1_subsidized_July31_test',)),
+          (15, '15_rate_of_return_scenario1_unsubsidized.py',
+           {SYSTEM_COSTS: ('material', 'labor', 'consumable', 'op', 'maint'),
+            NUTRIENTS: ('rec_nutrients_after_U_T_S',), INPUTS: ('nutrient_payment_shortened',),
+            UNCERTAINTY: ('RR_uniform', 'RR_triangle') + RATIOS + LIFETIMES},
+           ('RESULTS_rate_of_return_Scenario1_unsubsidized_July31',)))
+
+script_directory = os.path.dirname(os.path.abspath(__file__))
+cache_directory = '.pipeline_cache'
+
+# ~~~~~~~RUNNING THE PIPELINE~~~~~~~
+# runs stages first to last (inclusive) and returns the results they produced, {name: {sheet: DataFrame}}.
+# results passes in the results of an earlier run to build on (e.g. rerun stages 8-15 after stages 1-7); write
+# lists the results to store on disk afterwards ('all' for every result in memory); excel also exports those
+# results to .xlsx workbooks. cache=False runs every stage and leaves the cache untouched.
+
+
+def run_pipeline(first=1, last=15, results=None, write=(), excel=False, cache=True, verbose=True):
+
+    results = intermediates.keep_in_memory(results)
+
+    try:
+        for number, script, reads, outputs in STAGES:
+            if not first <= number <= last:
+                continue
+
+            started = time.time()
+            entry = os.path.join(cache_directory, 'stage%d-%s' % (number, stage_key(script, reads, outputs)[:20])) \
+                if cache else None
+
+            if entry is not None and all(os.path.exists(intermediates.store_path(os.path.join(entry, name)))
+                                         for name in outputs):
+                for name in outputs:
+                    stored = os.path.join(entry, name)
+                    results[name] = {sheet: intermediates.read_results(stored, sheet)
+                                     for sheet in intermediates.result_sheets(stored)}
+                status = 'cached'
+            else:
+                runpy.run_path(os.path.join(script_directory, script))
+                if entry is not None:
+                    for name in outputs:
+                        intermediates.write_results(os.path.join(entry, name), results[name])
+                status = 'ran'
+
+            if verbose:
+                print('%-45s %-6s %8.1f s' % (script, status, time.time() - started))
+    finally:
+        intermediates.keep_on_disk()
+
+    for name in (sorted(results) if write == 'all' else write):
+        intermediates.write_results(name, results[name], excel=excel)
+
+    return results
+
+
+def clear_cache():
+
+    if os.path.exists(cache_directory):
+        shutil.rmtree(cache_directory)
+
+
+# ~~~~~~~STAGE KEYS~~~~~~~
+# the cache key of a stage hashes its source code (and that of the helper modules it imports) and, for every sheet
+# it reads, the names and values of the columns it uses plus the run numbers (a sheet of one of its own outputs is
+# not an input)
+
+
+def stage_key(script, reads, outputs=()):
+
+    key = hashlib.sha256()
+    path = os.path.join(script_directory, script)
+
+    for source_file in [path] + _helper_modules(path):
+        with open(source_file, 'rb') as source:
+            key.update(source.read())
+
+    used = columns_read(script)
+    for (source, sheet), columns in sorted(used.items()):
+        if source not in outputs and sheet not in reads.get(source, ()):
+            raise ValueError('%s reads sheet %r of %s, which STAGES does not list' % (script, sheet, source))
+
+    for source in sorted(reads):
+        for sheet in reads[source]:
+            if source == INPUTS:
+                frame = load_registry(INPUTS).sheet(sheet)
+            else:
+                frame = intermediates.read_results(source, sheet)
+
+            columns = used.get((source, sheet))
+            if columns is None or not all(column in frame.columns for column in columns):
+                columns = list(frame.columns)
+
+            key.update(('%s/%s' % (source, sheet)).encode())
+            key.update(np.ascontiguousarray(frame.index.values).tobytes())
+            for column in sorted(columns, key=str):
+                values = np.ascontiguousarray(frame[column].values)
+                key.update(('%s:%s' % (column, values.dtype)).encode())
+                key.update(values.tobytes() if values.dtype.kind != 'O' else str(list(values)).encode())
+
+    return key.hexdigest()
+
+
+# {(source, sheet): columns} for every sheet a script reads with read_results or input_data.sheet. The columns are
+# the attributes taken from the variable the sheet is assigned to; None when the script uses that variable in any
+# other way (iloc, whole-table arithmetic, ...) or names something that is not a column, i.e. the whole sheet counts.
+
+
+def columns_read(script):
+
+    with open(os.path.join(script_directory, script)) as source:
+        tree = ast.parse(source.read())
+
+    parents = {}
+    for node in ast.walk(tree):
+        for child in ast.iter_child_nodes(node):
+            parents[child] = node
+
+    variables = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+            read = _sheet_read(node.value)
+            if read is not None:
+                variables.setdefault(node.targets[0].id, []).append(read)
+
+    used = {}
+    for name, sheets in variables.items():
+        columns = set()
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Name) and node.id == name and isinstance(node.ctx, ast.Load):
+                parent = parents[node]
+                if isinstance(parent, ast.Attribute) and columns is not None:
+                    columns.add(parent.attr)
+                else:
+                    columns = None
+
+        for sheet in sheets:
+            if columns is None or used.get(sheet, ()) is None:
+                used[sheet] = None
+            else:
+                used[sheet] = sorted(columns.union(used.get(sheet, ())))
+
+    return used
+
+
+def _sheet_read(call):
+
+    if not isinstance(call, ast.Call) or not all(isinstance(argument, ast.Constant) for argument in call.args):
+        return None
+    arguments = [argument.value for argument in call.args]
+
+    if isinstance(call.func, ast.Name) and call.func.id == 'read_results':
+        return arguments[0], arguments[1] if len(arguments) > 1 else 'Sheet1'  # to_excel's default (first) sheet
+    if isinstance(call.func, ast.Attribute) and call.func.attr == 'sheet':
+        return INPUTS, arguments[0]
+
+    return None
+
+
+def _helper_modules(path):
+
+    with open(path) as source:
+        tree = ast.parse(source.read())
+
+    modules = []
+    for node in ast.walk(tree):
+        names = [alias.name for alias in node.names] if isinstance(node, ast.Import) else \
+            [node.module] if isinstance(node, ast.ImportFrom) and node.module else []
+        for name in names:
+            module_file = os.path.join(script_directory, name + '.py')
+            if os.path.exists(module_file) and module_file not in modules:
+                modules.append(module_file)
+                modules.extend(module for module in _helper_modules(module_file) if module not in modules)
+
+    return modules
+
+
+# ~~~~~~~CONVERGENCE-DRIVEN SAMPLING~~~~~~~
+# sample tables from sampling.converge_quantiles have one (sheet, label) column per uncertain parameter; they are
+# split into the sheets of OUTPUT_uncertainty_ranges (as 1_uncertainty_ranges.py writes them), stages 2 to 8 run on
+# them in memory, and one break even payment per run (output: result and sheet) is returned. The numbered scripts
+# evaluate at most stage_runs runs (their N_runs), so larger tables are evaluated stage_runs runs at a time.
+
+CONVERGE_OUTPUT = ('RESULTS_break_even_Scenario2_subsidized_July31', 'break_even_scenario')
+stage_runs = 10000
+
+
+def uncertainty_sheets(samples):
+
+    return dict((sheet, samples[sheet]) for sheet, distribution in SAMPLED_SHEETS)
+
+
+def break_even_payments(samples, output=CONVERGE_OUTPUT):
+
+    payments = []
+    for first in range(0, samples.shape[0], stage_runs):
+        results = run_pipeline(2, 8, results={UNCERTAINTY: uncertainty_sheets(samples.iloc[first:first + stage_runs])},
+                               cache=False, verbose=False)
+        payments.append(results[output[0]][output[1]].values[:, 0])
+
+    return np.concatenate(payments)
+
+
+# returns the break even payments of the final sample, the quantile history indexed by number of runs, and whether
+# the tolerance was met; options go to sampling.converge_quantiles (quantiles, rtol, initial_samples, max_samples,
+# method, seed)
+
+
+def converge(output=CONVERGE_OUTPUT, **options):
+
+    return converge_quantiles(lambda samples: break_even_payments(samples, output), read_parameters(INPUTS), **options)
+
+
+def _stage_range(text):
+
+    first, _, last = text.partition('-')
+    return int(first), int(last or first)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run the numbered scripts in one process.')
+    parser.add_argument('--stages', default='1-15', help='stage or range of stages to run, e.g. 5 or 2-7')
+    parser.add_argument('--write', nargs='*', default=[], metavar='NAME', help='results to write to disk')
+    parser.add_argument('--write-all', action='store_true', help='write every result of the run to disk')
+    parser.add_argument('--excel', action='store_true', help='also export the written results to Excel')
+    parser.add_argument('--no-cache', action='store_true', help='run every stage, ignoring cached outputs')
+    parser.add_argument('--clear-cache', action='store_true', help='delete all cached outputs first')
+    parser.add_argument('--converge', action='store_true',
+                        help='sample until the quantiles of the break even payment settle, instead of running stages')
+    parser.add_argument('--rtol', type=float, default=1e-3, help='relative change of the quantiles to stop at')
+    parser.add_argument('--max-samples', type=int, default=2 ** 20, help='most runs drawn by --converge')
+    parser.add_argument('--seed', type=int, default=None, help='root seed of the --converge samples')
+    arguments = parser.parse_args()
+
+    if arguments.clear_cache:
+        clear_cache()
+    if arguments.converge:
+        payments, history, converged = converge(rtol=arguments.rtol, max_samples=arguments.max_samples,
+                                                seed=arguments.seed)
+        print('break even payment (USD/kg) quantiles of %s, %s' % CONVERGE_OUTPUT)
+        print(history.to_string())
+        print('converged' if converged else 'not converged within %d runs' % arguments.max_samples)
+    else:
+        first_stage, last_stage = _stage_range(arguments.stages)
+        run_pipeline(first_stage, last_stage, write='all' if arguments.write_all else arguments.write,
+                     excel=arguments.excel, cache=not arguments.no_cache)
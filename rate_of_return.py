@@ -0,0 +1,514 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, rate_of_return.py, solves the rate of return of the rate of return scripts (12_rate_of_return_
+# scenario2_subsidized.py and its siblings) for every run and nutrient payment at once. The rate of return r is the
+# root of the net present cost over the project horizon,
+#
+#     f(r) = capital + (annual - revenue) a(r) + sum_t e_t (1 + r)^-t,    a(r) = ((1 + r)^n - 1)/(r (1 + r)^n)
+#
+# with n the horizon (8 years) and e_t the cash flows of the lifecycle events in year t = 1 ... n: the replacements,
+# maintenance, and salvage value of every component on its sampled lifetime (lifecycle.py, the same schedule as the
+# break even engine, see scenarios.lifecycle_flows). With every lifetime equal to the horizon and maintenance at
+# half of it, the only event is that maintenance in year 4, the equation the scripts used to solve.
+#
+# Because the revenue term is linear in the payment, f(r) = 0 also gives the payment that yields a rate of return r
+# in closed form, payment(r) = (annual + (capital + sum_t e_t (1 + r)^-t)/a(r))/annual_mass. The rate of return
+# frontier of a run is therefore fully described by its capital, annual, and annual_mass and its n event cash flows,
+# stored by the scripts as the frontier sheet, and frontier_rates inverts payment(r) for any grid of payments:
+# payment(r) is tabulated on a fixed grid of rates, the first interval of the table over which it crosses each
+# payment is found, and a few safeguarded Newton steps within that interval give the smallest rate of return reaching
+# the payment. payment(r) is not monotone in general (salvage values, or capital below zero once the aid agency pays
+# more than the construction costs): a payment above payment(r) at every rate gives the upper bound (50, i.e. 5000%),
+# one below it at every rate does not break even at any rate of return within the bounds (NaN). The scripts
+# derive their Sheet1 (every run at the nutrient_payment_shortened payments) from the frontier this way, so Sheet1
+# and a query of the stored frontier give the same rate of return. The costs may carry a leading axis of aid
+# policies (aid.py), giving the rate of return or frontier of every policy and run at once; the subsidized scripts
+# store the frontiers of the partial and capped pit latrine payments this way (the aid_policy_frontier sheet, see
+# frontier_table). Run this file directly to query stored frontiers, e.g. python rate_of_return.py
+# RESULTS_rate_of_return_Scenario2_subsidized_July31 --payments nutrient_payment nutrient_payment_UDDT_only (add
+# --frontier aid_policy_frontier for the aid policies)
+#
+# solve_rate_of_return solves the net present cost directly instead, for equations that are not on a frontier grid:
+# all of them together by Newton's method safeguarded by bisection, where each equation keeps a bracket [lo, hi]
+# around its root and a Newton step leaving the bracket is replaced by its midpoint, so every equation converges
+# whatever its costs. The result is the point where scipy.optimize.least_squares(f, 1, bounds=(0, 50)) stops, as
+# the scripts used to call it: starting from r = 1 and going the way |f| decreases, the first root of f, else the
+# first minimum of |f| (where the cash flows cannot break even), else the bound (0 or 50). Roots agree with
+# least_squares to within 1e-8; where |f| decreases all the way to a bound, least_squares stops within its own
+# tolerance (up to about 1e-7) of the bound, which is returned exactly. Where the payment never breaks even and |f|
+# is not monotone, neither the minimum nor the bound is a rate of return: |f| is flat there, and least_squares stops
+# wherever its tolerances are met, or its trust region steps past a shallow minimum to the bound.
+# least_squares_check (python rate_of_return.py --check) compares the two on a seeded sample, and frontier_check
+# compares frontier_rates with solve_rate_of_return on that sample and on stored frontiers.
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+import argparse
+from collections import namedtuple
+import numpy as np  # import NumPy library for array calculations
+import pandas as pd  # import pandas for matrix data manipulation
+from scipy.optimize import least_squares  # the solver the scripts used to call, for least_squares_check
+from registry import load_registry  # compiled input_data_file.xlsx
+from intermediates import ResultsWriter, read_results  # columnar results handed between the scripts
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+# (runs) capital, annual as in net_present_cost and annual_mass: nutrients paid for (kg/yr), and (runs x years) events,
+# or (policies x runs) and (policies x runs x years) with one row per aid policy; a frontier sheet read with
+# read_results works the same way (events in its columns event_1 ... event_n, see frontier_table)
+Frontier = namedtuple('Frontier', 'capital annual events annual_mass')
+
+frontier_nodes = 64  # rates at which payment(r) is tabulated to locate each payment
+frontier_block = 4096  # runs whose rates are solved at once (bounds temporary memory)
+check_nodes = 4096  # rates at which least_squares_check tells whether |f| is monotone
+
+# ~~~~~~~ANNUITY FACTOR~~~~~~~
+# present value of 1 USD paid at the end of every year of the lifetime, ((1 + r)^n - 1)/(r (1 + r)^n), and its
+# derivative with respect to r; both are taken at their limits (n and -n (n + 1)/2) for r = 0
+
+
+def annuity_factor(r, lifetime=8):
+
+    r = np.asarray(r, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        factor = -np.expm1(-lifetime * np.log1p(r))/r
+    return np.where(r == 0, float(lifetime), factor)
+
+
+def annuity_factor_slope(r, lifetime=8):
+
+    r = np.asarray(r, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (lifetime * (1 + r)**(-lifetime - 1.0) - annuity_factor(r, lifetime))/r
+    return np.where(r == 0, -lifetime * (lifetime + 1)/2.0, slope)
+
+
+# ~~~~~~~LIFECYCLE EVENTS~~~~~~~
+# present value of the (..., years) event cash flows paid at the end of years 1 ... n, sum_t e_t (1 + r)^-t, and its
+# derivative with respect to r, -sum_t t e_t (1 + r)^(-t - 1); r broadcasts with the leading axes of events. Both are
+# evaluated by Horner's rule in 1/(1 + r), one multiply-add per year and no (... x years) temporary array.
+
+
+def event_value(r, events):
+
+    return _horner(r, events, np.ones(np.shape(events)[-1]))
+
+
+def event_value_slope(r, events):
+
+    return -_horner(r, events, np.arange(1.0, np.shape(events)[-1] + 1))/(1.0 + np.asarray(r, dtype=float))
+
+
+def _horner(r, events, weights):
+
+    events = np.asarray(events, dtype=float)
+    discount = 1.0/(1.0 + np.asarray(r, dtype=float))
+    value = 0.0
+    for year in range(events.shape[-1], 0, -1):
+        value = (value + weights[year - 1] * events[..., year - 1]) * discount
+    return value
+
+
+# ~~~~~~~NET PRESENT COST~~~~~~~
+# capital: material and construction labor (USD); annual: operation and consumables (USD/yr); events: (..., years)
+# lifecycle cash flows of years 1 ... n (USD), whose last axis sets the horizon n; revenue: nutrient payments
+# (USD/yr); any shapes that broadcast together (events without its last axis)
+
+
+def net_present_cost(r, capital, annual, events, revenue):
+
+    return capital + (annual - revenue) * annuity_factor(r, np.shape(events)[-1]) + event_value(r, events)
+
+
+def _slope(r, annual, events, revenue):
+
+    return (annual - revenue) * annuity_factor_slope(r, np.shape(events)[-1]) + event_value_slope(r, events)
+
+
+# ~~~~~~~RATE OF RETURN~~~~~~~
+# the arguments of net_present_cost, e.g. (runs x 1) costs and (runs x payments) revenue; bounds: (lowest, highest)
+# rate of return in decimal form; tolerance: relative change of r at which an equation has converged. Returns the
+# rate of return of every equation (the broadcast shape of the arguments, a 0-d array for scalars), NaN where any of
+# its costs or revenue is NaN or infinite.
+
+
+def solve_rate_of_return(capital, annual, events, revenue, bounds=(0, 50), tolerance=1e-14, max_iterations=200):
+
+    events = np.asarray(events, dtype=float)
+    shape = np.broadcast_shapes(*[np.shape(value) for value in (capital, annual, revenue)] + [events.shape[:-1]])
+    capital, annual, revenue = [np.broadcast_to(np.asarray(value, dtype=float), shape or (1,))
+                                for value in (capital, annual, revenue)]
+    events = np.broadcast_to(events, (shape or (1,)) + events.shape[-1:])
+
+    def cost(r, index):
+        return net_present_cost(r, capital[index], annual[index], events[index], revenue[index])
+
+    def slope(r, index):
+        return _slope(r, annual[index], events[index], revenue[index])
+
+    # least_squares starts at r = 1 and goes the way |f| decreases, stopping at the first root of f, or else at the
+    # first minimum of |f| (f' = 0) or at the bound it runs into
+    everything = (slice(None),) * capital.ndim
+    start = np.full(capital.shape, min(max(1.0, bounds[0]), bounds[1]))
+    f_start, slope_start = cost(start, everything), slope(start, everything)
+    end = np.where(f_start * slope_start < 0, float(bounds[1]), float(bounds[0]))
+    f_end, slope_end = cost(end, everything), slope(end, everything)
+
+    r = np.where(f_start == 0, start, end)
+    roots = np.sign(f_start) * np.sign(f_end) < 0
+    minima = ~roots & (f_start != 0) & (np.sign(slope_start) * np.sign(slope_end) < 0)
+    r[roots] = _bracketed_root(cost, slope, start, end, roots, tolerance, max_iterations)
+    r[minima] = _bracketed_root(slope, None, start, end, minima, tolerance, max_iterations)
+    r[~(np.isfinite(capital) & np.isfinite(annual) & np.isfinite(events).all(axis=-1) & np.isfinite(revenue))] = np.nan
+
+    return r.reshape(shape)
+
+
+# root of function(x, index) between a and b (opposite signs) for every selected equation: Newton steps from a (or
+# start) when derivative is given, bisection when there is none or a step leaves the bracket
+
+
+def _bracketed_root(function, derivative, a, b, selected, tolerance, max_iterations, start=None):
+
+    index = np.nonzero(selected)
+    x, lo, hi = (a if start is None else start)[index], np.minimum(a, b)[index], np.maximum(a, b)[index]
+    f_lo = function(lo, index)
+    active = np.ones(x.shape, dtype=bool)
+
+    for iteration in range(max_iterations):
+        if not active.any():
+            break
+        subset = tuple(axis[active] for axis in index)
+        f = function(x[active], subset)
+
+        below = np.sign(f) == np.sign(f_lo[active])  # the root lies above x
+        lo[active], f_lo[active] = np.where(below, x[active], lo[active]), np.where(below, f, f_lo[active])
+        hi[active] = np.where(below, hi[active], x[active])
+        middle = (lo[active] + hi[active])/2
+        if derivative is None:
+            step = middle
+        else:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                step = x[active] - f/derivative(x[active], subset)
+            step = np.where(np.isfinite(step) & (step > lo[active]) & (step < hi[active]), step, middle)
+
+        done = (f == 0) | (np.abs(step - x[active]) <= tolerance * (1 + np.abs(x[active])))
+        x[active] = np.where(f == 0, x[active], step)
+        active[np.nonzero(active)[0][done]] = False
+
+    return x
+
+
+# ~~~~~~~RATE OF RETURN FRONTIER~~~~~~~
+# frontier: Frontier (or frontier sheet); rates: (rates) in decimal form. Returns the (runs x rates), or (policies x
+# runs x rates), nutrient payment (USD/kg) at which each run has each rate of return. A run whose annual_mass is zero
+# or negative recovers no nutrients to be paid for, so no payment gives it a rate of return; its row is NaN, like a
+# run with non-finite costs or mass.
+
+
+def frontier_payments(frontier, rates):
+
+    rates = np.asarray(rates, dtype=float).ravel()
+    capital, annual, events, annual_mass, valid = _frontier_runs(frontier)
+
+    payments = _payments(capital, annual, events[:, np.newaxis, :], annual_mass, rates)
+    return np.where(valid, payments, np.nan).reshape(_frontier_shape(frontier) + (rates.size,))
+
+
+# payments: (payments) nutrient payment (USD/kg). Returns the (runs x payments), or (policies x runs x payments),
+# rate of return: the smallest rate at which payment(r) reaches the payment, located on the frontier_nodes rates
+# (payment(r) need not be monotone), the upper bound where payment(r) is below the payment at every rate, and NaN
+# where it is above it at every rate (the run never breaks even at the payment) or the run has no valid frontier (see
+# frontier_payments). Runs are solved frontier_block at a time, so the temporary arrays stay small however many runs
+# and policies are queried.
+
+
+def frontier_rates(frontier, payments, bounds=(0, 50), tolerance=1e-14, max_iterations=200):
+
+    payments = np.asarray(payments, dtype=float).ravel()
+    fields = _frontier_runs(frontier)
+    rates = bounds[0] + (bounds[1] - bounds[0]) * np.linspace(0, 1, frontier_nodes)**3  # denser towards the bound
+
+    result = np.empty((fields[0].shape[0], payments.size))
+    for first in range(0, result.shape[0], frontier_block):
+        rows = slice(first, first + frontier_block)
+        result[rows] = _block_rates([field[rows] for field in fields], payments, rates, bounds, tolerance,
+                                    max_iterations)
+
+    return result.reshape(_frontier_shape(frontier) + (payments.size,))
+
+
+def _block_rates(fields, payments, rates, bounds, tolerance, max_iterations):
+
+    shape = (fields[0].shape[0], payments.size)
+    capital, annual, annual_mass, valid = [np.broadcast_to(field, shape) for field in fields[:2] + fields[3:]]
+    events = np.broadcast_to(fields[2][:, np.newaxis, :], shape + fields[2].shape[-1:])
+    target = np.broadcast_to(payments[np.newaxis, :], shape)
+
+    # payment(r) at the rates, above or below each payment, and the first node interval over which it crosses the
+    # payment (or node at which it equals it): the bracket of the smallest rate reaching the payment. payment(r) need
+    # not be monotone, e.g. with salvage values or negative capital, so it is not assumed to rise from payment(0)
+    table = _payments(fields[0], fields[1], fields[2][:, np.newaxis, :], fields[3], rates)
+    over = table[:, np.newaxis, :] > target[:, :, np.newaxis]
+    under = table[:, np.newaxis, :] < target[:, :, np.newaxis]
+    equal = ~over & ~under
+    crossed = np.concatenate([equal[:, :, :-1] | (over[:, :, :-1] & under[:, :, 1:])
+                              | (under[:, :, :-1] & over[:, :, 1:]), equal[:, :, -1:]], axis=2)
+    found = crossed.any(axis=2)
+    lower = crossed.argmax(axis=2)
+
+    # without a crossing, payment(r) is below the payment at every rate (the run breaks even up to the upper bound) or
+    # above it at every rate (the run never breaks even, NaN)
+    valid = valid & np.isfinite(target)
+    result = np.where(~found & under[:, :, 0] & valid, float(bounds[1]), np.nan)
+    runs, payment = np.arange(shape[0])[:, np.newaxis], np.arange(shape[1])[np.newaxis, :]
+    exact = valid & found & equal[runs, payment, lower]
+    result[exact] = rates[lower[exact]]
+    inside = valid & found & ~exact
+    upper = np.minimum(lower + 1, frontier_nodes - 1)
+    p_lo, p_hi = table[runs, lower], table[runs, upper]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        share = np.clip(np.where(p_hi != p_lo, (target - p_lo)/(p_hi - p_lo), 0), 0, 1)
+    start = rates[lower] + share * (rates[upper] - rates[lower])  # linear interpolation in the table
+
+    def excess(r, index):  # payment(r) - payment, proportional to -f(r)
+        return _payments(capital[index], annual[index], events[index], annual_mass[index], r) - target[index]
+
+    def slope(r, index):
+        factor = annuity_factor(r, events.shape[-1])
+        return (event_value_slope(r, events[index]) * factor
+                - (capital[index] + event_value(r, events[index])) * annuity_factor_slope(r, events.shape[-1])) \
+            / (factor**2 * annual_mass[index])
+
+    result[inside] = _bracketed_root(excess, slope, rates[lower], rates[upper], inside, tolerance, max_iterations,
+                                     start)
+
+    return result
+
+
+# payment(r) of the frontier equation (USD/kg)
+
+
+def _payments(capital, annual, events, annual_mass, r):
+
+    return (annual + (capital + event_value(r, events))/annuity_factor(r, np.shape(events)[-1]))/annual_mass
+
+
+# the frontier as a sheet with one row per run, or with a (policies x runs) frontier one row per policy and run,
+# policy by policy, labelled by policy (index of the aid policy) and run, and one column per field with the events
+# in event_1 ... event_n; frontier_rates of the sheet gives one row of rates per row. index: the run numbers (e.g. of
+# a block of runs, see intermediates.run_chunks), 0, 1, ... if not given
+
+
+def frontier_table(frontier, index=None):
+
+    shape = _frontier_shape(frontier)
+    runs = np.arange(shape[-1]) if index is None else np.asarray(index)
+    capital, annual, events, annual_mass, valid = _frontier_runs(frontier)
+    columns = [('capital', capital), ('annual', annual)] \
+        + [('event_%d' % year, events[:, year - 1]) for year in range(1, events.shape[1] + 1)] \
+        + [('annual_mass', np.broadcast_to(np.asarray(frontier.annual_mass, dtype=float), shape).ravel())]
+    table = pd.DataFrame(dict((name, np.ravel(values)) for name, values in columns),
+                         index=runs if len(shape) == 1 else None)
+    if len(shape) == 2:
+        table.insert(0, 'policy', np.repeat(np.arange(shape[0]), shape[1]))
+        table.insert(1, 'run', np.tile(runs, shape[0]))
+
+    return table
+
+
+# (runs x 1) capital, annual, annual_mass and (runs x years) events of a frontier, policies and runs flattened
+# together, and whether each run has a frontier (finite values and a positive annual_mass); the annual_mass of the
+# other runs is set to 1 so they compute without warnings
+
+
+def _frontier_runs(frontier):
+
+    shape = _frontier_shape(frontier)
+    events = frontier_events(frontier)
+    capital, annual, annual_mass = [np.broadcast_to(np.asarray(getattr(frontier, field), dtype=float), shape)
+                                    .reshape(-1, 1) for field in ('capital', 'annual', 'annual_mass')]
+    events = np.broadcast_to(events, shape + events.shape[-1:]).reshape(-1, events.shape[-1])
+    valid = np.isfinite(capital) & np.isfinite(annual) & np.isfinite(events).all(axis=1, keepdims=True) \
+        & np.isfinite(annual_mass) & (annual_mass > 0)
+
+    return capital, annual, events, np.where(valid, annual_mass, 1.0), valid
+
+
+def _frontier_shape(frontier):
+
+    return np.broadcast_shapes(*[np.shape(getattr(frontier, field)) for field in ('capital', 'annual', 'annual_mass')]
+                               + [frontier_events(frontier).shape[:-1]])
+
+
+# (..., years) events of a Frontier, or of a frontier sheet from its columns event_1 ... event_n
+
+
+def frontier_events(frontier):
+
+    if isinstance(frontier, Frontier):
+        return np.asarray(frontier.events, dtype=float)
+
+    columns = ['event_%d' % year for year in range(1, len(frontier.columns) + 1) if 'event_%d' % year in frontier]
+    if not columns:
+        raise ValueError('the frontier sheet has no event_1 ... event_n columns; it was stored before the lifecycle '
+                         'events were part of the frontier, so run its rate of return script again')
+    return np.asarray(frontier[columns], dtype=float)
+
+
+# ~~~~~~~REGRESSION CHECK~~~~~~~
+# solves n_equations seeded random equations with solve_rate_of_return and one by one with
+# scipy.optimize.least_squares(f, 1, bounds=(0, 50)), as the scripts used to. Costs are of the size of the scripts'
+# runs, with maintenance at half of the horizon, a replacement or salvage value in the last year (and in half of the
+# equations the year before), and payments from well below to well above break even, so the sample holds roots,
+# flat minima of |f|, and both bounds. Each equation is one kind: root (f(r) = 0), bound (no root and |f| monotone
+# over the bounds, checked at check_nodes rates, so the bound is the only place to stop), or minimum (no root, |f|
+# not monotone). Returns one row per kind: the number of equations, the largest and median difference from
+# least_squares, the tolerance, and whether the kind was found and is within it. Minima are only reported (no
+# tolerance): the payment never breaks even there, see above.
+
+
+def least_squares_check(n_equations=600, seed=20190314, horizon=8, bounds=(0, 50)):
+
+    random = np.random.default_rng(seed)
+    capital = random.uniform(0, 1e5, n_equations)  # (USD)
+    annual = random.uniform(0, 1e5, n_equations)  # (USD/yr)
+    events = np.zeros((n_equations, horizon))  # (USD)
+    events[:, horizon//2 - 1] = random.uniform(0, 5e4, n_equations)
+    events[:, -1] = random.uniform(-1e5, 5e4, n_equations)
+    events[:, -2] = random.uniform(-5e4, 5e4, n_equations) * (random.random(n_equations) < 0.5)
+    revenue = annual + random.uniform(-0.2, 1, n_equations) * (capital + events.sum(axis=1)) \
+        / random.uniform(0.5, horizon, n_equations)  # (USD/yr)
+
+    r = solve_rate_of_return(capital, annual, events, revenue, bounds)
+    expected = np.array([least_squares(lambda x: net_present_cost(x, capital[k], annual[k], events[k], revenue[k]),
+                                       1, bounds=bounds).x[0] for k in range(n_equations)])
+
+    scale = np.abs(capital) + np.abs(annual) + np.abs(events).sum(axis=1) + np.abs(revenue)
+    root = np.abs(net_present_cost(r, capital, annual, events, revenue)) <= 1e-9 * scale
+    rates = bounds[0] + (bounds[1] - bounds[0]) * np.linspace(0, 1, check_nodes)**3
+    columns = [value[:, np.newaxis] for value in (capital, annual, revenue)]
+    descent = np.sign(net_present_cost(rates, columns[0], columns[1], events[:, np.newaxis, :], columns[2])
+                      * _slope(rates, columns[1], events[:, np.newaxis, :], columns[2]))
+    monotone = (descent == descent[:, :1]).all(axis=1) & (descent[:, 0] != 0)
+    difference = np.abs(r - expected)
+
+    rows = []
+    for kind, selected, tolerance in (('root', root, 1e-8), ('bound', ~root & monotone, 1e-7),
+                                      ('minimum', ~root & ~monotone, np.nan)):
+        found = difference[selected]
+        rows.append((kind, found.size, found.max() if found.size else np.nan,
+                     np.median(found) if found.size else np.nan, tolerance,
+                     bool(found.size) and not (found.max() > tolerance)))
+
+    return pd.DataFrame(rows, columns=['kind', 'equations', 'max_difference', 'median_difference', 'tolerance',
+                                       'passed']).set_index('kind')
+
+
+
+# seeded random frontiers of n_runs runs like least_squares_check's equations, with capital below zero in about one
+# run in six (the aid agency paying more than the construction costs) and nutrients recovered of the size of the
+# scripts' runs, so payment(r) rises, falls, or turns over the bounds; query them at 0 to 5 USD/kg as Sheet1 does
+
+
+def frontier_sample(n_runs=600, seed=20190314, horizon=8):
+
+    random = np.random.default_rng(seed)
+    capital = random.uniform(-2e4, 1e5, n_runs)  # (USD)
+    annual = random.uniform(0, 1e5, n_runs)  # (USD/yr)
+    events = np.zeros((n_runs, horizon))  # (USD)
+    events[:, horizon//2 - 1] = random.uniform(0, 5e4, n_runs)
+    events[:, -1] = random.uniform(-1e5, 5e4, n_runs)
+    events[:, -2] = random.uniform(-5e4, 5e4, n_runs) * (random.random(n_runs) < 0.5)
+    annual_mass = random.uniform(1e4, 1e5, n_runs)  # (kg/yr)
+
+    return Frontier(capital, annual, events, annual_mass)
+
+
+# frontier: Frontier (or frontier sheet, e.g. a stored one); payments: (payments) nutrient payment (USD/kg). Solves
+# every valid run at every payment with frontier_rates and with solve_rate_of_return, frontier_block runs at a time.
+# Each equation is one kind: root (solve_rate_of_return stops at a root of f) or no root (it stops at a minimum of
+# |f| or a bound). For roots the difference is that between the two rates; where the payment has several rates of
+# return the frontier gives the smallest and the solver the one it reaches from r = 1, so a smaller root of the
+# frontier counts as no difference, and a frontier without a rate of return (NaN) as an infinite one. Without a root
+# the frontier must give NaN, the upper bound, or a root the solver passed by: the difference is |f| at the frontier
+# rate relative to the costs and revenue (0 for NaN or the upper bound). Returns one row per kind as
+# least_squares_check does, whether or not the kind was found.
+
+
+def frontier_check(frontier, payments, bounds=(0, 50)):
+
+    payments = np.asarray(payments, dtype=float).ravel()
+    capital, annual, events, annual_mass, valid = _frontier_runs(frontier)
+
+    differences = {'root': [], 'no root': []}
+    for first in range(0, capital.shape[0], frontier_block):
+        block = slice(first, first + frontier_block)
+        revenue = annual_mass[block] * payments  # (USD/yr)
+        cash_flows = capital[block], annual[block], events[block][:, np.newaxis, :], revenue
+        scale = np.abs(capital[block]) + np.abs(annual[block]) + np.abs(events[block]).sum(axis=1, keepdims=True) \
+            + np.abs(revenue)
+
+        runs = Frontier(capital[block, 0], annual[block, 0], events[block], annual_mass[block, 0])
+        frontier_rate = frontier_rates(runs, payments, bounds)
+        solver_rate = solve_rate_of_return(*cash_flows, bounds=bounds)
+        with np.errstate(invalid='ignore'):
+            frontier_root = np.abs(net_present_cost(frontier_rate, *cash_flows)) <= 1e-9 * scale
+            root = np.abs(net_present_cost(solver_rate, *cash_flows)) <= 1e-9 * scale
+            difference = np.where(frontier_root & (frontier_rate < solver_rate), 0,
+                                  np.abs(frontier_rate - solver_rate))
+            residual = np.where(np.isnan(frontier_rate) | (frontier_rate == bounds[1]), 0,
+                                np.abs(net_present_cost(frontier_rate, *cash_flows))/scale)
+        differences['root'].append(np.where(np.isnan(difference), np.inf, difference)[root & valid[block]])
+        differences['no root'].append(residual[~root & valid[block]])
+
+    rows = []
+    for kind, tolerance in (('root', 1e-8), ('no root', 1e-9)):
+        found = np.concatenate(differences[kind])
+        rows.append((kind, found.size, found.max() if found.size else np.nan,
+                     np.median(found) if found.size else np.nan, tolerance, not (found.max(initial=0) > tolerance)))
+
+    return pd.DataFrame(rows, columns=['kind', 'equations', 'max_difference', 'median_difference', 'tolerance',
+                                       'passed']).set_index('kind')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Query stored rate of return frontiers at payment grids.')
+    parser.add_argument('results', nargs='*', help='rate of return results holding a frontier sheet')
+    parser.add_argument('--payments', nargs='+', default=['nutrient_payment'],
+                        help='sheets of input_data_file.xlsx with the payments (USD/kg) to query')
+    parser.add_argument('--frontier', default='frontier',
+                        help='frontier sheet to query, e.g. aid_policy_frontier (one row of rates per row)')
+    parser.add_argument('--check', action='store_true',
+                        help='compare the solver with scipy.optimize.least_squares and the frontier with the solver on '
+                             'seeded samples, and the frontier sheet of the results (if given) with the solver at the '
+                             'payments, instead of querying them')
+    arguments = parser.parse_args()
+    if not arguments.results and not arguments.check:
+        parser.error('give the results to query, or --check')
+
+    input_data = load_registry('input_data_file.xlsx')
+    if arguments.check:
+        checks = [('least_squares_check', least_squares_check()),
+                  ('frontier_check (seeded sample)', frontier_check(frontier_sample(), np.linspace(0, 5, 101)))]
+        for result in arguments.results:
+            stored_frontier = read_results(result, arguments.frontier)
+            for payment_sheet in arguments.payments:
+                checks.append(('frontier_check (%s %s at %s)' % (result, arguments.frontier, payment_sheet),
+                               frontier_check(stored_frontier, input_data.sheet(payment_sheet).iloc[:, 0])))
+        for name, check in checks:
+            print('%s\n%s\n' % (name, check.to_string()))
+        if not all(check.passed.all() for name, check in checks):
+            raise SystemExit('the rate of return solver or frontier disagrees with its reference (see above)')
+    else:
+        for result in arguments.results:
+            stored_frontier = read_results(result, arguments.frontier)
+            writer = ResultsWriter(result + '_' + arguments.frontier)
+            for payment_sheet in arguments.payments:
+                payment_range = input_data.sheet(payment_sheet).iloc[:, 0]
+                queried = pd.DataFrame(frontier_rates(stored_frontier, payment_range))
+                queried.columns = [payment_range]
+                writer.write(payment_sheet, queried)
+            writer.save()
+            print('%s: %s written to %s' % (result, ', '.join(arguments.payments), result + '_' + arguments.frontier))
@@ -0,0 +1,197 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, registry.py, compiles every sheet of input_data_file.xlsx once into a typed binary registry
+# (input_data_file.registry.npz) so the scripts do not parse the workbook with openpyxl on every run. The registry
+# stores the SHA-256 of the workbook it was compiled from and is recompiled automatically when the workbook changes.
+# The workbook is only hashed when its size or modification time differs from the ones recorded with the registry,
+# so the scripts of a pipeline run load the registry without reading the workbook again. Run this file directly to
+# compile the registry ahead of time.
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+import hashlib  # content hash of the workbook
+import os
+import tempfile
+import numpy as np  # import NumPy library for array calculations
+import pandas as pd  # import pandas for matrix data manipulation
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+registry_suffix = '.registry.npz'  # input_data_file.xlsx -> input_data_file.registry.npz
+
+# one record per row of every sheet with minimum and width columns (the uncertain parameters); the text fields ('U')
+# are as wide as their longest value, so no sheet name or label is truncated
+PARAMETER_FIELDS = (('sheet', 'U'), ('label', 'U'), ('distribution', 'U'), ('minimum', 'f8'), ('width', 'f8'),
+                    ('peak_distance', 'f8'))
+
+_loaded = {}  # (workbook stamp, registry) already loaded in this process, keyed by workbook path
+
+# ~~~~~~~COMPILE~~~~~~~
+# parses all sheets of the workbook and writes the registry next to it; numeric columns are stored as float or
+# integer arrays and text columns as fixed-width unicode arrays (empty cells become '')
+
+
+def compile_registry(workbook='input_data_file.xlsx'):
+
+    stamp = workbook_stamp(workbook)  # taken first, so an edit while compiling is seen by the next load
+    content_hash = workbook_hash(workbook)
+    sheets = pd.read_excel(workbook, sheet_name=None)
+    arrays = {'hash': np.array(content_hash), 'stamp': np.array(stamp, dtype=np.int64),
+              'sheets': np.array(list(sheets), dtype='U'), 'parameters': _parameter_records(sheets)}
+
+    for k, (name, frame) in enumerate(sheets.items()):
+        arrays['sheet%d_columns' % k] = np.array([str(column) for column in frame.columns], dtype='U')
+        for i, column in enumerate(frame.columns):
+            arrays['sheet%d_column%d' % (k, i)] = typed_column(frame.iloc[:, i])
+
+    path = registry_path(workbook)
+    _write_registry(path, arrays)
+
+    _loaded.pop(workbook, None)
+    return path
+
+
+# ~~~~~~~LOAD~~~~~~~
+# returns the registry of a workbook, compiling it first if it is missing or was built from different content; the
+# content is only hashed when the size or modification time of the workbook changed since the registry was built
+
+
+def load_registry(workbook='input_data_file.xlsx'):
+
+    stamp = workbook_stamp(workbook)
+    stamped, registry = _loaded.get(workbook, (None, None))
+
+    if registry is not None and stamped == stamp:
+        return registry
+
+    path = registry_path(workbook)
+    registry = _read_registry(path) if os.path.exists(path) else None
+
+    if registry is None or (registry.stamp != stamp and registry.hash != workbook_hash(workbook)):
+        compile_registry(workbook)
+        registry = _read_registry(path)
+    elif registry.stamp != stamp:  # same content, e.g. the workbook was copied or saved unchanged
+        registry.arrays['stamp'] = np.array(stamp, dtype=np.int64)
+        registry.stamp = stamp
+        _write_registry(path, registry.arrays)
+
+    _loaded[workbook] = (stamp, registry)
+    return registry
+
+
+def registry_path(workbook):
+
+    return os.path.splitext(workbook)[0] + registry_suffix
+
+
+# (size (bytes), modification time (ns)) of the workbook
+
+
+def workbook_stamp(workbook):
+
+    status = os.stat(workbook)
+    return status.st_size, status.st_mtime_ns
+
+
+def workbook_hash(workbook):
+
+    with open(workbook, 'rb') as workbook_file:
+        return hashlib.sha256(workbook_file.read()).hexdigest()
+
+
+# ~~~~~~~REGISTRY~~~~~~~
+# sheet(name) rebuilds one sheet as a DataFrame (same column names as the workbook); parameters() is the table of
+# uncertain parameters: sheet, label, distribution, minimum, width, and peak_distance (NaN for uniform rows)
+
+
+class InputRegistry(object):
+
+    def __init__(self, arrays):
+        self.arrays = arrays
+        self.hash = str(arrays['hash'])
+        self.stamp = tuple(int(value) for value in arrays['stamp']) if 'stamp' in arrays else None
+        self.sheets = list(arrays['sheets'])
+        self._frames = {}
+
+    def sheet(self, name):
+        if name not in self._frames:
+            k = self.sheets.index(name)
+            columns = self.arrays['sheet%d_columns' % k]
+            self._frames[name] = pd.DataFrame({i: self.arrays['sheet%d_column%d' % (k, i)]
+                                               for i in range(len(columns))})
+            self._frames[name].columns = list(columns)
+
+        return self._frames[name].copy()
+
+    def parameters(self):
+        return pd.DataFrame(self.arrays['parameters'])
+
+
+# written to a temporary file of its own, then swapped in, so readers never see half a registry and processes
+# recompiling a stale registry at the same time (e.g. the shards of a sampling run) do not write over each other
+
+
+def _write_registry(path, arrays):
+
+    descriptor, temporary = tempfile.mkstemp(suffix='.tmp', prefix=os.path.basename(path) + '.',
+                                             dir=os.path.dirname(path) or '.')
+    try:
+        with os.fdopen(descriptor, 'wb') as registry_file:
+            np.savez(registry_file, **arrays)
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(temporary, 0o666 & ~umask)  # mkstemp creates the file readable by its owner only
+        os.replace(temporary, path)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+# copies all arrays out of the registry file, which is closed again
+
+
+def _read_registry(path):
+
+    with np.load(path) as registry_file:
+        return InputRegistry(dict((name, registry_file[name]) for name in registry_file.files))
+
+
+def _parameter_records(sheets):
+
+    records = []
+
+    for name, frame in sheets.items():
+        if 'minimum' not in frame or 'width' not in frame or 'label' not in frame:
+            continue
+
+        if 'distribution' in frame:
+            distribution = frame.distribution.astype(str)
+        else:
+            distribution = pd.Series('triangle' if 'peak_distance' in frame else 'uniform', index=frame.index)
+        peak = frame.peak_distance if 'peak_distance' in frame else pd.Series(np.nan, index=frame.index)
+
+        for i in range(frame.shape[0]):
+            records.append((name, str(frame.label.iloc[i]), distribution.iloc[i], float(frame.minimum.iloc[i]),
+                            float(frame.width.iloc[i]), float(peak.iloc[i])))
+
+    dtype = [(name, '%s%d' % (kind, max([len(record[k]) for record in records] + [1])) if kind == 'U' else kind)
+             for k, (name, kind) in enumerate(PARAMETER_FIELDS)]
+    return np.array(records, dtype=dtype)
+
+
+def typed_column(column):
+
+    if column.dtype.kind in 'biuf':
+        return column.values
+
+    numeric = pd.to_numeric(column, errors='coerce')
+    if column.dtype.kind == 'O' and numeric.notna().sum() == column.notna().sum():
+        return numeric.values.astype(float)
+
+    return np.array(['' if pd.isnull(value) else str(value) for value in column], dtype='U')
+
+
+if __name__ == '__main__':
+    print(compile_registry())
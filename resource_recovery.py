@@ -0,0 +1,319 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, resource_recovery.py, is the cost model of 5_resource_recovery_cost.py evaluated for all runs at
+# once: urine storage tanks, transport, and a treatment train of unit processes, by default struvite precipitation
+# (P recovery), ion exchange (N recovery), and the K remaining in the fluid. Each unit process takes the influent
+# N, P, K mass flows and liquid flow of all runs as arrays and returns its effluent, the nutrients it recovers, its
+# capital and consumable costs, and its sizing, so processes can be replaced, removed, or reordered and a train is
+# evaluated one array operation at a time. Every formula of the original per-run loop, including the np.ceil sizing
+# of tanks, reactors, and columns and the rounding of the resin lifetime, is applied to whole columns of samples in
+# the same order of operations, so the default train gives results bit-identical to the loop. Tanks, reactors, and
+# columns are sized with sizing.py, so catalogs of several sizes can replace the single sizes; the community tanks
+# come from the memoized tank sizing of tank_sizing.py shared with the other scripts.
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+from abc import ABC, abstractmethod
+from collections import namedtuple
+import numpy as np  # import NumPy library for array calculations
+import pandas as pd  # import pandas for matrix data manipulation
+from sizing import EquipmentCatalog
+from tank_sizing import COMMUNITY_TANKS, tank_sizing
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+# General Constants
+usd_to_ugx = 3693.8  # UGX to USD conversion as of August 7, 2018
+MW_P = 30.973762  # (g P per mol P) molecular weight of phosphorus
+MW_N = 14.01  # (g N per mol N) molecular weight of nitrogen
+
+# Design of the system (defaults of 5_resource_recovery_cost.py)
+DESIGN = {'reference_flow': 1000,  # Number of UDDTs assumed to be 1,000 (or 500 of the modeled units)
+          'UDDT_users': 20,  # UNHCR assumes 20 users per UDDT and modeled unit is 2 UDDTs combined
+          'cycles_per_day': 8,  # (d^-1) Assume an 8 hour work day and that 8 cycles can be completed in 1 day
+          'reactor_volume': 500,  # (L) Volume of a single stainless steel tank with tapered bottom used as reactor
+          'column_loading': 100,  # (L/day) Daily loading rate of a single ion exchange column
+          't_urine_storage': 3}  # (days) storage time in 1000 L community tanks before emptied and trucked to treatment
+
+COST_RATIOS = (('labor', 'labor_cost_ratio'), ('op', 'op_cost_ratio'), ('maint', 'maint_cost_ratio'))
+
+# ~~~~~~~STREAMS~~~~~~~
+# Stream: N, P, K mass flows (kg/d) and liquid flow (L/d) of all runs (arrays); Nutrients: N, P, K masses (kg/d).
+# Treatment: what a unit process returns for the runs, i.e. its effluent Stream, the recovered Nutrients, its
+# capital cost (USD) and consumable cost (USD/d), its sizing ({name: equipment count}), and the columns of its
+# detailed cost sheet ({name: array}, in sheet order).
+
+Stream = namedtuple('Stream', 'N P K flow')
+Nutrients = namedtuple('Nutrients', 'N P K')
+Treatment = namedtuple('Treatment', 'effluent recovered capital consumables sizing details')
+
+# ~~~~~~~UNIT PROCESSES~~~~~~~
+# treat(influent, samples, design) evaluates a process for all runs; samples are the sample sheets ({sheet: table})
+# and design the design values (see DESIGN). name labels the cost columns (total_cap_cost_<name>, ...) and the
+# detailed cost sheet (<name>_cost); cost_ratio is the column of labor_cost_ratio, op_cost_ratio, and
+# maint_cost_ratio applied to its capital cost (None for a process without capital cost); report_influent lists
+# the influent of the process in the nutrients_recovered sheet (N_influent1, N_influent2, ...). A process must
+# implement treat, returning a Treatment whose arrays hold one value per run of the influent; UnitProcess itself
+# cannot be instantiated.
+
+
+class UnitProcess(ABC):
+
+    name = None
+    cost_ratio = None
+    report_influent = True
+
+    @abstractmethod
+    def treat(self, influent, samples, design):
+        pass
+
+
+# Struvite precipitation: recovers P_rec of the P and the stoichiometric N; reactors of design['reactor_volume'] run
+# design['cycles_per_day'] cycles, each with nylon filter bags, dosed with Mg(OH)2 (MgCO3 priced as an alternative).
+# reactors, an EquipmentCatalog of reactor volumes (L) priced relative to cost_P_reactor, replaces the single size.
+
+
+class StruvitePrecipitation(UnitProcess):
+
+    name = 'struvite'
+    cost_ratio = 'struvite'
+
+    N_P_ratio_struvite = 1  # (mol N per mol P in struvite) N:P ratio in struvite
+    MW_MgOH2 = 58.3197  # (g Mg(OH)2 per mol Mg(OH)2) molecular weight of magnesium hydroxide
+    MW_MgCO3 = 84.3139  # (g MgCO3 per mol MgCO3) molecular weight of magnesium carbonate
+    Mg_MgOH2_ratio = 1  # (mol Mg per mol Mg(OH)2) molar ratio of Mg to Mg(OH)2
+    Mg_MgCO3_ratio = 1  # (mol Mg per mol MgCO3) molar ratio of Mg to MgCO3
+
+    def __init__(self, P_rec=0.90, K_rec=0, Mg_dose=1.1, reactors=None):
+        self.P_rec = P_rec  # fraction of phosphorus recovered as struvite
+        self.K_rec = K_rec  # fraction of potassium recovered as struvite; zero because no K is recovered
+        self.Mg_dose = Mg_dose  # (mol Mg per mol P) Mg:P ratio
+        self.reactors = reactors
+
+    def treat(self, influent, samples, design):
+        recovered = Nutrients(self.P_rec * influent.P * (1 / MW_P) * self.N_P_ratio_struvite * MW_N,  # (kg N/d)
+                              self.P_rec * influent.P,  # (kg P/d)
+                              self.K_rec * influent.K)  # (kg K/d)
+
+        # Precipitation reactor, stirrer (cost_P_stirrer is in UGX/m2), and pipes
+        reactors = self.reactors or EquipmentCatalog(design['reactor_volume'])
+        sizing = reactors.size(influent.flow / design['cycles_per_day'])  # reactors holding the urine of a cycle
+        number_of_P_reactors = sizing.units
+        cap_cost_P_reactors = sizing.cost_units * _sample(samples, 'RR_P_recovery_uniform', 'cost_P_reactor')
+        cap_cost_P_stirrers = number_of_P_reactors * _sample(samples, 'RR_P_recovery_uniform', 'material_P_stirrer') \
+            * (_sample(samples, 'RR_P_recovery_uniform', 'cost_P_stirrer')/usd_to_ugx)  # (USD)
+        cap_cost_P_pipe = number_of_P_reactors * _sample(samples, 'RR_P_recovery_uniform', 'material_P_pipe') * \
+            _sample(samples, 'RR_P_recovery_uniform', 'cost_P_pipe')  # (USD)
+
+        # Consumable: Filter bags (priced per 20 bags)
+        daily_qty_filter_bags = number_of_P_reactors * design['cycles_per_day'] / \
+            _sample(samples, 'RR_P_recovery_uniform', 'filter_reuse')
+        cons_daily_filter_bag_cost = daily_qty_filter_bags * \
+            (_sample(samples, 'RR_P_recovery_uniform', 'cost_filter_bag')/20)  # (USD/d)
+
+        # Consumable: Magnesium source (priced in USD per metric ton)
+        daily_MgOH2_dose = influent.P * (1/MW_P) * (1/self.Mg_dose) * self.Mg_MgOH2_ratio * self.MW_MgOH2  # (kg/d)
+        cons_daily_MgOH2_cost = daily_MgOH2_dose * \
+            (_sample(samples, 'RR_P_recovery_uniform', 'cost_MgOH2_powder')/1000)  # (USD/d)
+        daily_MgCO3_dose = influent.P * (1/MW_P) * (1/self.Mg_dose) * self.Mg_MgCO3_ratio * self.MW_MgCO3  # (kg/d)
+        cons_daily_MgCO3_cost = daily_MgCO3_dose * \
+            (_sample(samples, 'RR_P_recovery_uniform', 'cost_MgCO3_powder')/1000)  # (USD/d)
+
+        details = {'number_of_P_reactors': number_of_P_reactors, 'cap_cost_P_reactors': cap_cost_P_reactors,
+                   'cap_cost_P_stirrers': cap_cost_P_stirrers, 'cap_cost_P_pipe': cap_cost_P_pipe,
+                   'daily_qty_filter_bags': daily_qty_filter_bags,
+                   'cons_daily_filter_bag_cost': cons_daily_filter_bag_cost,
+                   'annual_qty_filter_bags': daily_qty_filter_bags * 365,
+                   'cons_annual_filter_bag_cost': cons_daily_filter_bag_cost * 365,
+                   'daily_MgOH2_dose': daily_MgOH2_dose, 'cons_daily_MgOH2_cost': cons_daily_MgOH2_cost,
+                   'annual_MgOH2_dose': daily_MgOH2_dose * 365, 'cons_annual_MgOH2_cost': cons_daily_MgOH2_cost * 365,
+                   'daily_MgCO3_dose': daily_MgCO3_dose, 'cons_daily_MgCO3_cost': cons_daily_MgCO3_cost,
+                   'annual_MgCO3_dose': daily_MgCO3_dose * 365, 'cons_annual_MgCO3_cost': cons_daily_MgCO3_cost * 365}
+
+        return Treatment(_effluent(influent, recovered), recovered,
+                         cap_cost_P_reactors + cap_cost_P_stirrers + cap_cost_P_pipe,
+                         cons_daily_filter_bag_cost + cons_daily_MgOH2_cost,
+                         {'number_of_P_reactors': number_of_P_reactors}, details)
+
+
+# Ion exchange: recovers N_rec_2 (%) of the N on resin in columns loaded with design['column_loading'], regenerated
+# with 98% H2SO4. columns, an EquipmentCatalog of column loadings (L/d) priced relative to the standard column,
+# replaces the single size.
+
+
+class IonExchange(UnitProcess):
+
+    name = 'ion_exchange'
+    cost_ratio = 'ion_exchange'
+
+    column_length = 15.7/12  # (ft) column length is 15.7 inches and divide by 12 to convert to ft
+    U_regenerant = 0.000135  # (L/(g resin * cycle)) 98% H2SO4 regenerant volume
+
+    def __init__(self, P_rec=0, K_rec=0, columns=None):
+        self.P_rec = P_rec  # (%) percent of phosphorus recovered; zero because no P is recovered
+        self.K_rec = K_rec  # (%) percent of potassium recovered; zero because no K is recovered
+        self.columns = columns
+
+    def treat(self, influent, samples, design):
+        recovered = Nutrients((_sample(samples, 'RR_N_recovery_uniform', 'N_rec_2')/100) * influent.N,  # (kg N/d)
+                              (self.P_rec/100) * influent.P,  # (kg P/d)
+                              (self.K_rec/100) * influent.K)  # (kg K/d)
+
+        # Ion exchange columns (including PVC pipe and tubing)
+        sizing = (self.columns or EquipmentCatalog(design['column_loading'])).size(influent.flow)
+        qty_columns = sizing.units
+        cap_cost_columns = sizing.cost_units * (_sample(samples, 'RR_N_recovery_uniform', 'cost_PVC_column') *
+                                                self.column_length +
+                                                _sample(samples, 'RR_N_recovery_uniform', 'material_tubing') *
+                                                _sample(samples, 'RR_N_recovery_uniform', 'cost_tubing'))  # (USD)
+
+        # Consumable: Adsorbent/Resin, cost per m3 of urine converted to USD/d with the flow in L/d
+        N_concentration = influent.N / influent.flow * 1000  # (g N/L urine) nitrogen concentration
+        N = np.ceil(_sample(samples, 'RR_N_recovery_triangle', 'resin_lifetime'))  # resin uses before replacement
+        q0 = _sample(samples, 'RR_N_recovery_triangle', 'ad_density')  # (mmol N/g resin) adsorption density
+        cons_cost_resin = (_sample(samples, 'RR_N_recovery_uniform', 'cost_resin') * N_concentration * 1000) / \
+            (N * q0 * MW_N)  # (USD/m3 urine)
+        cons_daily_cost_resin = (cons_cost_resin/1000) * influent.flow  # (USD/d)
+
+        # Consumable: Regenerant, 98% H2SO4 (USD/metric ton to USD/L, assuming the density of water)
+        cost_H2SO4 = _sample(samples, 'RR_N_recovery_uniform', 'cost_H2SO4')/1000  # (USD/L)
+        cons_cost_H2SO4 = (cost_H2SO4 * self.U_regenerant * N_concentration * 1000 * 1000)/(q0 * MW_N)  # (USD/m3)
+        cons_daily_cost_H2SO4 = (cons_cost_H2SO4/1000) * influent.flow  # (USD/d)
+
+        details = {'qty_columns': qty_columns, 'cap_cost_columns': cap_cost_columns,
+                   'cons_daily_cost_resin': cons_daily_cost_resin, 'cons_annual_cost_resin': cons_daily_cost_resin * 365,
+                   'cons_daily_cost_H2SO4': cons_daily_cost_H2SO4, 'cons_annual_cost_H2SO4': cons_daily_cost_H2SO4 * 365}
+
+        return Treatment(_effluent(influent, recovered), recovered, cap_cost_columns,
+                         cons_daily_cost_resin + cons_daily_cost_H2SO4, {'qty_columns': qty_columns}, details)
+
+
+# Potassium recovery by reuse of the remaining fluid: all of the K left in the stream is recovered (no N or P), at no
+# cost of its own; its influent is the effluent of the process before it and is not reported
+
+
+class RemainingFluid(UnitProcess):
+
+    name = 'remaining_fluid'
+    report_influent = False
+
+    def treat(self, influent, samples, design):
+        recovered = Nutrients(0 * influent.N, 0 * influent.P, influent.K)
+        zero = np.zeros_like(influent.flow)
+
+        return Treatment(_effluent(influent, recovered), recovered, zero, zero, {}, {})
+
+
+DEFAULT_TRAIN = (StruvitePrecipitation(), IonExchange(), RemainingFluid())
+
+# ~~~~~~~TREATMENT TRAIN~~~~~~~
+# passes the influent through the processes in order (the effluent of one is the influent of the next) and returns
+# their Treatments
+
+
+def treatment_train(influent, train, samples, design=None):
+
+    design = dict(DESIGN, **(design or {}))
+    treatments = []
+
+    for process in train:
+        treatments.append(process.treat(influent, samples, design))
+        influent = treatments[-1].effluent
+
+    return treatments
+
+
+# ~~~~~~~COST CALCULATIONS~~~~~~~
+# samples: {sheet: table} of the OUTPUT_uncertainty_ranges sheets used (RR_triangle, RR_uniform, labor_cost_ratio,
+# op_cost_ratio, maint_cost_ratio, transport_costs, and those of the processes, e.g. RR_P_recovery_uniform,
+# RR_N_recovery_uniform, RR_N_recovery_triangle); nutrients: rec_nutrients_after_U_T_S of
+# RESULTS_per_capita_nutrients; design: values replacing those of DESIGN; train: the unit processes; urine_tanks: an
+# EquipmentCatalog of tank volumes (L) priced relative to the 1000 L tank (cost_urine_tank1 and cost_urine_tank2).
+# Returns the sheets of RESULTS_RR_costs_FilterReuse as [(sheet, {column: array over runs}), ...].
+
+
+def resource_recovery_costs(samples, nutrients, design=None, train=DEFAULT_TRAIN, urine_tanks=None):
+
+    design = dict(DESIGN, **(design or {}))
+    reference_flow = design['reference_flow']
+    UDDT_users = design['UDDT_users']
+    urine_tanks = urine_tanks or EquipmentCatalog(1000)  # 1000 L tanks
+
+    # ~~~~~~~Off Site Urine Storage Tank Calculations~~~~~~~
+
+    urine_volume = _sample(samples, 'RR_triangle', 'urine_volume')  # (L/cap/d) daily volume of urine per capita
+    daily_urine_volume = urine_volume * UDDT_users * reference_flow  # (L/d) total urine volume of reference flow
+    community_tanks = COMMUNITY_TANKS._replace(users=UDDT_users, toilets=reference_flow,
+                                               days=design['t_urine_storage'], tanks=urine_tanks.sizes)
+    tanks1 = tank_sizing(samples, community_tanks)  # storage tanks in community, emptied every t_urine_storage days
+    cap_cost_storage_tanks1 = tanks1.capital  # (USD)
+
+    # ~~~~~~~Urine Transport Calculations~~~~~~~
+
+    cart_transport_cost = reference_flow * UDDT_users * _sample(samples, 'transport_costs', 'cart')  # (USD/d)
+    truck_transport_cost = (daily_urine_volume/1000) * \
+        (_sample(samples, 'transport_costs', 'truck')/usd_to_ugx)  # (USD/d)
+
+    # ~~~~~~~On Site Urine Storage Tanks~~~~~~~
+
+    tanks2 = urine_tanks.size(daily_urine_volume)  # storage tanks at facility
+    cap_cost_storage_tanks2 = tanks2.cost_units * _sample(samples, 'RR_uniform', 'cost_urine_tank2')
+
+    # ~~~~~~~Treatment Train~~~~~~~
+
+    influent = Stream(*([np.asarray(nutrients['%s_rec_U_T_S_urine' % nutrient], dtype=float) * reference_flow *
+                         UDDT_users for nutrient in Nutrients._fields] + [daily_urine_volume]))  # (kg/d, L/d)
+    treatments = treatment_train(influent, train, samples, design)
+    effluent = treatments[-1].effluent if treatments else influent
+
+    # ~~~~~~~Capital, Labor, Operation, and Maintenance Costs~~~~~~~
+    # labor is construction labor, operation an annual cost (including labor for operation), and maintenance a cost
+    # that occurs at half of the system lifetime (~4 years)
+
+    capital = [('off_site_tanks', 'tank', cap_cost_storage_tanks1), ('on_site_tanks', 'tank', cap_cost_storage_tanks2)]
+    capital += [(process.name, process.cost_ratio, treatment.capital)
+                for process, treatment in zip(train, treatments) if process.cost_ratio is not None]
+
+    costs = dict((category, {}) for category in ('cap',) + tuple(category for category, sheet in COST_RATIOS))
+    for part, ratio, cap_cost in capital:
+        costs['cap']['total_cap_cost_' + part] = cap_cost  # (USD)
+        for category, sheet in COST_RATIOS:
+            costs[category]['%s_cost_%s' % (category, part)] = _sample(samples, sheet, ratio) * cap_cost
+
+    costs['op']['annual_cart_cost'] = cart_transport_cost * 365  # (USD/yr)
+    costs['op']['annual_truck_cost'] = truck_transport_cost * 365  # (USD/yr)
+
+    # ~~~~~~~Total Nutrients Recovered~~~~~~~
+
+    recovered = {}
+    for k, (process, treatment) in enumerate(zip(train, treatments), 1):
+        if process.report_influent:
+            stream = influent if k == 1 else treatments[k - 2].effluent
+            recovered.update(('%s_influent%d' % (nutrient, k), getattr(stream, nutrient))
+                             for nutrient in Nutrients._fields)
+    for nutrient in Nutrients._fields:  # (kg/yr) annual total recovered
+        recovered['annual_%s_recovery' % nutrient] = (getattr(influent, nutrient) - getattr(effluent, nutrient)) * 365
+
+    return [('nutrients_recovered', recovered), ('capital_cost', costs['cap']), ('labor_cost', costs['labor']),
+            ('op_cost', costs['op']), ('maint_cost', costs['maint'])] + \
+        [('%s_cost' % process.name, treatment.details) for process, treatment in zip(train, treatments)
+         if treatment.details]
+
+
+# the sheets of resource_recovery_costs as [(sheet, table), ...]
+
+
+def result_tables(sheets, index=None):
+
+    return [(sheet, pd.DataFrame(columns, index=index, columns=list(columns))) for sheet, columns in sheets]
+
+
+def _effluent(influent, recovered):
+
+    return Stream(influent.N - recovered.N, influent.P - recovered.P, influent.K - recovered.K, influent.flow)
+
+
+def _sample(samples, sheet, name):
+
+    return np.asarray(samples[sheet][name], dtype=float)
@@ -0,0 +1,332 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, sampling.py, draws the uncertainty samples for every parameter in input_data_file.xlsx. The whole
+# Latin hypercube (runs x parameters) is built in one call and the uniform and triangular inverse CDFs are applied
+# as array operations on a single preallocated float matrix. Scrambled Sobol and Halton sequences are available as
+# quasi-Monte Carlo alternatives, together with a driver that doubles the number of runs until the output
+# percentiles stop changing. Only the Latin hypercube keeps every parameter's samples stable when parameters are
+# added, removed, or reordered: with 'sobol' or 'halton' every column is a dimension of one sequence, so any change
+# to the parameter table changes the samples of the parameters after it (see QuasiMonteCarlo).
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+import hashlib  # stable stream identifiers for each parameter
+import numpy as np  # import NumPy library for array calculations
+import pandas as pd  # import pandas for matrix data manipulation
+from scipy.stats import qmc  # scrambled Sobol and Halton sequences
+from registry import load_registry
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+# Sampled sheets of input_data_file.xlsx in the order they are written to OUTPUT_uncertainty_ranges.xlsx and the
+# distribution used for every row of the sheet
+SAMPLED_SHEETS = (('material_unit_costs', 'uniform'),
+                  ('material_reuse_ratio', 'uniform'),
+                  ('tech_life_span', 'triangle'),
+                  ('tech_maint_time', 'triangle'),
+                  ('maint_cost_ratio', 'triangle'),
+                  ('op_cost_ratio', 'triangle'),
+                  ('labor_cost_ratio', 'triangle'),
+                  ('nutrient_recovery_efficiency', 'uniform'),
+                  ('transport_costs', 'uniform'),
+                  ('RR_triangle', 'triangle'),
+                  ('RR_uniform', 'uniform'),
+                  ('fertilizer_cost', 'uniform'),
+                  ('RR_P_recovery_uniform', 'uniform'),
+                  ('RR_N_recovery_uniform', 'uniform'),
+                  ('RR_N_recovery_triangle', 'triangle'),
+                  ('RR_K_recovery_triangle', 'triangle'),
+                  ('DCA_parameters', 'triangle'))
+
+SAMPLING_METHODS = ('lhs', 'sobol', 'halton')
+PARAMETER_COLUMNS = ('sheet', 'label', 'distribution', 'minimum', 'width', 'peak_distance')
+rows_per_block = 8192  # number of runs transformed at once by the inverse CDF (bounds temporary memory)
+feistel_rounds = 3  # rounds of the keyed permutation that assigns runs to strata
+runs_per_stream = 65536  # runs in each shard of a parameter's random stream (fixed so results do not depend on
+# how the runs are split across processes or machines)
+
+# ~~~~~~~PARAMETER TABLE~~~~~~~
+# one row per sampled parameter: sheet, label, distribution ('uniform' or 'triangle'), minimum, width and
+# peak_distance (location of the triangle peak as a fraction of the width, NaN for uniform parameters)
+
+
+def read_parameters(workbook='input_data_file.xlsx', sheets=SAMPLED_SHEETS):
+
+    table = load_registry(workbook).parameters()
+    parameters = []
+
+    for sheet, distribution in sheets:
+        rows = table[table.sheet == sheet].copy()
+        rows['distribution'] = distribution
+        if distribution != 'triangle':
+            rows['peak_distance'] = np.nan
+        parameters.append(rows)
+
+    return pd.concat(parameters, ignore_index=True)[list(PARAMETER_COLUMNS)]
+
+
+# ~~~~~~~LATIN HYPERCUBE~~~~~~~
+# unit hypercube of n_samples runs and one column per random stream; every column holds exactly one value in each
+# of the n_samples equal-probability strata, and the strata are paired at random between columns.
+# The stratum of run i in column j is perm_j(i), where perm_j is a keyed bijection of [0, n_samples) (Feistel
+# network with cycle walking), so any block of runs [start, stop) can be generated on its own and the blocks
+# together still form one Latin hypercube over all n_samples runs.
+# All randomness is spawned from the root seed: the permutation keys from (stream, 0) and the position inside each
+# stratum from (stream, 1, shard), where shard is the run number // runs_per_stream. A run therefore gets the same
+# bits whatever block, process, or machine computes it, and a column only depends on its own stream identifier.
+# seed=None draws fresh entropy, which is kept in self.seed so the design can be regenerated.
+
+
+class LatinHypercube(object):
+
+    def __init__(self, n_samples, streams, seed=None):
+        if isinstance(streams, int):
+            streams = range(streams)
+
+        self.n_samples = n_samples
+        self.streams = list(streams)
+        self.n_dims = len(self.streams)
+        self.seed = np.random.SeedSequence(seed).entropy
+        self.half_bits = max(int(n_samples - 1).bit_length() + 1, 2) // 2  # Feistel domain is 2 ** (2 * half_bits)
+        self.keys = np.empty((feistel_rounds, self.n_dims), dtype=np.uint64)
+
+        for j, stream in enumerate(self.streams):
+            self.keys[:, j] = np.random.SeedSequence(self.seed, spawn_key=(stream, 0)).generate_state(feistel_rounds,
+                                                                                                       np.uint64)
+
+    def strata(self, start, stop):
+        runs = np.arange(start, stop, dtype=np.uint64)[:, None]
+        strata = _feistel(np.repeat(runs, self.n_dims, axis=1), self.keys, self.half_bits)
+        outside = np.nonzero(strata >= self.n_samples)
+
+        while outside[0].size:  # cycle walking until every stratum is inside [0, n_samples)
+            strata[outside] = _feistel(strata[outside], self.keys[:, outside[1]], self.half_bits)
+            outside = tuple(index[strata[outside] >= self.n_samples] for index in outside)
+
+        return strata
+
+    def jitter(self, start, stop):
+        u = np.empty((stop - start, self.n_dims))  # position of each value inside its stratum
+
+        for shard in range(start // runs_per_stream, (stop - 1) // runs_per_stream + 1):
+            first = max(start, shard * runs_per_stream)
+            last = min(stop, (shard + 1) * runs_per_stream)
+
+            for j, stream in enumerate(self.streams):
+                bit_generator = np.random.PCG64(np.random.SeedSequence(self.seed, spawn_key=(stream, 1, shard)))
+                bit_generator.advance(first - shard * runs_per_stream)  # one 64-bit draw per run
+                u[first - start:last - start, j] = np.random.Generator(bit_generator).random(last - first)
+
+        return u
+
+    def block(self, start, stop):
+        u = np.empty((stop - start, self.n_dims))
+
+        for first in range(start, stop, rows_per_block):  # bounds the memory of the integer temporaries
+            last = min(first + rows_per_block, stop)
+            rows = u[first - start:last - start]
+            rows[...] = self.jitter(first, last)
+            rows += self.strata(first, last)
+            rows /= self.n_samples
+
+        return u
+
+
+def latin_hypercube(n_samples, n_dims, seed=None):
+
+    return LatinHypercube(n_samples, n_dims, seed).block(0, n_samples)
+
+
+# stream identifier of a parameter, derived from its sheet and label only (not from its row position), so adding
+# or reordering rows in input_data_file.xlsx leaves the samples of the existing parameters unchanged
+
+
+def parameter_stream(sheet, label):
+
+    digest = hashlib.sha256(('%s/%s' % (sheet, label)).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'little')
+
+
+# ~~~~~~~QUASI-MONTE CARLO~~~~~~~
+# scrambled Sobol or Halton points with one column per stream, drawn from the root seed like the Latin hypercube.
+# The sequence is extensible: runs [start, stop) are the same points whatever n_samples is, so a study can be
+# grown in powers of two without discarding earlier runs (Sobol balance holds for power-of-two run counts).
+# NOT STABLE ACROSS PARAMETER TABLES: unlike the Latin hypercube, whose columns each come from their own parameter
+# stream, a column here is the dimension of the sequence at its position in the parameter table (the streams are
+# only counted). Adding, removing, or reordering a parameter row changes the samples of every parameter after it,
+# so results drawn with 'sobol' or 'halton' can only be compared between runs of the same parameter table. Tying
+# dimensions to streams instead would spread the parameters over high, poorly balanced dimensions of the sequence.
+
+
+class QuasiMonteCarlo(object):
+
+    def __init__(self, streams, method='sobol', seed=None):
+        if isinstance(streams, int):
+            streams = range(streams)
+        if method not in ('sobol', 'halton'):
+            raise ValueError("method must be 'sobol' or 'halton', not %r" % (method,))
+
+        self.streams = list(streams)
+        self.n_dims = len(self.streams)
+        self.method = method
+        self.seed = np.random.SeedSequence(seed).entropy
+
+    def engine(self):
+        rng = np.random.Generator(np.random.PCG64(np.random.SeedSequence(self.seed, spawn_key=(2,))))
+
+        if self.method == 'sobol':
+            return qmc.Sobol(self.n_dims, scramble=True, seed=rng)
+        return qmc.Halton(self.n_dims, scramble=True, seed=rng)
+
+    def block(self, start, stop):
+        engine = self.engine()
+        if start:
+            engine.fast_forward(start)
+        return engine.random(stop - start)
+
+
+# keyed bijection of the integers [0, 2 ** (2 * half_bits)); keys has one row per round and broadcasts against x
+
+
+def _feistel(x, keys, half_bits):
+
+    mask = np.uint64(2 ** half_bits - 1)
+    shift = np.uint64(half_bits)
+    left = x >> shift
+    right = x & mask
+    mixed = np.empty_like(right)
+
+    for key in keys:
+        np.bitwise_xor(right, key, out=mixed)
+        mixed *= np.uint64(0x9E3779B97F4A7C15)  # multiplicative hashing of the right half
+        mixed ^= mixed >> np.uint64(32)
+        mixed &= mask
+        left ^= mixed
+        left, right = right, left
+
+    left <<= shift
+    left |= right
+    return left
+
+
+# ~~~~~~~INVERSE CDF~~~~~~~
+# transforms a unit hypercube in place into parameter values; uniform columns are minimum + u * width and
+# triangle columns follow the closed-form inverse of the triangular CDF with the peak at peak_distance * width
+
+
+def inverse_cdf(u, parameters):
+
+    minimum = parameters.minimum.values.astype(float)
+    width = parameters.width.values.astype(float)
+    triangle = (parameters.distribution == 'triangle').values
+    peak = np.where(triangle, parameters.peak_distance.values.astype(float), 0.5)
+
+    for start in range(0, u.shape[0], rows_per_block):
+        block = u[start:start + rows_per_block]
+        x = np.where(block < peak, np.sqrt(peak * block), 1 - np.sqrt((1 - peak) * (1 - block)))
+        x = np.where(triangle, x, block)
+        block[...] = x * width + minimum
+
+    return u
+
+
+# ~~~~~~~SAMPLE MATRIX~~~~~~~
+# (runs x parameters) float matrix of sampled values for runs [start, stop) of an n_samples design; the columns
+# are indexed by (sheet, label) so samples['RR_triangle'] returns the same table that was previously read from
+# OUTPUT_uncertainty_ranges.xlsx. With the same seed any shard of runs equals the same rows of the full matrix.
+# method is one of SAMPLING_METHODS: 'lhs' (Latin hypercube), 'sobol' or 'halton' (scrambled quasi-Monte Carlo,
+# whose columns change when the parameter table changes, see QuasiMonteCarlo).
+
+
+def sample_parameters(parameters, n_samples, seed=None, start=0, stop=None, method='lhs'):
+
+    design = _parameter_design(parameters, n_samples, seed, method)
+    return _sample_frame(design, parameters, start, n_samples if stop is None else stop)
+
+
+# ~~~~~~~STREAMING SAMPLE BLOCKS~~~~~~~
+# yields runs [start, stop) of the sample matrix in blocks of chunk_size runs (the last block may be shorter); the
+# row index of each block holds the run numbers, and the Latin hypercube stratification holds over all n_samples
+# runs, so peak memory is set by chunk_size and every downstream stage can process one block at a time
+
+
+def iter_sample_chunks(parameters, n_samples, chunk_size, seed=None, start=0, stop=None, method='lhs'):
+
+    design = _parameter_design(parameters, n_samples, seed, method)
+    stop = n_samples if stop is None else stop
+
+    for first in range(start, stop, chunk_size):
+        yield _sample_frame(design, parameters, first, min(first + chunk_size, stop))
+
+
+# runs [start, stop) computed by shard number shard of n_shards (e.g. one shard per process or machine)
+
+
+def shard_runs(n_samples, n_shards, shard):
+
+    return shard * n_samples // n_shards, (shard + 1) * n_samples // n_shards
+
+
+# ~~~~~~~CONVERGENCE-DRIVEN SAMPLING~~~~~~~
+# evaluate(samples) returns one model output per run of a sample table (e.g. the break-even nutrient_payment).
+# The number of runs starts at initial_samples and doubles until every tracked quantile changes by less than
+# rtol (relative) between two successive sizes, or until max_samples is reached. Quasi-Monte Carlo designs
+# reuse the runs already evaluated; 'lhs' draws and evaluates a new Latin hypercube at every size.
+# Returns the outputs of the final design, the quantile history indexed by number of runs, and whether the
+# tolerance was met.
+
+
+def converge_quantiles(evaluate, parameters, quantiles=(0.05, 0.5, 0.95), rtol=1e-3, initial_samples=1024,
+                       max_samples=2 ** 20, method='sobol', seed=None):
+
+    seed = np.random.SeedSequence(seed).entropy
+    design = _parameter_design(parameters, max_samples, seed, method)
+    outputs = np.empty(0)
+    history = []
+    converged = False
+    n_samples = initial_samples
+
+    while True:
+        if method == 'lhs':
+            design = _parameter_design(parameters, n_samples, [seed, n_samples], method)
+            outputs = np.asarray(evaluate(_sample_frame(design, parameters, 0, n_samples)), dtype=float)
+        else:
+            new_outputs = evaluate(_sample_frame(design, parameters, len(outputs), n_samples))
+            outputs = np.concatenate([outputs, np.asarray(new_outputs, dtype=float)])
+
+        history.append(np.quantile(outputs, quantiles))
+
+        if len(history) > 1:
+            change = np.abs(history[-1] - history[-2])
+            converged = bool(np.all(change <= rtol * np.abs(history[-2])))
+
+        if converged or n_samples * 2 > max_samples:
+            break
+        n_samples *= 2
+
+    history = pd.DataFrame(history, columns=list(quantiles),
+                           index=pd.Index([initial_samples * 2 ** k for k in range(len(history))], name='runs'))
+    return outputs, history, converged
+
+
+def _parameter_design(parameters, n_samples, seed, method):
+
+    if parameters.duplicated(['sheet', 'label']).any():
+        raise ValueError('every sampled parameter needs a unique (sheet, label) pair')
+    if method not in SAMPLING_METHODS:
+        raise ValueError('method must be one of %s, not %r' % (SAMPLING_METHODS, method))
+
+    streams = [parameter_stream(sheet, label) for sheet, label in zip(parameters.sheet, parameters.label)]
+
+    if method == 'lhs':
+        return LatinHypercube(n_samples, streams, seed)
+    return QuasiMonteCarlo(streams, method, seed)
+
+
+def _sample_frame(design, parameters, start, stop):
+
+    values = inverse_cdf(design.block(start, stop), parameters)
+    columns = pd.MultiIndex.from_arrays([parameters.sheet.values, parameters.label.values], names=['sheet', 'label'])
+
+    return pd.DataFrame(values, index=pd.RangeIndex(start, stop), columns=columns, copy=False)
@@ -0,0 +1,159 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, scenarios.py, is the break even engine of 8_break_even.py. A scenario pairs a system configuration
+# (the components the NGO/contractor builds and runs, and the nutrients it is paid for) with a financing rule (the
+# share of each component's costs the aid agency pays). The costs of every component are built once from one loaded
+# sample set, as (runs x components) arrays, and shared by all scenarios. The break even payment is linear in the
+# costs, so the payment each component adds is computed once for all runs (components x runs, see dcf.py), split
+# into its construction (with replacements, salvage, and depreciation) and ongoing (operation and maintenance)
+# parts, and the payments of all scenarios are one (scenarios x components) by (components x runs) product, in
+# which each component of the system counts 1. The aid agency payments (aid.py) are then subtracted as one
+# (scenarios x runs) broadcast of the shares paid, e.g. of the pit latrine, which the system replaces: all of its
+# costs under Start-up financing, none under Self-Sustaining financing, or any partial or capped subsidy.
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+from collections import namedtuple
+import numpy as np  # import NumPy library for array calculations
+from dcf import discount_factors, cash_flows, break_even_payment  # discounted cash flows for all runs at once
+from lifecycle import lifecycle_events, event_flows  # replacements, maintenance, salvage
+from aid import AidPolicy, construction_shares, ongoing_shares  # share of the costs paid by the aid agency
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+# (component, technologies of tech_life_span and tech_maint_time giving its lifetime)
+COMPONENTS = (('pit', ('D402', 'D403')), ('UDDT', ('D406',)), ('off_site_tanks', ('tank',)),
+              ('on_site_tanks', ('tank',)), ('struvite', ('struvite',)), ('ion_exchange', ('ion_exchange',)),
+              ('simple_tanks', ('tank',)))
+
+# components: built and run by the NGO/contractor; mass: the nutrients it is paid for ('recovered' by struvite, ion
+# exchange, and K recovery in the advanced system, or the 'urine' stored in the simple system)
+System = namedtuple('System', 'components mass')
+
+SYSTEMS = {'Scenario2': System(('UDDT', 'off_site_tanks', 'on_site_tanks', 'struvite', 'ion_exchange'), 'recovered'),
+           'Scenario1': System(('UDDT', 'simple_tanks'), 'urine'),
+           'Scenario1_tanks': System(('simple_tanks',), 'urine')}  # storage tank component only
+
+# (aid policy, ...) of each financing rule, see aid.py; a scenario may also give its own policies
+FINANCING = {'subsidized': (AidPolicy('pit', 1.0, None),),
+             'unsubsidized': ()}
+
+# material, labor: paid at each installation (USD); annual: operation, consumables, and land (USD/yr); maint: paid
+# at each maintenance (USD); life_span, maint_time (years); all (runs x components) in the order of COMPONENTS;
+# units: (components) number of units of each component, for aid capped per unit
+ComponentCosts = namedtuple('ComponentCosts', 'material labor annual maint life_span maint_time units')
+
+# (components x runs x years) cash flows of each component during the horizon (USD/yr): construction, the material
+# and labor of every replacement net of the salvage value of the material; maintenance, paid at each maintenance
+LifecycleFlows = namedtuple('LifecycleFlows', 'construction maintenance')
+
+# ~~~~~~~COMPONENT COSTS~~~~~~~
+# material, labor, annual, maint: {component: (runs) costs}, components left out cost nothing; life_span,
+# maint_time: (runs x components) years (lifecycle.component_lifetimes of COMPONENTS); units: {component: number of
+# units}, 1 if left out
+
+
+def component_costs(material, labor, annual, maint, life_span, maint_time, units=None, components=COMPONENTS):
+
+    runs = len(life_span)
+    stacked = [np.column_stack([np.asarray(costs[name], dtype=float) if name in costs else np.zeros(runs)
+                                for name, technologies in components])
+               for costs in (material, labor, annual, maint)]
+
+    units = units or {}
+    return ComponentCosts(*stacked, life_span=np.asarray(life_span, dtype=float),
+                          maint_time=np.asarray(maint_time, dtype=float),
+                          units=np.array([units.get(name, 1) for name, technologies in components], dtype=float))
+
+
+# ~~~~~~~LIFECYCLE CASH FLOWS~~~~~~~
+# costs: ComponentCosts; horizon: project duration (years). Returns the LifecycleFlows of every component on its
+# sampled lifetime and maintenance time (see lifecycle.py). break_even and the rate of return scripts (see
+# rate_of_return.py) take their replacements, salvage value, and maintenance from here, sharing one cash flow model.
+
+
+def lifecycle_flows(costs, horizon=8, components=COMPONENTS):
+
+    events = lifecycle_events(costs.life_span, costs.maint_time, horizon,
+                              [name for name, technologies in components])
+
+    return LifecycleFlows(event_flows(events, {'replacement': costs.material + costs.labor, 'salvage': costs.material},
+                                      True),
+                          event_flows(events, {'maintenance': costs.maint}, True))
+
+
+# (runs x years) sum of the (components x runs x years) flows of the components of a system in SYSTEMS
+
+
+def system_flows(flows, system, components=COMPONENTS):
+
+    names = [name for name, technologies in components]
+    return flows[[names.index(name) for name in SYSTEMS[system].components]].sum(axis=0)
+
+
+# ~~~~~~~SCENARIO MATRIX~~~~~~~
+# scenarios: [(system, financing), ...] with system a name in SYSTEMS and financing a name in FINANCING or a tuple
+# of aid policies. Returns the (scenarios x components) weight of each component's costs in each system.
+
+
+def scenario_weights(scenarios, components=COMPONENTS):
+
+    names = [name for name, technologies in components]
+    weights = np.zeros((len(scenarios), len(names)))
+    for row, (system, financing) in enumerate(scenarios):
+        for name in SYSTEMS[system].components:
+            weights[row, names.index(name)] += 1
+
+    return weights
+
+
+# the aid policies of a financing rule, given by name (FINANCING) or as the policies themselves
+
+
+def financing_policies(financing):
+
+    return FINANCING[financing] if isinstance(financing, str) else tuple(financing)
+
+
+# ~~~~~~~BREAK EVEN PAYMENTS~~~~~~~
+# costs: ComponentCosts; masses: {mass: (runs) nutrients the system is paid for (kg/yr)}; scenarios: [(system,
+# financing), ...] (see scenario_weights); income_tax, discount_rate: (runs) in decimal form; horizon: project
+# duration (years). Returns the (scenarios x runs) break even nutrient payment (USD/kg) of every scenario.
+
+
+def break_even(costs, masses, scenarios, income_tax, discount_rate, horizon=8):
+
+    discount = discount_factors(discount_rate, horizon)  # (runs x years)
+    income_tax = np.asarray(income_tax, dtype=float)
+    weights = scenario_weights(scenarios)
+
+    policies = [financing_policies(financing) for system, financing in scenarios]
+    names = [name for name, technologies in COMPONENTS]
+
+    # (components x runs x years) cash flows of each component, replacements and salvage on the sampled lifetimes
+    lifecycle = lifecycle_flows(costs, horizon)
+    capital = (costs.material + costs.labor).T  # (USD)
+    flows = cash_flows(costs.annual.T, horizon) + lifecycle.maintenance  # (USD/yr)
+    replacements = lifecycle.construction  # (USD/yr)
+    depreciation = (costs.material/costs.life_span).T  # (USD/yr) straight line over each component's lifetime
+
+    payments = np.empty((len(scenarios), costs.material.shape[0]))
+    for mass in sorted(set(SYSTEMS[system].mass for system, financing in scenarios)):
+        rows = [row for row, (system, financing) in enumerate(scenarios) if SYSTEMS[system].mass == mass]
+        # (USD/kg) (components x runs) payment each component's construction and ongoing costs add
+        construction = break_even_payment(capital, np.zeros_like(flows), masses[mass], income_tax, discount,
+                                          depreciation, replacements)
+        ongoing = break_even_payment(0.0, flows, masses[mass], income_tax, discount)
+        payments[rows] = weights[rows] @ (construction + ongoing)
+
+        # aid agency payments, one (policies x runs) broadcast per component paid for
+        for column, name in enumerate(names):
+            paid = [(row, policy) for row in rows for policy in policies[row] if policy.component == name]
+            if paid:
+                aid = [policy for row, policy in paid]
+                np.subtract.at(payments, [row for row, policy in paid],
+                               construction_shares(aid, capital[column], costs.units[column]) * construction[column]
+                               + ongoing_shares(aid)[:, np.newaxis] * ongoing[column])
+
+    return payments
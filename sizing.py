@@ -0,0 +1,124 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, sizing.py, sizes equipment that comes in discrete units: urine tanks, struvite reactors, ion exchange
+# columns, plots of land. An EquipmentCatalog lists the sizes available (capacity and relative cost, so a catalog
+# can carry economies of scale) and answers, for the volumes of all runs at once, how many units of each size the
+# cheapest combination covering the volume takes. The cost-minimal combinations are precomputed once as a table
+# over volume (a covering knapsack solved on multiples of the greatest common divisor of the capacities), compressed
+# to the volumes where the best combination changes, and looked up with np.searchsorted. The table is filled in
+# chunks as long as the smallest capacity, so the work in Python grows with volume / smallest capacity rather than
+# with the number of steps; tables beyond max_table_steps are refused. A catalog with a single size is the special
+# case np.ceil(volume / capacity), computed exactly as the scripts always did. Volumes must be finite.
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+from collections import namedtuple
+from fractions import Fraction
+from functools import reduce
+import math
+import numpy as np  # import NumPy library for array calculations
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+initial_table_units = 4096  # volume steps of a new table; it doubles whenever a larger volume is queried
+max_table_steps = 2 ** 22  # most volume steps of a table (the largest volume divided by the common step)
+
+# counts: (... x sizes) units of each size; units: total units; cost_units: counts priced at the relative costs
+# (the number of reference units, relative cost 1, with the same cost)
+Sizing = namedtuple('Sizing', 'counts units cost_units')
+
+# ~~~~~~~EQUIPMENT CATALOG~~~~~~~
+# sizes: [(capacity, relative cost), ...] or one capacity; capacities share the unit of the volumes queried (L of
+# urine, L/d of loading, tanks per plot, ...)
+
+
+class EquipmentCatalog(object):
+
+    def __init__(self, sizes):
+        if np.ndim(sizes) == 0:
+            sizes = [(sizes, 1.0)]
+
+        self.capacities = np.array([capacity for capacity, cost in sizes], dtype=float)
+        self.costs = np.array([cost for capacity, cost in sizes], dtype=float)
+        if not len(self.capacities) or (self.capacities <= 0).any() or (self.costs < 0).any():
+            raise ValueError('equipment sizes need positive capacities and non-negative costs: %r' % (sizes,))
+
+        self.sizes = tuple(zip(self.capacities.tolist(), self.costs.tolist()))  # hashable, e.g. to key a memo
+        self.step = _common_step(self.capacities)  # volume resolution of the table
+        self._upper = None  # largest volume of each block of the table that shares a combination
+        self._combinations = None  # (blocks x sizes) units of each size
+
+    def size(self, volume):
+        volume = np.asarray(volume, dtype=float)
+        if not np.isfinite(volume).all():
+            raise ValueError('cannot size equipment for non-finite volumes (%d of %d are NaN or infinite)'
+                             % (np.count_nonzero(~np.isfinite(volume)), volume.size))
+
+        if len(self.capacities) == 1:  # one size: today's np.ceil(volume / capacity)
+            units = np.ceil(volume / self.capacities[0])
+            return Sizing(units[..., np.newaxis], units, units * self.costs[0] if self.costs[0] != 1 else units)
+
+        self._extend(np.max(volume, initial=0.0))
+        block = np.searchsorted(self._upper, np.where(volume > 0, volume, 0.0), side='left')
+        counts = self._combinations[block].astype(float)
+
+        return Sizing(counts, counts.sum(axis=-1), counts.dot(self.costs))
+
+    def units(self, volume):
+        return self.size(volume).units
+
+    # covering knapsack on multiples of step: best[v] is the cheapest combination holding at least v steps (ties go
+    # to the fewest units, then to the first size); the table is rebuilt twice as large until it reaches the largest
+    # volume queried. best[v] only depends on best[v - steps of a size], so a chunk of v shorter than the smallest
+    # size is solved at once from the chunks before it.
+
+    def _extend(self, volume):
+        if self._upper is not None and volume <= self._upper[-1]:
+            return
+
+        n_steps = initial_table_units
+        while n_steps * self.step < volume:
+            n_steps *= 2
+        if n_steps > max_table_steps:
+            raise ValueError('sizing a volume of %g with capacities %r takes %d steps of their common step %g, more '
+                             'than max_table_steps (%d); use capacities with a larger common divisor'
+                             % (volume, self.capacities.tolist(), n_steps, self.step, max_table_steps))
+
+        steps = np.maximum(np.rint(self.capacities / self.step).astype(np.int64), 1)
+        chunk = int(steps.min())
+        cost = np.zeros(n_steps + 1)
+        units = np.zeros(n_steps + 1)
+        last = np.full(n_steps + 1, -1, dtype=np.int64)  # size added last in the best combination of v steps
+        for first in range(1, n_steps + 1, chunk):
+            v = np.arange(first, min(first + chunk, n_steps + 1))
+            before = np.maximum(v[:, np.newaxis] - steps, 0)  # (chunk x sizes)
+            candidate_cost = cost[before] + self.costs
+            tied = candidate_cost == candidate_cost.min(axis=1, keepdims=True)
+            candidate_units = np.where(tied, units[before] + 1, np.inf)
+            k = np.argmax(tied & (candidate_units == candidate_units.min(axis=1, keepdims=True)), axis=1)
+            best = before[np.arange(v.size), k]
+            cost[v], units[v], last[v] = cost[best] + self.costs[k], units[best] + 1, k
+
+        combinations = np.zeros((n_steps + 1, len(steps)), dtype=np.int64)
+        for first in range(1, n_steps + 1, chunk):
+            v = np.arange(first, min(first + chunk, n_steps + 1))
+            combinations[v] = combinations[np.maximum(v - steps[last[v]], 0)]
+            combinations[v, last[v]] += 1
+
+        change = np.flatnonzero((combinations[1:] != combinations[:-1]).any(axis=1))  # v where a new block begins
+        ends = np.append(change[1:], n_steps)  # last v of each block (v=0 holds only a volume of 0)
+        self._upper = np.append(0.0, ends * self.step)
+        self._combinations = np.vstack([combinations[0], combinations[ends]])
+
+
+# greatest common divisor of the capacities (as exact fractions, so 0.5 and 1.25 give 0.25)
+
+
+def _common_step(capacities):
+
+    fractions = [Fraction(capacity).limit_denominator(10 ** 6) for capacity in capacities]
+    numerator = reduce(math.gcd, [fraction.numerator for fraction in fractions])
+    denominator = reduce(lambda a, b: a * b // math.gcd(a, b), [fraction.denominator for fraction in fractions])
+
+    return float(Fraction(numerator, denominator))
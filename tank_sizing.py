@@ -0,0 +1,124 @@
+# Title: Novel financing strategies to simultaneously advance development goals for sanitation and agriculture
+# through nutrient recovery
+
+# This module, tank_sizing.py, sizes and prices the urine storage tanks for all runs at once, for the scripts that
+# need them (5_resource_recovery_cost.py, 7_tanks.py, and the break-even and rate of return scripts). A storage
+# policy describes the tanks: community tanks emptied every few days (advanced system, Scenario 2) or tanks holding
+# all the urine of the storage time (simple system, Scenario 1). tank_quantities gives the tank volume, the tank
+# count, and the plots of land the tanks take; tank_sizing adds the tank capital, labor, operation, and maintenance
+# costs and the land lease. Results are memoized by policy and by the values of the sample columns they use, so
+# every script of a pipeline run sharing the same samples and policy reuses one calculation.
+
+# ~~~~~~~IMPORT PACKAGES~~~~~~~
+
+from collections import namedtuple, OrderedDict
+import hashlib
+import numpy as np  # import NumPy library for array calculations
+from sizing import EquipmentCatalog
+
+# ~~~~~~~CONSTANTS~~~~~~~
+
+# name; kind: 'emptied' (tanks emptied every days days, a whole number, the day d of storage weighted 0.33 x d) or
+# 'stored' (all urine of days days, which may be fractional); users per toilet unit; toilets (units); days of
+# storage; tanks: ((capacity (L), relative cost), ...) see sizing.py; tank_cost: column of RR_uniform with the price
+# of the reference tank (USD/tank); tanks_per_land: tanks per 50'x100' plot of land
+StoragePolicy = namedtuple('StoragePolicy', 'name kind users toilets days tanks tank_cost tanks_per_land')
+
+COMMUNITY_TANKS = StoragePolicy('community', 'emptied', 20, 1000, 3, ((1000, 1.0),), 'cost_urine_tank1', 154)
+SIMPLE_TANKS = StoragePolicy('simple', 'stored', 40, 500, 80, ((1000, 1.0),), 'cost_urine_tank1', 154)
+
+# volume (L), tanks, cost_units (tanks priced relative to the reference tank), land_plots; with costs (USD, USD/yr
+# for op and land): capital, labor, op, maint, land
+TankQuantities = namedtuple('TankQuantities', 'volume tanks cost_units land_plots')
+TankSizing = namedtuple('TankSizing', TankQuantities._fields + ('capital', 'labor', 'op', 'maint', 'land'))
+
+memo_size = 32  # sizings kept in memory
+_memo = OrderedDict()
+_catalogs = {}  # EquipmentCatalog of each tanks or tanks_per_land, so its table is built once
+
+# ~~~~~~~TANK QUANTITIES~~~~~~~
+# urine_volume: daily volume of urine per capita of every run (L/cap/d)
+
+
+def tank_quantities(urine_volume, policy):
+
+    urine_volume = np.asarray(urine_volume, dtype=float)
+    key = ('quantities', policy, _digest([urine_volume]))
+    if key in _memo:
+        return _remember(key, _memo[key])
+
+    if policy.kind == 'emptied':
+        if policy.days != int(policy.days) or policy.days < 1:
+            raise ValueError('tanks emptied every %r days: the storage time must be a whole number of days (at least '
+                             '1), the urine of each day being weighted by its day' % (policy.days,))
+        stored_urine = 0.33 * 1 * urine_volume  # (L/cap) 0.33 x day d x daily volume, summed over the days
+        for day in range(2, int(policy.days) + 1):
+            stored_urine = stored_urine + (0.33 * day * urine_volume)
+        volume = policy.users * policy.toilets * stored_urine  # (L) tank emptied every days days
+    elif policy.kind == 'stored':
+        volume = urine_volume * policy.toilets * policy.users * policy.days  # (L) urine of the storage time
+    else:
+        raise ValueError("storage policy kind must be 'emptied' or 'stored', not %r" % (policy.kind,))
+
+    tanks = _catalog(policy.tanks).size(volume)
+    land_plots = _catalog(policy.tanks_per_land).units(tanks.units)
+
+    return _remember(key, TankQuantities(volume, tanks.units, tanks.cost_units, land_plots))
+
+
+# ~~~~~~~TANK COSTS~~~~~~~
+# samples: {sheet: table} with RR_triangle (urine_volume), RR_uniform (policy.tank_cost, lease_50_100), and
+# labor_cost_ratio, op_cost_ratio, maint_cost_ratio (tank)
+
+
+def tank_sizing(samples, policy):
+
+    columns = [np.asarray(samples[sheet][name], dtype=float) for sheet, name in
+               (('RR_triangle', 'urine_volume'), ('RR_uniform', policy.tank_cost), ('RR_uniform', 'lease_50_100'),
+                ('labor_cost_ratio', 'tank'), ('op_cost_ratio', 'tank'), ('maint_cost_ratio', 'tank'))]
+    key = ('sizing', policy, _digest(columns))
+    if key in _memo:
+        return _remember(key, _memo[key])
+
+    urine_volume, tank_cost, lease, labor_ratio, op_ratio, maint_ratio = columns
+    quantities = tank_quantities(urine_volume, policy)
+    capital = tank_cost * quantities.cost_units  # (USD)
+
+    return _remember(key, TankSizing(*(quantities + (capital,
+                                                     labor_ratio * capital,  # (USD) construction labor
+                                                     op_ratio * capital,  # (USD/yr) operation
+                                                     maint_ratio * capital,  # (USD) maintenance at half lifetime
+                                                     quantities.land_plots * lease))))  # (USD/yr) land lease
+
+
+def clear_memo():
+
+    _memo.clear()
+
+
+def _catalog(sizes):
+
+    if sizes not in _catalogs:
+        _catalogs[sizes] = EquipmentCatalog(sizes)
+
+    return _catalogs[sizes]
+
+
+def _remember(key, value):
+
+    _memo[key] = value
+    _memo.move_to_end(key)
+    while len(_memo) > memo_size:
+        _memo.popitem(last=False)
+
+    return value
+
+
+def _digest(columns):
+
+    digest = hashlib.sha1()
+    for column in columns:
+        digest.update(np.ascontiguousarray(column).tobytes())
+        digest.update(str(column.shape).encode())
+
+    return digest.hexdigest()